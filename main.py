@@ -1,9 +1,9 @@
+import argparse
 import os
 import sys
+import time
 from datetime import datetime
 import getpass
-import contextlib
-from io import StringIO
 
 # Configuración de rutas base
 HERE = os.path.dirname(os.path.abspath(__file__))
@@ -15,40 +15,76 @@ if SRC not in sys.path:
 
 import lexer as lexmod
 import parser as parsemod
+import chunkparse
 import semantic as semmod
 import utils
+import analysis
+import fold
+import tracing
+from stats import stats, CountingDict, counting_reductions
+from budget import budget, ErrorBudgetExceeded
 
 
 def run_lexer_analysis(src, user, filename, logs_path):
     """Ejecuta análisis léxico y genera log en la carpeta logs_path"""
-    lexmod.lexer.lineno = 1
-    err_capture = StringIO()
+    lexer = lexmod.build_lexer()
     tokens = []
 
-    with contextlib.redirect_stdout(err_capture):
-        lexmod.lexer.input(src)
-        for tok in lexmod.lexer:
-            tokens.append(tok)
+    stopped = None
+    with stats.phase("lex"):
+        lexer.input(src)
+        try:
+            for tok in lexer:
+                tokens.append(tok)
+        except ErrorBudgetExceeded as e:
+            stopped = str(e)
+    stats.count("tokens", len(tokens))
+    stats.count("interned", len(lexer.interner))
+    if stopped:
+        print(f"⚠ {stopped}")
+
+    errors_text = "".join(f"{err}\n" for err in lexer.errors)
+    if stopped:
+        errors_text += f"{stopped}\n"
 
     # Pasamos logs_path a la utilidad
-    logpath = utils.save_lexer_log(
-        user, tokens, err_capture.getvalue(), filename, logs_path
-    )
+    with stats.phase("log"):
+        logpath = utils.save_lexer_log(
+            user, tokens, errors_text, filename, logs_path
+        )
     print(f"✓ Lexer log escrito en: {logpath}")
 
-    return tokens, err_capture.getvalue()
+    return tokens, lexer.errors
 
 
-def run_parser_analysis(src, user, logs_path):
+def run_parser_analysis(src, user, logs_path, tokens=None, jobs=None):
     """Ejecuta análisis sintáctico y genera AST en la carpeta logs_path"""
     print("\n" + "=" * 60)
     print("INICIANDO ANÁLISIS SINTÁCTICO")
     print("=" * 60)
 
-    ast, errors = parsemod.parse_code(src)
+    if jobs and jobs > 1:
+        # Los errores léxicos ya se informaron en la fase léxica
+        with stats.phase("parse"):
+            ast, errors, _ = chunkparse.parse_code_parallel(src, jobs, tokens)
+        if stats.enabled:
+            stats.count("ast_nodes", analysis.count_nodes(ast))
+    elif stats.enabled:
+        with counting_reductions(parsemod.parser) as reductions:
+            with stats.phase("parse"):
+                ast, errors = parsemod.parse_code(src, tokens)
+        # El parser especializado no pasa por las reducciones de PLY
+        if parsemod.engine == "ply":
+            stats.count("reductions", reductions[0])
+        stats.count("ast_nodes", analysis.count_nodes(ast))
+    else:
+        with stats.phase("parse"):
+            ast, errors = parsemod.parse_code(src, tokens)
+    stats.count("syntax_errors", len(errors))
 
     # Pasamos logs_path a la utilidad
-    logpath = utils.save_syntax_log(user, errors, logs_path)
+    with stats.phase("log"):
+        logpath = utils.save_syntax_log(user, errors, logs_path)
 
     if not errors:
         print("✓ Código analizado correctamente")
@@ -62,18 +98,40 @@ def run_parser_analysis(src, user, logs_path):
     return ast, errors
 
 
-def run_semantic_analysis(ast, user, logs_path):
+def run_constant_folding(ast):
+    """Pliega las expresiones constantes del AST antes del semántico"""
+    with stats.phase("fold"):
+        ast = fold.fold_constants(ast)
+    stats.count("folded_nodes", fold.removed_nodes)
+    if fold.folded_constants:
+        print(f"✓ Plegado de constantes: {len(fold.folded_constants)} expresiones, "
+              f"{fold.removed_nodes} nodos eliminados")
+    return ast
+
+
+def run_semantic_analysis(ast, user, logs_path, jobs=None):
     """Ejecuta análisis semántico y genera log en la carpeta logs_path"""
     print("\n" + "=" * 60)
     print("INICIANDO ANÁLISIS SEMÁNTICO")
     print("=" * 60)
 
-    errors = semmod.analyze(ast)
+    if stats.enabled:
+        semmod.table_factory = CountingDict
+    try:
+        with stats.phase("semantic"):
+            errors = semmod.analyze(ast, workers=jobs)
+    finally:
+        semmod.table_factory = dict
+    if stats.enabled:
+        stats.count("symbol_lookups",
+                    semmod.symbol_table.lookups + semmod.function_table.lookups)
+    stats.count("semantic_errors", len(errors))
 
     # Pasamos logs_path a la utilidad
-    logpath = utils.save_semantic_log(
-        user, errors, semmod.symbol_table, semmod.function_table, logs_path
-    )
+    with stats.phase("log"):
+        logpath = utils.save_semantic_log(
+            user, errors, semmod.symbol_table, semmod.function_table, logs_path
+        )
 
     if not errors:
         print("✓ Análisis semántico completado sin errores")
@@ -88,7 +146,164 @@ def run_semantic_analysis(ast, user, logs_path):
     return errors
 
 
-def main():
+def run_project_analysis(root, jobs=None, max_errors=None, profile=False, memprofile=False):
+    """Analiza un directorio como un proyecto (ver src/project.py)"""
+    import project
+
+    paths = project.find_sources(root)
+    if not paths:
+        print(f"❌ ERROR: no hay archivos .rs en {root}")
+        return 1
+
+    stats.reset()
+    stats.enabled = profile or memprofile
+    if memprofile:
+        # tracemalloc solo ve este proceso: el proyecto se analiza aquí
+        jobs = 1
+        stats.start_memory()
+    start = time.perf_counter()
+    try:
+        result = project.analyze_project(paths, workers=jobs, max_errors=max_errors)
+    finally:
+        stats.stop_memory()
+    elapsed = time.perf_counter() - start
+
+    for report in result.files:
+        errors = report.errors
+        if errors:
+            print(f"✗ {os.path.relpath(report.path, root)}: {len(errors)} errores")
+            for err in errors:
+                print(f"  - {err}")
+
+    print("\n" + "=" * 60)
+    print(f"Archivos:   {len(result.files)}")
+    print(f"Funciones:  {len(result.functions)} ({len(result.duplicates)} duplicadas)")
+    print(f"Errores:    {result.error_count}")
+    print(f"Tiempo:     {elapsed:.2f} s")
+    print("=" * 60)
+
+    if profile:
+        print("\nPERFIL DE EJECUCIÓN")
+        print(stats.report())
+    if memprofile:
+        print("\nPERFIL DE MEMORIA")
+        print(stats.memory_report())
+    return 1 if result.error_count else 0
+
+
+def save_trace():
+    """Escribe la traza de --trace, si se estaba registrando"""
+    path = tracing.finish()
+    if path:
+        print(f"\n✓ Traza guardada en: {path} (ábrela en https://ui.perfetto.dev)")
+
+
+def parse_args(argv=None):
+    """Opciones de línea de comandos"""
+    ap = argparse.ArgumentParser(
+        description="Analizador léxico, sintáctico y semántico para Rust"
+    )
+    ap.add_argument(
+        "archivo",
+        nargs="?",
+        help="Archivo .rs a analizar (por defecto test/semantic/semantic-algorithm-1.rs)",
+    )
+    ap.add_argument(
+        "--server",
+        action="store_true",
+        help="Modo servidor de lenguaje (LSP) sobre stdio",
+    )
+    ap.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Vigila DIR y re-analiza los archivos .rs que cambien",
+    )
+    ap.add_argument(
+        "--project",
+        metavar="DIR",
+        help="Analiza todos los archivos .rs de DIR con una tabla de funciones común",
+    )
+    ap.add_argument(
+        "--poll",
+        action="store_true",
+        help="Con --watch: sondear mtimes en lugar de usar inotify",
+    )
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help="Muestra tiempos por fase y contadores al terminar",
+    )
+    ap.add_argument(
+        "--cprofile",
+        metavar="ARCHIVO",
+        help="Guarda un volcado de cProfile (pstats) del análisis en ARCHIVO",
+    )
+    ap.add_argument(
+        "--memprofile",
+        action="store_true",
+        help="Mide con tracemalloc la memoria de cada fase (pico, retenida y sitios)",
+    )
+    ap.add_argument(
+        "--trace",
+        metavar="ARCHIVO",
+        help="Guarda una línea de tiempo de las fases (Trace Event, para Perfetto) en ARCHIVO",
+    )
+    ap.add_argument(
+        "--max-errors",
+        type=int,
+        metavar="N",
+        help="Detiene el análisis al acumular N errores entre todas las fases",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Analiza en N procesos en paralelo (trozos del programa y cuerpos de funciones)",
+    )
+    ap.add_argument(
+        "--parser",
+        choices=("ply", "rd"),
+        default="ply",
+        help="Motor del análisis sintáctico: tablas LALR de PLY o el parser especializado",
+    )
+    ap.add_argument(
+        "--no-fold",
+        action="store_true",
+        help="No plegar expresiones constantes antes del análisis semántico",
+    )
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.server:
+        import server
+
+        return server.serve()
+
+    if args.watch:
+        import watch
+
+        if not os.path.isdir(args.watch):
+            print(f"❌ ERROR: {args.watch} no es un directorio")
+            return 1
+        watch.Watcher(args.watch, polling=args.poll, max_errors=args.max_errors).run()
+        return 0
+
+    if args.project:
+        if not os.path.isdir(args.project):
+            print(f"❌ ERROR: {args.project} no es un directorio")
+            return 1
+        parsemod.engine = args.parser
+        if args.trace:
+            tracing.start(args.trace)
+        try:
+            return run_project_analysis(args.project, args.jobs, args.max_errors,
+                                        profile=args.profile, memprofile=args.memprofile)
+        finally:
+            save_trace()
+
     # ==========================================
     # CONFIGURACIÓN DE RUTAS (Dinámico)
     # ==========================================
@@ -99,6 +314,9 @@ def main():
 
     # 2. Ruta del archivo de entrada (en carpeta test/semantic vecina a main)
     ruta_entrada = os.path.join(DIR_ACTUAL, "test", "semantic", NOMBRE_ARCHIVO)
+    if args.archivo:
+        ruta_entrada = os.path.abspath(args.archivo)
+        NOMBRE_ARCHIVO = os.path.basename(ruta_entrada)
     ruta_entrada = os.path.normpath(ruta_entrada)
 
     # 3. Ruta de la carpeta de LOGS (vecina a main)
@@ -123,7 +341,25 @@ def main():
         print("=" * 60)
         return
 
-    with open(ruta_entrada, "r", encoding="utf-8") as f:
+    stats.reset()
+    stats.enabled = args.profile or args.memprofile
+    parsemod.engine = args.parser
+    if args.memprofile:
+        stats.start_memory()
+    if args.trace:
+        tracing.start(args.trace)
+        tracing.current_file = ruta_entrada
+    budget.reset(args.max_errors)
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # errors="replace": un archivo binario o mal codificado llega al lexer, que
+    # lo reporta como caracteres ilegales (acotados por --max-errors)
+    with stats.phase("read"), open(ruta_entrada, "r", encoding="utf-8", errors="replace") as f:
         src = f.read()
 
     user = getpass.getuser() or "anon"
@@ -148,31 +384,67 @@ def main():
     # [FASE 2] SINTÁCTICO
     print("\n[FASE 2] Análisis Sintáctico")
     print("-" * 60)
-    # Pasamos ruta_logs
-    ast, syntax_errors = run_parser_analysis(src, user, ruta_logs)
+    ast, syntax_errors = None, []
+    if budget.exhausted:
+        print("⚠ Análisis sintáctico omitido: se alcanzó el límite de errores")
+    else:
+        # Pasamos ruta_logs y los tokens de la fase léxica
+        ast, syntax_errors = run_parser_analysis(src, user, ruta_logs, tokens, args.jobs)
 
     semantic_errors = []
-    if not syntax_errors and ast:
+    if budget.exhausted:
+        print("\n[FASE 3] Análisis Semántico")
+        print("-" * 60)
+        print("⚠ Análisis semántico omitido: se alcanzó el límite de errores")
+        ast = None
+    elif ast:
         # [FASE 3] SEMÁNTICO
         print("\n[FASE 3] Análisis Semántico")
         print("-" * 60)
+        if syntax_errors:
+            print("⚠ Se analizan las sentencias que el parser pudo recuperar")
+        if not args.no_fold:
+            ast = run_constant_folding(ast)
         # Pasamos ruta_logs
-        semantic_errors = run_semantic_analysis(ast, user, ruta_logs)
+        semantic_errors = run_semantic_analysis(ast, user, ruta_logs, args.jobs)
     else:
         print("\n[FASE 3] Análisis Semántico")
         print("-" * 60)
-        print("⚠ Análisis semántico omitido debido a errores sintácticos")
+        print("⚠ Análisis semántico omitido: el parser no produjo AST")
 
     print("\n" + "=" * 60)
     print("RESUMEN DE ANÁLISIS")
     print("=" * 60)
     print(f"Tokens léxicos: {len(tokens)}")
+    print(f"Errores léxicos: {len(lex_errors)}")
     print(f"Errores sintácticos: {len(syntax_errors)}")
     print(
-        f"Errores semánticos: {len(semantic_errors) if not syntax_errors else 'No analizado'}"
+        f"Errores semánticos: {len(semantic_errors) if ast else 'No analizado'}"
     )
     print("=" * 60)
 
+    if profiler is not None:
+        profiler.disable()
+        import pstats
+
+        profiler.dump_stats(args.cprofile)
+        print(f"\n✓ Perfil cProfile guardado en: {args.cprofile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    if args.profile:
+        stats.count(
+            "diagnostics", len(lex_errors) + len(syntax_errors) + len(semantic_errors)
+        )
+        print("\nPERFIL DE EJECUCIÓN")
+        print(stats.report())
+
+    if args.memprofile:
+        stats.stop_memory()
+        print("\nPERFIL DE MEMORIA")
+        print(stats.memory_report())
+
+    save_trace()
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Pipeline de análisis en memoria (léxico + sintáctico + semántico).
+
+Lo comparten los modos de larga duración (servidor LSP, daemon) que no
+escriben logs y necesitan los resultados como datos.
+"""
+
+import fold
+import lexer as lexmod
+import parser as parsemod
+import semantic as semmod
+import xref
+from budget import budget
+from stats import stats
+from typetable import Type
+
+
+class AnalysisResult:
+    """Resultado de analizar un texto fuente"""
+
+    def __init__(self, ast, lex_errors, syntax_errors, semantic_errors,
+                 symbol_table, function_table, xref=None):
+        self.ast = ast
+        self.lex_errors = lex_errors
+        self.syntax_errors = syntax_errors
+        self.semantic_errors = semantic_errors
+        self.symbol_table = symbol_table
+        self.function_table = function_table
+        self.xref = xref
+
+    @property
+    def error_count(self):
+        return len(self.lex_errors) + len(self.syntax_errors) + len(self.semantic_errors)
+
+    def to_dict(self):
+        """Versión serializable (JSON) sin el AST"""
+        return {
+            'lex_errors': self.lex_errors,
+            'syntax_errors': self.syntax_errors,
+            'semantic_errors': self.semantic_errors,
+            'symbols': {name: _plain(info) for name, info in self.symbol_table.items()},
+            'functions': {name: _plain(info) for name, info in self.function_table.items()},
+        }
+
+
+def _plain(value):
+    """Convierte tipos y tuplas del AST a listas para JSON"""
+    if isinstance(value, Type):
+        return _plain(value.annotation())
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def iter_nodes(ast):
+    """Recorre (sin recursión) todos los nodos tupla del AST en preorden"""
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tuple):
+            if node and isinstance(node[0], str):
+                yield node
+            stack.extend(reversed(node))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def count_nodes(ast):
+    """Número de nodos del AST"""
+    return sum(1 for _ in iter_nodes(ast))
+
+
+def analyze_source(text, max_errors=None, external=None):
+    """
+    Ejecuta el pipeline completo sobre un texto fuente.
+
+    Las expresiones constantes se pliegan (src/fold.py) antes del semántico,
+    que se omite si el parser no produjo AST o si se agotó el presupuesto de
+    'max_errors' errores. 'external' son funciones de otros archivos (ver
+    semantic.analyze).
+
+    Returns:
+        AnalysisResult: errores de cada fase, tablas de símbolos/funciones e
+        índice de referencias cruzadas (src/xref.py)
+    """
+    budget.reset(max_errors)
+    lexer = lexmod.build_lexer()
+    tokens = []
+
+    def recorded_tokens():
+        # Se guardan los tokens a medida que el parser los pide (para xref)
+        for tok in iter(lexer.token, None):
+            tokens.append(tok)
+            yield tok
+
+    # El léxico va intercalado con el sintáctico: la fase "parse" incluye ambos
+    with stats.phase("parse"):
+        ast, syntax_errors = parsemod.parse_code(text, recorded_tokens(), lexer=lexer)
+    stats.count("tokens", len(tokens))
+    if stats.enabled:
+        stats.count("ast_nodes", count_nodes(ast))
+    with stats.phase("fold"):
+        ast = fold.fold_constants(ast)
+    # Sin AST o sin presupuesto el semántico no se ejecuta, y su estado
+    # global es el del análisis anterior: no se usa
+    checked = bool(ast) and not budget.exhausted
+    # Los errores se devuelven como datos: el semántico no los imprime
+    echo = semmod.echo
+    semmod.echo = False
+    try:
+        with stats.phase("semantic"):
+            semantic_errors = semmod.analyze(ast, external=external) if checked else []
+    finally:
+        semmod.echo = echo
+
+    with stats.phase("xref"):
+        index = xref.build_index(semmod.xref_records if checked else [], tokens, text,
+                                 semmod.declaration_types if checked else None)
+
+    return AnalysisResult(
+        ast,
+        [str(err) for err in lexer.errors],
+        list(syntax_errors),
+        list(semantic_errors),
+        dict(semmod.symbol_table) if checked else {},
+        dict(semmod.function_table) if checked else {},
+        index,
+    )
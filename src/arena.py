@@ -0,0 +1,266 @@
+"""
+Representación plana (arena) del AST en columnas paralelas.
+
+from_ast() convierte el AST de tuplas de parse_code en un Arena: cada nodo es
+un índice en preorden y sus datos están en columnas de enteros
+
+    kind          código del tipo de nodo (índice en KINDS)
+    parent        índice del padre (-1 en la raíz)
+    first_child   primer hijo (-1 si no tiene)
+    next_sibling  siguiente hermano (-1 si es el último)
+    line          línea del nodo o, si no la lleva, la de su ancestro más cercano
+    value         índice en 'values' del nombre, operador o valor literal (-1 si no hay)
+    depth         profundidad (0 en la raíz)
+
+Las listas del AST (sentencias, argumentos, elementos) no son nodos: sus
+elementos cuelgan directamente del nodo que las contiene. Las anotaciones de
+tipo tampoco lo son.
+
+Con NumPy instalado las columnas son numpy.ndarray y las consultas de todo el
+árbol (conteos por tipo, profundidad máxima, nodos de una línea) son
+operaciones vectorizadas; sin NumPy son array.array y las consultas recorren
+las columnas en Python. En ambos casos el Arena se serializa como unos pocos
+bloques de bytes, así que pasarlo a otro proceso es barato.
+
+Uso:
+    python src/arena.py programa.rs [--line N]
+"""
+
+import argparse
+import sys
+from array import array
+
+from fold import LINE_INDEX
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+KINDS = (
+    "program", "block", "var_decl", "func_decl", "param", "assign",
+    "assign_index", "if", "while", "for", "range", "return", "break",
+    "continue", "print", "expr_stmt", "binop", "unop", "literal",
+    "func_call", "array_access", "tuple_access", "vector", "array", "tuple",
+)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# Posición del dato escalar que se guarda en 'values' para cada tipo de nodo
+VALUE_INDEX = {
+    "var_decl": 1, "func_decl": 1, "param": 1, "assign": 1, "for": 1,
+    "binop": 1, "unop": 1, "literal": 1, "func_call": 1, "tuple_access": 1,
+    "array_access": 1, "print": 1,
+}
+
+COLUMNS = ("kind", "parent", "first_child", "next_sibling", "line", "value", "depth")
+
+
+class Arena:
+    """AST en columnas; usar from_ast() para construirlo"""
+
+    def __init__(self, columns, values):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.values = values
+
+    def __len__(self):
+        return len(self.kind)
+
+    # -- Nodos individuales --------------------------------------------------
+
+    def kind_of(self, index):
+        return KINDS[self.kind[index]]
+
+    def value_of(self, index):
+        """Nombre, operador o valor literal del nodo (None si no tiene)"""
+        value = self.value[index]
+        return self.values[value] if value >= 0 else None
+
+    def children(self, index):
+        """Índices de los hijos de un nodo, en orden"""
+        child = int(self.first_child[index])
+        result = []
+        while child >= 0:
+            result.append(child)
+            child = int(self.next_sibling[child])
+        return result
+
+    def subtree_end(self, index):
+        """Índice siguiente al último descendiente (los nodos están en preorden)"""
+        depth = self.depth[index]
+        end = index + 1
+        if np is not None:
+            later = np.flatnonzero(self.depth[end:] <= depth)
+            return end + int(later[0]) if len(later) else len(self)
+        while end < len(self) and self.depth[end] > depth:
+            end += 1
+        return end
+
+    # -- Consultas de todo el árbol ------------------------------------------
+
+    def count(self, kind):
+        """Número de nodos de un tipo"""
+        code = KIND_CODES[kind]
+        if np is not None:
+            return int(np.count_nonzero(self.kind == code))
+        return self.kind.count(code)
+
+    def kind_counts(self):
+        """Número de nodos de cada tipo presente"""
+        if np is not None:
+            counts = np.bincount(self.kind, minlength=len(KINDS))
+        else:
+            counts = [0] * len(KINDS)
+            for code in self.kind:
+                counts[code] += 1
+        return {KINDS[code]: int(n) for code, n in enumerate(counts) if n}
+
+    def max_depth(self):
+        if not len(self):
+            return 0
+        return int(self.depth.max()) if np is not None else max(self.depth)
+
+    def nodes_on_line(self, line):
+        """Índices de los nodos de una línea"""
+        if np is not None:
+            return [int(i) for i in np.flatnonzero(self.line == line)]
+        return [i for i, node_line in enumerate(self.line) if node_line == line]
+
+    def find(self, kind, value=None):
+        """Índices de los nodos de un tipo (y con un valor dado, si se indica)"""
+        code = KIND_CODES[kind]
+        if value is not None:
+            target = _value_key(value)
+            try:
+                value_index = next(i for i, v in enumerate(self.values) if _value_key(v) == target)
+            except StopIteration:
+                return []
+        if np is not None:
+            mask = self.kind == code
+            if value is not None:
+                mask &= self.value == value_index
+            return [int(i) for i in np.flatnonzero(mask)]
+        return [i for i in range(len(self))
+                if self.kind[i] == code and (value is None or self.value[i] == value_index)]
+
+    # -- Serialización -------------------------------------------------------
+
+    def __getstate__(self):
+        # Cada columna viaja como un solo bloque de bytes
+        return {name: bytes(memoryview(getattr(self, name))) for name in COLUMNS}, self.values
+
+    def __setstate__(self, state):
+        raw, values = state
+        self.__init__({name: _column(array("i", raw[name])) for name in COLUMNS}, values)
+
+
+def _value_key(value):
+    # True y 1 son iguales como claves de diccionario; el tipo los distingue
+    return type(value), value
+
+
+def _column(data):
+    """Columna final: ndarray sobre el mismo buffer si hay NumPy, si no el array"""
+    if np is not None:
+        return np.frombuffer(data, dtype=np.int32) if len(data) else np.zeros(0, dtype=np.int32)
+    return data
+
+
+def from_ast(ast):
+    """
+    Convierte el AST de tuplas en un Arena (sin recursión).
+
+    Returns:
+        Arena: vacío si ast es None
+    """
+    kind, parent, first_child, next_sibling = array("i"), array("i"), array("i"), array("i")
+    line, value, depth = array("i"), array("i"), array("i")
+    values = []
+    value_ids = {}
+    last_child = []
+
+    stack = [(ast, -1, 0, 0)] if ast is not None else []
+    while stack:
+        node, parent_index, parent_line, node_depth = stack.pop()
+        if isinstance(node, list):
+            stack.extend((item, parent_index, parent_line, node_depth) for item in reversed(node))
+            continue
+        if not (isinstance(node, tuple) and node and node[0] in KIND_CODES):
+            continue
+
+        head = node[0]
+        index = len(kind)
+        kind.append(KIND_CODES[head])
+        parent.append(parent_index)
+        first_child.append(-1)
+        next_sibling.append(-1)
+        last_child.append(-1)
+        depth.append(node_depth)
+
+        line_at = LINE_INDEX.get(head)
+        node_line = node[line_at] if line_at is not None and line_at < len(node) else None
+        node_line = node_line if isinstance(node_line, int) and node_line else parent_line
+        line.append(node_line)
+
+        value_at = VALUE_INDEX.get(head)
+        if value_at is not None and value_at < len(node) \
+                and not isinstance(node[value_at], (tuple, list)):
+            key = _value_key(node[value_at])
+            value_index = value_ids.get(key)
+            if value_index is None:
+                value_index = value_ids[key] = len(values)
+                values.append(node[value_at])
+            value.append(value_index)
+        else:
+            value.append(-1)
+
+        if parent_index >= 0:
+            previous = last_child[parent_index]
+            if previous < 0:
+                first_child[parent_index] = index
+            else:
+                next_sibling[previous] = index
+            last_child[parent_index] = index
+
+        stack.extend((child, index, node_line, node_depth + 1)
+                     for child in reversed(node[1:]) if isinstance(child, (tuple, list)))
+
+    columns = {
+        "kind": kind, "parent": parent, "first_child": first_child,
+        "next_sibling": next_sibling, "line": line, "value": value, "depth": depth,
+    }
+    return Arena({name: _column(data) for name, data in columns.items()}, values)
+
+
+def main(argv=None):
+    import lexer as lexmod
+    import parser as parsemod
+
+    ap = argparse.ArgumentParser(description="Estadísticas del AST en forma de arena")
+    ap.add_argument("archivo")
+    ap.add_argument("--line", type=int, help="Mostrar los nodos de la línea N")
+    args = ap.parse_args(argv)
+
+    with open(args.archivo, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    ast, errors = parsemod.parse_code(text, lexer=lexmod.build_lexer())
+    for error in errors:
+        print(f"❌ {error}", file=sys.stderr)
+    arena = from_ast(ast)
+
+    print(f"Nodos:                 {len(arena)}")
+    print(f"Profundidad máxima:    {arena.max_depth()}")
+    print(f"Columnas:              {'numpy' if np is not None else 'array'}")
+    for kind, n in sorted(arena.kind_counts().items(), key=lambda item: -item[1]):
+        print(f"  {kind:<14} {n:>8}")
+    if args.line is not None:
+        print(f"\nLínea {args.line}:")
+        for index in arena.nodes_on_line(args.line):
+            value = arena.value_of(index)
+            print(f"  {index:>6} {'  ' * int(arena.depth[index])}{arena.kind_of(index)}"
+                  + (f" {value!r}" if value is not None else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,650 @@
+"""
+Benchmarks del analizador sobre programas sintéticos (ver src/synth.py).
+
+Mide por separado el léxico, el sintáctico, el semántico y la escritura de
+logs para una serie de tamaños crecientes, y guarda el resultado en JSON para
+comparar ejecuciones a lo largo del tiempo.
+
+Uso:
+    python src/bench.py run [--sizes 10,20,40,80] [--out resultado.json]
+    python src/bench.py vm [--iterations 20000]
+    python src/bench.py parse [--functions 300] [--jobs 4]
+    python src/bench.py deep [--depths 1000,10000,100000] [--shapes chain,blocks]
+    python src/bench.py compare [--samples 10] [--threshold 0.1] [--save]
+
+'compare' es la barrera contra regresiones: mide un corpus fijo (los
+ejemplos de test/semantic más programas sintéticos con semillas fijas) y
+compara el rendimiento por fase y el pico de memoria con una línea base
+guardada en JSON (BASELINE_PATH); sale con código 1 si algo empeora más allá
+del umbral y con 2 si la línea base no existe (se crea con --save).
+"""
+
+import argparse
+import contextlib
+import gc
+import getpass
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import StringIO
+
+import analysis
+import chunkparse
+import compiler
+import interp
+import lexer as lexmod
+import parser as parsemod
+import semantic as semmod
+import synth
+import utils
+import vm
+from stats import Stats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_LOGS = os.path.join(os.path.dirname(HERE), "logs", "bench")
+BASELINE_PATH = os.path.join(BENCH_LOGS, "baseline.json")
+
+# Corpus de 'compare': ejemplos del repositorio y programas sintéticos fijos
+CORPUS_DIR = os.path.join(os.path.dirname(HERE), "test", "semantic")
+CORPUS_SEEDS = (0, 1, 2, 3)
+CORPUS_FUNCTIONS = 20
+
+
+def peak_rss_kb():
+    """
+    Pico de memoria residente del proceso en KB. Es el máximo de toda la
+    vida del proceso y nunca baja: cada medida se hace en un proceso nuevo
+    (ver isolated).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa bytes; Linux, KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def isolated(func, *args):
+    """Devuelve func(*args) ejecutada en un proceso nuevo (spawn, sin heredar memoria)"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(func, *args).result()
+
+
+def best_of(repeat, func):
+    """Ejecuta 'func' 'repeat' veces; devuelve (menor tiempo, último resultado)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def measure_phases(source, repeat=3, filename="synthetic.rs"):
+    """
+    Mide cada fase del pipeline sobre un texto fuente.
+
+    Returns:
+        dict: tiempos (s) por fase, tokens, nodos del AST, errores y derivados
+    """
+    user = "bench"
+    quiet = StringIO()
+
+    def lex():
+        lx = lexmod.build_lexer()
+        lx.input(source)
+        return list(lx), lx.errors
+
+    lex_time, (tokens, lex_errors) = best_of(repeat, lex)
+
+    def parse():
+        # Sobre los tokens ya reconocidos: el léxico se mide aparte
+        with contextlib.redirect_stdout(quiet):
+            return parsemod.parse_code(source, tokens)
+
+    lex_text = "".join(f"{err}\n" for err in lex_errors)
+    parse_time, (ast, syntax_errors) = best_of(repeat, parse)
+
+    def semantic():
+        with contextlib.redirect_stdout(quiet):
+            return semmod.analyze(ast) if ast else []
+
+    semantic_time, semantic_errors = best_of(repeat, semantic)
+
+    with tempfile.TemporaryDirectory() as logs_dir:
+        def write_logs():
+            utils.save_lexer_log(user, tokens, lex_text, filename, logs_dir)
+            utils.save_syntax_log(user, syntax_errors, logs_dir)
+            utils.save_semantic_log(user, semantic_errors, semmod.symbol_table,
+                                    semmod.function_table, logs_dir)
+
+        log_time, _ = best_of(repeat, write_logs)
+
+    nodes = analysis.count_nodes(ast)
+    return {
+        'chars': len(source),
+        'lines': source.count("\n") + 1,
+        'tokens': len(tokens),
+        'nodes': nodes,
+        'lex_errors': len(lex_errors),
+        'syntax_errors': len(syntax_errors),
+        'semantic_errors': len(semantic_errors),
+        'lex_s': lex_time,
+        'parse_s': parse_time,
+        'semantic_s': semantic_time,
+        'log_s': log_time,
+        'tokens_per_s': len(tokens) / lex_time if lex_time else 0.0,
+        'nodes_per_s': nodes / parse_time if parse_time else 0.0,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def measure_memory(source):
+    """
+    Una pasada sin cronometrar con tracemalloc (ver stats.start_memory).
+
+    Returns:
+        dict: bytes retenidos por token y por nodo del AST y pico de cada fase (KB)
+    """
+    mem = Stats()
+    quiet = StringIO()
+    # Sin recolecciones durante la medida: liberar basura de pasadas
+    # anteriores descontaría memoria de la fase en curso
+    gc.collect()
+    gc.disable()
+    mem.start_memory()
+    try:
+        with mem.phase("lex"):
+            lx = lexmod.build_lexer()
+            lx.input(source)
+            tokens = list(lx)
+        with mem.phase("parse"):
+            ast, _ = parsemod.parse_code(source, tokens)
+        with mem.phase("semantic"), contextlib.redirect_stdout(quiet):
+            if ast:
+                semmod.analyze(ast)
+    finally:
+        mem.stop_memory()
+        gc.enable()
+    mem.count("tokens", len(tokens))
+    mem.count("ast_nodes", analysis.count_nodes(ast))
+    result = {'bytes_per_token': 0.0, 'bytes_per_node': 0.0}
+    result.update(mem.memory_ratios())
+    for name, memory in mem.memory.items():
+        result[f'{name}_peak_kb'] = memory.peak / 1024
+    return result
+
+
+def measure_size(size, repeat, seed, options):
+    """Tiempos y memoria del programa sintético de 'size' funciones"""
+    source = synth.generate_program(seed, functions=size, **options)
+    entry = {'functions': size}
+    entry.update(measure_phases(source, repeat))
+    entry.update(measure_memory(source))
+    return entry
+
+
+def measure_deep(shape, depth, repeat):
+    """Tiempos de un programa de synth.generate_deep_program"""
+    entry = {'shape': shape, 'depth': depth}
+    entry.update(measure_phases(synth.generate_deep_program(shape, depth), repeat))
+    return entry
+
+
+def run_scaling(sizes, repeat=3, seed=0, **options):
+    """Genera un programa por tamaño (número de funciones) y mide cada uno en su proceso"""
+    return [isolated(measure_size, size, repeat, seed, options) for size in sizes]
+
+
+def run_deep(shapes, depths, repeat=3):
+    """Mide cada fase sobre los programas patológicos, cada uno en su proceso"""
+    return [isolated(measure_deep, shape, depth, repeat)
+            for shape in shapes for depth in depths]
+
+
+def print_deep_table(results):
+    print(f"{'shape':>7} {'depth':>8} {'nodes':>8} {'lex ms':>9} {'parse ms':>9} "
+          f"{'sem ms':>9} {'errors':>7} {'RSS KB':>9}")
+    for r in results:
+        errors = r['lex_errors'] + r['syntax_errors'] + r['semantic_errors']
+        print(f"{r['shape']:>7} {r['depth']:>8} {r['nodes']:>8} "
+              f"{r['lex_s'] * 1000:>9.2f} {r['parse_s'] * 1000:>9.2f} "
+              f"{r['semantic_s'] * 1000:>9.2f} {errors:>7} {r['peak_rss_kb']:>9}")
+
+
+# Bucle con la forma del de test/semantic/algoritmo3.rs, con más iteraciones
+VM_PROGRAM = """
+fn suma(a: i32, b: i32) -> i32 {
+    return a + b;
+}
+
+fn main() {
+    let mut x = 42;
+    let mut y = 3.1415;
+    let mut z = 10.0;
+    let mut total = 0;
+    for i in 0..ITERATIONS {
+        x = x + i;
+        x -= 1;
+        y *= 1.0001;
+        z /= 1.0;
+        let v = vec![1, 2, 3];
+        let b = true;
+        let f = false;
+        if b && !f || i == 2 {
+            total = suma(total, v[1]);
+        }
+    }
+    let mut k = 0;
+    while k < ITERATIONS {
+        k += 1;
+    }
+    println!(x, y, z, total, k);
+}
+"""
+
+
+def measure_vm(iterations=20000, repeat=3):
+    """
+    Compara la máquina virtual con el intérprete de árbol sobre VM_PROGRAM.
+
+    Returns:
+        dict: tiempos (s) de compilación, VM e intérprete y la salida de ambos
+    """
+    source = VM_PROGRAM.replace("ITERATIONS", str(iterations))
+    ast = vm.check_source(source)
+
+    compile_time, program = best_of(repeat, lambda: compiler.compile_program(ast))
+
+    def run_vm():
+        out = []
+        vm.VM(program, out.append).run()
+        return "".join(out)
+
+    def run_tree():
+        out = []
+        interp.interpret(ast, out.append)
+        return "".join(out)
+
+    vm_time, vm_output = best_of(repeat, run_vm)
+    tree_time, tree_output = best_of(repeat, run_tree)
+    if vm_output != tree_output:
+        raise RuntimeError(f"Salidas distintas: VM {vm_output!r}, árbol {tree_output!r}")
+    return {
+        'iterations': iterations,
+        'compile_s': compile_time,
+        'vm_s': vm_time,
+        'tree_s': tree_time,
+        'speedup': tree_time / vm_time if vm_time else 0.0,
+        'output': vm_output,
+    }
+
+
+def measure_parse(functions=300, jobs=4, repeat=3, seed=0):
+    """
+    Compara el análisis sintáctico en serie (PLY) con el análisis por trozos
+    y con el parser especializado (parser.engine = "rd").
+
+    Returns:
+        dict: tamaño, número de trozos, tiempos (s) y si los AST coinciden
+    """
+    source = synth.generate_program(seed, functions=functions)
+    chunks = chunkparse.split_chunks(source, jobs * chunkparse.CHUNKS_PER_WORKER) or [source]
+    serial_time, (serial_ast, _) = best_of(repeat, lambda: parsemod.parse_code(source))
+    parallel_time, (parallel_ast, _, _) = best_of(
+        repeat, lambda: chunkparse.parse_code_parallel(source, jobs))
+    # El parser especializado, de principio a fin y sobre los tokens ya
+    # reconocidos (solo el análisis sintáctico, sin el léxico)
+    lexer = lexmod.build_lexer()
+    lexer.input(source)
+    tokens = list(iter(lexer.token, None))
+    ply_tokens_time, _ = best_of(repeat, lambda: parsemod.parse_with_ply(source, tokens=tokens))
+    engine, parsemod.engine = parsemod.engine, "rd"
+    try:
+        rd_time, (rd_ast, _) = best_of(repeat, lambda: parsemod.parse_code(source))
+        rd_tokens_time, _ = best_of(repeat, lambda: parsemod.parse_code(source, tokens=tokens))
+    finally:
+        parsemod.engine = engine
+    return {
+        'chars': len(source),
+        'tokens': len(tokens),
+        'jobs': jobs,
+        'chunks': len(chunks),
+        'largest_chunk': max(len(c.lstrip("\n ")) for c in chunks),
+        'serial_s': serial_time,
+        'parallel_s': parallel_time,
+        'speedup': serial_time / parallel_time if parallel_time else 0.0,
+        'same_ast': serial_ast == parallel_ast,
+        'rd_s': rd_time,
+        'rd_same_ast': serial_ast == rd_ast,
+        'ply_tokens_s': ply_tokens_time,
+        'rd_tokens_s': rd_tokens_time,
+        'rd_speedup': ply_tokens_time / rd_tokens_time if rd_tokens_time else 0.0,
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare_corpus():
+    """Archivos del corpus de 'compare': [(nombre, texto)] en orden fijo"""
+    corpus = []
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if name.endswith(".rs"):
+            with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+                corpus.append((name, f.read()))
+    for seed in CORPUS_SEEDS:
+        source = synth.generate_program(seed, functions=CORPUS_FUNCTIONS)
+        corpus.append((f"synth-{seed}", source))
+    return corpus
+
+
+def median_interval(values, confidence=0.95):
+    """
+    Mediana e intervalo de confianza de la mediana por estadísticos de orden.
+
+    El intervalo [x(k), x(n-k+1)] es el más estrecho cuyos extremos dejan
+    fuera, cada uno, una probabilidad binomial(n, 1/2) de a lo sumo
+    (1 - confidence) / 2. Con muy pocas muestras es el rango completo.
+
+    Returns:
+        tuple: (mediana, inferior, superior)
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    middle = n // 2
+    median = ordered[middle] if n % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+    tail = (1 - confidence) / 2
+    k = 1
+    mass = 0.0
+    for i in range(middle):
+        mass += math.comb(n, i) / 2 ** n
+        if mass > tail:
+            break
+        k = i + 1
+    return median, ordered[k - 1], ordered[n - k]
+
+
+def sample_corpus(corpus):
+    """
+    Una muestra: pasa el corpus entero por cada fase.
+
+    Returns:
+        dict: tokens/s del léxico y del sintáctico y nodos/s del semántico
+    """
+    quiet = StringIO()
+    totals = {'lex': 0.0, 'parse': 0.0, 'semantic': 0.0}
+    tokens = nodes = 0
+    gc.collect()
+    for _, source in corpus:
+        start = time.perf_counter()
+        lx = lexmod.build_lexer()
+        lx.input(source)
+        toks = list(lx)
+        totals['lex'] += time.perf_counter() - start
+
+        with contextlib.redirect_stdout(quiet):
+            start = time.perf_counter()
+            ast, _ = parsemod.parse_code(source, toks)
+            totals['parse'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if ast:
+                semmod.analyze(ast)
+            totals['semantic'] += time.perf_counter() - start
+        tokens += len(toks)
+        nodes += analysis.count_nodes(ast)
+    return {
+        'lex_tokens_per_s': tokens / totals['lex'],
+        'parse_tokens_per_s': tokens / totals['parse'],
+        'semantic_nodes_per_s': nodes / totals['semantic'],
+    }
+
+
+def measure_corpus(samples=10, confidence=0.95):
+    """
+    Mide el corpus de 'compare': 'samples' muestras de rendimiento (tras una
+    pasada de calentamiento) y una pasada con tracemalloc por archivo.
+
+    Returns:
+        dict: corpus (archivos, tokens) y métricas; cada una con median, low,
+        high y higher_is_better
+    """
+    corpus = compare_corpus()
+    sample_corpus(corpus)
+    runs = [sample_corpus(corpus) for _ in range(samples)]
+
+    metrics = {}
+    for name in runs[0]:
+        median, low, high = median_interval([run[name] for run in runs], confidence)
+        metrics[name] = {'median': median, 'low': low, 'high': high,
+                         'higher_is_better': True}
+
+    # El pico de memoria es determinista: basta una pasada, y cuenta el
+    # mayor de los archivos en cada fase
+    peaks = {}
+    tokens = 0
+    for _, source in corpus:
+        memory = measure_memory(source)
+        for phase in ("lex", "parse", "semantic"):
+            key = f'{phase}_peak_kb'
+            peaks[key] = max(peaks.get(key, 0.0), memory.get(key, 0.0))
+        lx = lexmod.build_lexer()
+        lx.input(source)
+        tokens += sum(1 for _ in lx)
+    for name, peak in peaks.items():
+        metrics[name] = {'median': peak, 'low': peak, 'high': peak,
+                         'higher_is_better': False}
+
+    return {
+        'corpus': {'files': [name for name, _ in corpus], 'tokens': tokens},
+        'samples': samples,
+        'confidence': confidence,
+        'metrics': metrics,
+    }
+
+
+def compare_metrics(baseline, current, threshold=0.10, memory_threshold=0.10):
+    """
+    Compara dos mediciones de measure_corpus.
+
+    Una métrica de rendimiento empeora si su mediana cae más de 'threshold'
+    respecto a la base y además los intervalos de confianza no se solapan
+    (el ruido no basta para explicar la diferencia). Un pico de memoria
+    empeora si crece más de 'memory_threshold'.
+
+    Returns:
+        list: (métrica, base, actual, cambio relativo, empeora) por métrica común
+    """
+    rows = []
+    for name, now in current['metrics'].items():
+        before = baseline['metrics'].get(name)
+        if before is None or not before['median']:
+            continue
+        change = now['median'] / before['median'] - 1
+        if now['higher_is_better']:
+            regressed = change < -threshold and now['high'] < before['low']
+        else:
+            regressed = change > memory_threshold
+        rows.append((name, before, now, change, regressed))
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'métrica':<22} {'base':>24} {'actual':>24} {'cambio':>8}")
+    for name, before, now, change, regressed in rows:
+        base = f"{before['median']:.0f} [{before['low']:.0f}, {before['high']:.0f}]"
+        current = f"{now['median']:.0f} [{now['low']:.0f}, {now['high']:.0f}]"
+        mark = "  ✗ regresión" if regressed else ""
+        print(f"{name:<22} {base:>24} {current:>24} {change * 100:>+7.1f}%{mark}")
+
+
+def print_table(results):
+    print(f"{'funcs':>6} {'tokens':>8} {'nodes':>8} {'lex ms':>9} {'parse ms':>9} "
+          f"{'sem ms':>9} {'log ms':>9} {'tok/s':>10} {'nodes/s':>10} {'RSS KB':>9} "
+          f"{'B/tok':>7} {'B/nodo':>7}")
+    for r in results:
+        print(f"{r['functions']:>6} {r['tokens']:>8} {r['nodes']:>8} "
+              f"{r['lex_s'] * 1000:>9.2f} {r['parse_s'] * 1000:>9.2f} "
+              f"{r['semantic_s'] * 1000:>9.2f} {r['log_s'] * 1000:>9.2f} "
+              f"{r['tokens_per_s']:>10.0f} {r['nodes_per_s']:>10.0f} {r['peak_rss_kb']:>9} "
+              f"{r['bytes_per_token']:>7.1f} {r['bytes_per_node']:>7.1f}")
+
+
+def default_output_path():
+    user = (getpass.getuser() or "anon").replace(" ", "_")
+    now = datetime.now()
+    return os.path.join(BENCH_LOGS, f"bench-{user}-{now.strftime('%d%m%Y-%Hh%M')}.json")
+
+
+def save_results(path, params, results):
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    document = {
+        'generated': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def _sizes(text):
+    return [int(s) for s in text.split(",") if s.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks del analizador")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Curva de escalado sobre programas sintéticos")
+    run.add_argument("--sizes", type=_sizes, default=[10, 20, 40, 80],
+                     help="Número de funciones por programa, separado por comas")
+    run.add_argument("--statements", type=int, default=20)
+    run.add_argument("--depth", type=int, default=3)
+    run.add_argument("--literal-width", type=int, default=3)
+    run.add_argument("--error-rate", type=float, default=0.0)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--out", default=None, help="Archivo JSON de salida")
+
+    vm_bench = sub.add_parser("vm", help="Máquina virtual frente al intérprete de árbol")
+    vm_bench.add_argument("--iterations", type=int, default=20000)
+    vm_bench.add_argument("--repeat", type=int, default=3)
+
+    parse_bench = sub.add_parser(
+        "parse", help="Análisis sintáctico en serie frente a por trozos y al parser especializado")
+    parse_bench.add_argument("--functions", type=int, default=300)
+    parse_bench.add_argument("--jobs", type=int, default=4)
+    parse_bench.add_argument("--seed", type=int, default=0)
+    parse_bench.add_argument("--repeat", type=int, default=3)
+
+    deep = sub.add_parser("deep", help="Expresiones y bloques muy anidados")
+    deep.add_argument("--depths", type=_sizes, default=[1000, 10000, 100000],
+                      help="Niveles de anidamiento, separados por comas")
+    deep.add_argument("--shapes", type=lambda text: [s for s in text.split(",") if s],
+                      default=list(synth.DEEP_SHAPES),
+                      help="Formas a medir: " + ", ".join(synth.DEEP_SHAPES))
+    deep.add_argument("--repeat", type=int, default=1)
+    deep.add_argument("--out", default=None, help="Archivo JSON de salida")
+
+    compare = sub.add_parser("compare", help="Compara con la línea base; falla si hay regresión")
+    compare.add_argument("--samples", type=int, default=10)
+    compare.add_argument("--confidence", type=float, default=0.95)
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="Caída relativa de rendimiento tolerada (0.10 = 10%%)")
+    compare.add_argument("--memory-threshold", type=float, default=0.10,
+                         help="Crecimiento relativo del pico de memoria tolerado")
+    compare.add_argument("--baseline", default=BASELINE_PATH, help="Archivo JSON de la línea base")
+    compare.add_argument("--save", action="store_true",
+                         help="Guarda la medición como nueva línea base")
+
+    args = ap.parse_args(argv)
+
+    if args.command == "run":
+        options = {
+            'statements': args.statements,
+            'depth': args.depth,
+            'literal_width': args.literal_width,
+            'error_rate': args.error_rate,
+        }
+        results = run_scaling(args.sizes, args.repeat, args.seed, **options)
+        print_table(results)
+        params = dict(options, sizes=args.sizes, seed=args.seed, repeat=args.repeat)
+        path = save_results(args.out or default_output_path(), params, results)
+        print(f"\n✓ Resultados guardados en: {path}")
+    elif args.command == "vm":
+        r = measure_vm(args.iterations, args.repeat)
+        print(f"Iteraciones:           {r['iterations']}")
+        print(f"Compilación:           {r['compile_s'] * 1000:9.3f} ms")
+        print(f"Máquina virtual:       {r['vm_s'] * 1000:9.3f} ms")
+        print(f"Intérprete de árbol:   {r['tree_s'] * 1000:9.3f} ms")
+        print(f"Aceleración:           {r['speedup']:9.2f}x")
+        print(f"Salida:                {r['output'].strip()}")
+    elif args.command == "deep":
+        # Con el límite de recursión por defecto: el análisis no debe depender de él
+        results = run_deep(args.shapes, args.depths, args.repeat)
+        print_deep_table(results)
+        params = {'shapes': args.shapes, 'depths': args.depths, 'repeat': args.repeat,
+                  'recursion_limit': sys.getrecursionlimit()}
+        path = save_results(args.out or default_output_path(), params, results)
+        print(f"\n✓ Resultados guardados en: {path}")
+    elif args.command == "parse":
+        r = measure_parse(args.functions, args.jobs, args.repeat, args.seed)
+        print(f"Caracteres:            {r['chars']}")
+        print(f"Procesos / CPUs:       {r['jobs']} / {r['cpus']}")
+        print(f"Trozos (mayor):        {r['chunks']} ({r['largest_chunk']} caracteres)")
+        print(f"En serie:              {r['serial_s'] * 1000:9.3f} ms")
+        print(f"Por trozos:            {r['parallel_s'] * 1000:9.3f} ms")
+        print(f"Aceleración:           {r['speedup']:9.2f}x")
+        print(f"Mismo AST:             {'sí' if r['same_ast'] else 'NO'}")
+        print(f"Especializado:         {r['rd_s'] * 1000:9.3f} ms")
+        print(f"Mismo AST:             {'sí' if r['rd_same_ast'] else 'NO'}")
+        print(f"\nSolo sintáctico ({r['tokens']} tokens ya reconocidos)")
+        print(f"PLY:                   {r['ply_tokens_s'] * 1000:9.3f} ms")
+        print(f"Especializado:         {r['rd_tokens_s'] * 1000:9.3f} ms")
+        print(f"Aceleración:           {r['rd_speedup']:9.2f}x")
+    elif args.command == "compare":
+        # Sin línea base no hay con qué comparar: crearla es una decisión explícita
+        if not args.save and not os.path.exists(args.baseline):
+            print(f"❌ No existe la línea base {args.baseline}; "
+                  f"créala con 'python src/bench.py compare --save'", file=sys.stderr)
+            return 2
+        current = measure_corpus(args.samples, args.confidence)
+        print(f"Corpus: {len(current['corpus']['files'])} archivos, "
+              f"{current['corpus']['tokens']} tokens, {args.samples} muestras")
+        if args.save:
+            params = {'samples': args.samples, 'confidence': args.confidence,
+                      'engine': parsemod.engine}
+            path = save_results(args.baseline, params, current)
+            print(f"\n✓ Línea base guardada en: {path}")
+            return 0
+
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+        if baseline['corpus'] != current['corpus']:
+            print("⚠ El corpus cambió desde la línea base: los rendimientos son "
+                  "comparables por token, los picos de memoria quizá no")
+        rows = compare_metrics(baseline, current, args.threshold, args.memory_threshold)
+        print_comparison(rows)
+        regressions = [row[0] for row in rows if row[4]]
+        if regressions:
+            print(f"\n✗ Regresiones: {', '.join(regressions)}")
+            return 1
+        print("\n✓ Sin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Presupuesto global de errores compartido por el léxico, el sintáctico y el
+semántico.
+
+Cada fase llama a budget.charge(fase) al registrar un error. Cuando se
+alcanza el límite se lanza ErrorBudgetExceeded, la fase se detiene de
+inmediato y el mensaje de la excepción explica el motivo. Sin límite
+(None, valor por defecto) charge() solo cuenta.
+"""
+
+
+class ErrorBudgetExceeded(Exception):
+    """Se alcanzó el número máximo de errores permitido"""
+
+    def __init__(self, phase, limit):
+        self.phase = phase
+        self.limit = limit
+        super().__init__(
+            f"Límite de {limit} errores alcanzado durante el análisis {phase}: análisis detenido"
+        )
+
+
+class ErrorBudget:
+    """Contador de errores con límite opcional"""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.used = 0
+
+    def reset(self, limit=None):
+        self.limit = limit
+        self.used = 0
+
+    @property
+    def exhausted(self):
+        return self.limit is not None and self.used >= self.limit
+
+    def charge(self, phase):
+        """Registra un error de 'phase'; lanza ErrorBudgetExceeded al llegar al límite"""
+        self.used += 1
+        if self.limit is not None and self.used >= self.limit:
+            raise ErrorBudgetExceeded(phase, self.limit)
+
+
+budget = ErrorBudget()
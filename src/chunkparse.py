@@ -0,0 +1,168 @@
+"""
+Análisis sintáctico en paralelo por trozos de nivel superior.
+
+Un programa es una lista de elementos de nivel superior (funciones y
+sentencias) y la gramática no arrastra estado de uno a otro, así que el texto
+puede cortarse entre elementos y analizar cada trozo por separado. La
+búsqueda de los cortes es un barrido de la secuencia de tokens (la de la
+fase léxica, si se tiene) que sigue la profundidad de llaves, paréntesis y
+corchetes: hay corte tras un ';' o una '}' a profundidad cero (salvo que la
+'}' vaya seguida de 'else').
+
+Cada trozo se precede de tantos saltos de línea y espacios como hagan falta
+para que empiece en su línea y columna originales, de modo que las líneas del
+AST coinciden con las del análisis en serie. Si algún trozo tiene errores
+léxicos o sintácticos se repite el análisis completo en serie: la
+recuperación de errores depende del contexto y así los mensajes (y el cargo
+al presupuesto de errores) son exactamente los de parse_code. Con los tokens
+de la fase léxica el análisis en serie los reutiliza: volver a analizar el
+texto cargaría cada error léxico dos veces al presupuesto.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import tracing
+from budget import budget, ErrorBudget
+import parser as parsemod
+from lexer import build_lexer
+
+# Por debajo de este tamaño no compensa arrancar procesos
+MIN_PARALLEL_CHARS = 64 * 1024
+
+# Trozos por proceso: más de uno reparte mejor los elementos desiguales
+CHUNKS_PER_WORKER = 4
+
+_OPENING = frozenset(("LBRACE", "LPAREN", "LBRACKET"))
+_CLOSING = frozenset(("RBRACE", "RPAREN", "RBRACKET"))
+
+
+def scan_tokens(code):
+    """Tokens de 'code' con un presupuesto propio (no cuentan como errores del análisis)"""
+    lexer = build_lexer(error_budget=ErrorBudget())
+    lexer.input(code)
+    return list(iter(lexer.token, None))
+
+
+def find_item_boundaries(tokens):
+    """
+    Posiciones (exclusivas) en las que termina cada elemento de nivel superior.
+
+    Returns:
+        list | None: None si las llaves no están equilibradas
+    """
+    boundaries = []
+    depth = 0
+    pending = None  # fin de una '}' de nivel superior que aún puede seguir con 'else'
+    for tok in tokens:
+        kind = tok.type
+        if pending is not None:
+            if kind == "ELSE":
+                pending = None
+                continue
+            boundaries.append(pending)
+            pending = None
+        if kind in _OPENING:
+            depth += 1
+        elif kind in _CLOSING:
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and kind == "RBRACE":
+                pending = tok.lexpos + 1
+        elif kind == "SEMICOLON" and depth == 0:
+            boundaries.append(tok.lexpos + 1)
+    if depth != 0:
+        return None
+    if pending is not None:
+        boundaries.append(pending)
+    return boundaries
+
+
+def split_chunks(code, count, tokens=None):
+    """
+    Divide el código en unos 'count' trozos de tamaño parecido. 'tokens' son
+    los de 'code' si ya se tienen; si no, se analiza el texto aquí.
+
+    Returns:
+        list | None: textos de los trozos, ya con el relleno de posición
+    """
+    boundaries = find_item_boundaries(scan_tokens(code) if tokens is None else tokens)
+    if boundaries is None:
+        return None
+    target = len(code) / max(1, count)
+
+    # Lo que sigue al último elemento (espacios, comentarios) va con el
+    # último trozo: un trozo sin sentencias sería un error de sintaxis
+    cuts = [0]
+    for end in boundaries[:-1]:
+        if end - cuts[-1] >= target:
+            cuts.append(end)
+    cuts.append(len(code))
+
+    chunks = []
+    lines = 0
+    previous = 0
+    for start, end in zip(cuts, cuts[1:]):
+        # Relleno: las líneas y la columna que preceden al trozo
+        lines += code.count("\n", previous, start)
+        previous = start
+        column = start - (code.rfind("\n", 0, start) + 1)
+        chunks.append("\n" * lines + " " * column + code[start:end])
+    return chunks
+
+
+def _init_worker(engine, trace=None):
+    """Inicializa un proceso del análisis en paralelo"""
+    budget.reset()
+    parsemod.engine = engine
+    tracing.init_worker(trace)
+
+
+def _parse_chunk(text):
+    """Analiza un trozo; devuelve (sentencias, hay_errores)"""
+    lexer = build_lexer()
+    if tracing.enabled:
+        tracing.begin("parse chunk", "phase", chars=len(text))
+    ast, errors = parsemod.parse_code(text, lexer=lexer)
+    if tracing.enabled:
+        tracing.end()
+    if errors or lexer.errors or ast is None:
+        return None, True
+    return ast[1], False
+
+
+def parse_code_parallel(code, workers, tokens=None):
+    """
+    Como parser.parse_code, repartiendo los elementos de nivel superior entre
+    'workers' procesos. Con menos de MIN_PARALLEL_CHARS caracteres, un solo
+    proceso o errores en algún trozo, el análisis es el de parse_code.
+
+    'tokens' son los de la fase léxica, si ya se hizo: sirven para buscar los
+    cortes y para el análisis en serie, que así no vuelve a cargar los errores
+    léxicos al presupuesto.
+
+    Returns:
+        tuple: (ast, errores sintácticos, errores léxicos); los léxicos solo
+        si no se pasaron los tokens (ya los tiene quien los produjo)
+    """
+    chunks = None
+    if workers and workers > 1 and len(code) >= MIN_PARALLEL_CHARS:
+        chunks = split_chunks(code, workers * CHUNKS_PER_WORKER, tokens)
+
+    if chunks and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(parsemod.engine, tracing.worker_settings())) as pool:
+            results = list(pool.map(_parse_chunk, chunks))
+        if not any(failed for _, failed in results):
+            statements = []
+            for chunk_statements, _ in results:
+                statements.extend(chunk_statements)
+            parsemod.syntax_errors = []
+            return ("program", statements), [], []
+
+    if tokens is not None:
+        ast, errors = parsemod.parse_code(code, tokens)
+        return ast, errors, []
+    lexer = build_lexer()
+    ast, errors = parsemod.parse_code(code, lexer=lexer)
+    return ast, errors, lexer.errors
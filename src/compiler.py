@@ -0,0 +1,519 @@
+"""
+Compilador del AST verificado a bytecode para la máquina virtual (src/vm.py).
+
+Cada función (y el nivel superior del programa) se compila a un objeto Code:
+
+    ops     array('B') con los códigos de operación
+    args    array('i') paralelo con el operando de cada instrucción
+    lines   array('i') paralelo con la línea de origen (solo para errores)
+    consts  constantes de la función, sin repetidos
+
+Las variables se resuelven en tiempo de compilación a índices de ranura con
+ámbitos de bloque; las del ámbito exterior del nivel superior son globales y
+las funciones las leen con LOAD_GLOBAL/STORE_GLOBAL.
+
+Para reducir el número de instrucciones despachadas:
+  - los operadores binarios con una constante a la derecha la llevan en su
+    operando (índice + 1; 0 significa tomarla de la pila);
+  - los bucles evalúan la condición al final y saltan hacia atrás;
+  - FOR_STEP y FOR_ITER leen el destino del salto en la ranura siguiente.
+
+El AST no distingue un identificador de un literal de texto con forma de
+identificador (ambos son ("literal", texto)): si el nombre está declarado en
+el ámbito se trata como variable, igual que hace el análisis semántico.
+"""
+
+import math
+import re
+from array import array
+
+OPNAMES = (
+    "LOAD_CONST", "LOAD_LOCAL", "STORE_LOCAL", "LOAD_GLOBAL", "STORE_GLOBAL",
+    "ADD", "SUB", "MUL", "DIV", "MOD",
+    "EQ", "NE", "LT", "GT", "LE", "GE", "NOT",
+    "JUMP", "JUMP_IF_FALSE", "JUMP_IF_TRUE", "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP",
+    "CALL", "RETURN", "POP",
+    "BUILD_LIST", "BUILD_TUPLE", "INDEX", "STORE_INDEX", "TUPLE_GET",
+    "PRINT", "PRINTLN",
+    "FOR_STEP", "FOR_ITER", "HALT",
+)
+
+(LOAD_CONST, LOAD_LOCAL, STORE_LOCAL, LOAD_GLOBAL, STORE_GLOBAL,
+ ADD, SUB, MUL, DIV, MOD,
+ EQ, NE, LT, GT, LE, GE, NOT,
+ JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+ CALL, RETURN, POP,
+ BUILD_LIST, BUILD_TUPLE, INDEX, STORE_INDEX, TUPLE_GET,
+ PRINT, PRINTLN,
+ FOR_STEP, FOR_ITER, HALT) = range(len(OPNAMES))
+
+BINARY_OPS = {
+    '+': ADD, '-': SUB, '*': MUL, '/': DIV, '%': MOD,
+    '==': EQ, '!=': NE, '<': LT, '>': GT, '<=': LE, '>=': GE,
+}
+
+COMPOUND_OPS = {'+=': ADD, '-=': SUB, '*=': MUL, '/=': DIV, '%=': MOD}
+
+BINARY_OPCODES = frozenset(BINARY_OPS.values())
+
+_ESCAPES = {'n': "\n", 't': "\t", 'r': "\r", '0': "\0", '\\': "\\", '"': '"', "'": "'"}
+_ESCAPE = re.compile(r"\\(.)")
+
+
+def unescape(text):
+    """Interpreta las secuencias de escape de un literal de texto"""
+    if "\\" not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+# Aritmética de Rust compartida por el plegado de constantes, la VM y el
+# intérprete de árbol: la división entera trunca hacia cero
+def divide(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        if b == 0:
+            raise ZeroDivisionError("división entera por cero")
+        quotient = abs(a) // abs(b)
+        return quotient if (a < 0) == (b < 0) else -quotient
+    if b == 0:
+        return math.nan if a == 0 or a != a else math.copysign(math.inf, a) * math.copysign(1, b)
+    return a / b
+
+
+def remainder(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        if b == 0:
+            raise ZeroDivisionError("resto de división entera por cero")
+        return a - b * divide(a, b)
+    if b == 0:
+        return math.nan
+    return math.fmod(a, b)
+
+
+class CompileError(Exception):
+    """El AST no se puede compilar (nombre desconocido, break fuera de bucle...)"""
+
+    def __init__(self, message, line=0):
+        self.line = line
+        super().__init__(f"Línea {line}: {message}" if line else message)
+
+
+class Code:
+    """Bytecode de una función"""
+
+    __slots__ = ("name", "nparams", "nlocals", "ops", "args", "lines", "consts", "_const_index")
+
+    def __init__(self, name, nparams=0):
+        self.name = name
+        self.nparams = nparams
+        self.nlocals = 0
+        self.ops = array('B')
+        self.args = array('i')
+        self.lines = array('i')
+        self.consts = []
+        self._const_index = {}
+
+    def emit(self, op, arg=0, line=0):
+        """Añade una instrucción y devuelve su posición"""
+        self.ops.append(op)
+        self.args.append(arg)
+        self.lines.append(line)
+        return len(self.ops) - 1
+
+    def patch(self, position, target=None):
+        """Fija el destino de un salto (por defecto, la posición actual)"""
+        self.args[position] = len(self.ops) if target is None else target
+
+    def const(self, value):
+        """Índice de una constante; 1, 1.0 y true se guardan por separado"""
+        key = (type(value), value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def disassemble(self):
+        lines = [f"{self.name} (params={self.nparams}, locals={self.nlocals})"]
+        for pc, op in enumerate(self.ops):
+            arg = self.args[pc]
+            if op == LOAD_CONST:
+                detail = f"  ({self.consts[arg]!r})"
+            elif op in BINARY_OPCODES and arg:
+                detail = f"  (const {self.consts[arg - 1]!r})"
+            else:
+                detail = ""
+            lines.append(f"{pc:5d}  {OPNAMES[op]:<22}{arg:<6}{detail}")
+        return "\n".join(lines)
+
+
+class Program:
+    """Programa compilado: código del nivel superior y funciones"""
+
+    __slots__ = ("main", "functions", "function_index")
+
+    def __init__(self, main, functions, function_index):
+        self.main = main
+        self.functions = functions
+        self.function_index = function_index
+
+    def disassemble(self):
+        return "\n\n".join(code.disassemble() for code in [self.main] + self.functions)
+
+
+class _Loop:
+    __slots__ = ("breaks", "continues")
+
+    def __init__(self):
+        self.breaks = []
+        self.continues = []
+
+
+class Compiler:
+    """Traduce el AST de src/parser.py a un Program"""
+
+    def __init__(self):
+        self.code = None
+        self.scopes = []
+        self.globals = None
+        self.loops = []
+        self.line = 0
+        self.declarations = []
+        self.function_index = {}
+
+    # -- Ámbitos -------------------------------------------------------------
+
+    def new_slot(self):
+        slot = self.code.nlocals
+        self.code.nlocals += 1
+        return slot
+
+    def declare(self, name):
+        slot = self.new_slot()
+        self.scopes[-1][name] = slot
+        return slot
+
+    def resolve(self, name):
+        """(opcode de carga, opcode de almacenamiento, ranura) o None"""
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return LOAD_LOCAL, STORE_LOCAL, scope[name]
+        if self.globals is not None and name in self.globals:
+            return LOAD_GLOBAL, STORE_GLOBAL, self.globals[name]
+        return None
+
+    # -- Punto de entrada ----------------------------------------------------
+
+    def compile(self, ast):
+        self._collect_functions(ast)
+
+        # Nivel superior: sus variables del ámbito exterior serán globales
+        main = self.code = Code("<programa>")
+        self.scopes = [{}]
+        self.compile_statements(ast[1])
+        if "main" in self.function_index:
+            self.code.emit(CALL, self.function_index["main"], self.line)
+            self.code.emit(POP)
+        self.code.emit(HALT)
+        self.globals = self.scopes[0]
+
+        functions = [self._compile_function(node) for node in self.declarations]
+        return Program(main, functions, dict(self.function_index))
+
+    def _collect_functions(self, ast):
+        # Igual que semantic.register_functions: programa y bloques, sin cuerpos
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, tuple):
+                continue
+            if node[0] == "func_decl":
+                if node[1] not in self.function_index:
+                    self.function_index[node[1]] = len(self.declarations)
+                    self.declarations.append(node)
+            elif node[0] in ("program", "block"):
+                stack.extend(reversed(node[1]))
+
+    def _compile_function(self, node):
+        _, name, params, _, body, line = node
+        self.code = Code(name, len(params))
+        self.scopes = [{}]
+        self.line = line
+        for param in params:
+            self.declare(param[1])
+        self.compile_statements(body[1])
+        self.code.emit(LOAD_CONST, self.code.const(None), self.line)
+        self.code.emit(RETURN, 0, self.line)
+        return self.code
+
+    # -- Sentencias ----------------------------------------------------------
+
+    def compile_statements(self, statements):
+        for stmt in statements:
+            if stmt is not None:
+                getattr(self, "stmt_" + stmt[0])(stmt)
+
+    def stmt_var_decl(self, node):
+        _, name, _, value, _, line = node
+        self.line = line or self.line
+        if value is None:
+            self.code.emit(LOAD_CONST, self.code.const(None), self.line)
+        else:
+            self.expression(value)
+        # El valor se compila antes de declarar: 'let x = x + 1;' usa la x anterior
+        self.code.emit(STORE_LOCAL, self.declare(name), self.line)
+
+    def stmt_assign(self, node):
+        _, name, operator, value, line = node
+        self.line = line or self.line
+        target = self.resolve(name)
+        if target is None:
+            raise CompileError(f"Variable '{name}' no ha sido declarada", self.line)
+        load, store, slot = target
+        if operator == "=":
+            self.expression(value)
+        else:
+            self.code.emit(load, slot, self.line)
+            self.binary(COMPOUND_OPS[operator], value)
+        self.code.emit(store, slot, self.line)
+
+    def stmt_assign_index(self, node):
+        _, access, value, line = node
+        self.line = line or self.line
+        self.container(access[1])
+        self.expression(access[2])
+        self.expression(value)
+        self.code.emit(STORE_INDEX, 0, self.line)
+
+    def stmt_expr_stmt(self, node):
+        self.expression(node[1])
+        self.code.emit(POP)
+
+    def stmt_print(self, node):
+        _, keyword, args, _, line = node
+        self.line = line or self.line
+        for arg in args:
+            self.expression(arg)
+        self.code.emit(PRINTLN if keyword == "println" else PRINT, len(args), self.line)
+
+    def stmt_if(self, node):
+        _, condition, then_block, else_branch, line = node
+        self.line = line or self.line
+        self.expression(condition)
+        skip_then = self.code.emit(JUMP_IF_FALSE, 0, self.line)
+        self.stmt_block(then_block)
+        if else_branch is None:
+            self.code.patch(skip_then)
+            return
+        skip_else = self.code.emit(JUMP, 0, self.line)
+        self.code.patch(skip_then)
+        getattr(self, "stmt_" + else_branch[0])(else_branch)
+        self.code.patch(skip_else)
+
+    def stmt_while(self, node):
+        _, condition, body, line = node
+        self.line = line or self.line
+        enter = self.code.emit(JUMP, 0, self.line)
+        top = len(self.code.ops)
+        loop = self._loop_body(body)
+        check = len(self.code.ops)
+        self.code.patch(enter)
+        self.expression(condition)
+        self.code.emit(JUMP_IF_TRUE, top, self.line)
+        self._close_loop(loop, check)
+
+    def stmt_for(self, node):
+        _, var, iterable, body, line = node
+        self.line = line or self.line
+        self.scopes.append({})
+        if isinstance(iterable, tuple) and iterable[0] == "range":
+            # Ranuras consecutivas: variable de iteración y límite superior.
+            # El contador empieza en inicio - 1 porque FOR_STEP incrementa antes
+            # de comparar.
+            self.expression(iterable[1])
+            self.code.emit(SUB, self.code.const(1) + 1, self.line)
+            counter = self.declare(var)
+            self.code.emit(STORE_LOCAL, counter, self.line)
+            self.expression(iterable[2])
+            self.code.emit(STORE_LOCAL, self.new_slot(), self.line)
+            step_op, base = FOR_STEP, counter
+        else:
+            # Ranuras consecutivas: secuencia, índice y variable de iteración
+            self.expression(iterable)
+            base = self.new_slot()
+            self.code.emit(STORE_LOCAL, base, self.line)
+            self.code.emit(LOAD_CONST, self.code.const(0), self.line)
+            self.code.emit(STORE_LOCAL, self.new_slot(), self.line)
+            self.declare(var)
+            step_op = FOR_ITER
+        enter = self.code.emit(JUMP, 0, self.line)
+        top = len(self.code.ops)
+        loop = self._loop_body(body)
+        step = self.code.emit(step_op, base, self.line)
+        # Ranura con el destino del salto de FOR_STEP/FOR_ITER (no se despacha)
+        self.code.emit(JUMP, top, self.line)
+        self.code.patch(enter, step)
+        self._close_loop(loop, step)
+        self.scopes.pop()
+
+    def _loop_body(self, body):
+        loop = _Loop()
+        self.loops.append(loop)
+        self.stmt_block(body)
+        self.loops.pop()
+        return loop
+
+    def _close_loop(self, loop, continue_target):
+        for position in loop.continues:
+            self.code.patch(position, continue_target)
+        # Los break saltan a la instrucción siguiente al bucle
+        for position in loop.breaks:
+            self.code.patch(position, len(self.code.ops))
+
+    def stmt_break(self, node):
+        if not self.loops:
+            raise CompileError("'break' solo puede usarse dentro de un loop", node[1])
+        self.loops[-1].breaks.append(self.code.emit(JUMP, 0, node[1]))
+
+    def stmt_continue(self, node):
+        if not self.loops:
+            raise CompileError("'continue' solo puede usarse dentro de un loop", node[1])
+        self.loops[-1].continues.append(self.code.emit(JUMP, 0, node[1]))
+
+    def stmt_return(self, node):
+        _, value, line = node
+        self.line = line or self.line
+        if value is None:
+            self.code.emit(LOAD_CONST, self.code.const(None), self.line)
+        else:
+            self.expression(value)
+        self.code.emit(RETURN, 0, self.line)
+
+    def stmt_block(self, node):
+        self.scopes.append({})
+        self.compile_statements(node[1])
+        self.scopes.pop()
+
+    def stmt_func_decl(self, node):
+        # Las funciones se compilan aparte (ver compile)
+        pass
+
+    # -- Expresiones ---------------------------------------------------------
+
+    def expression(self, node):
+        """
+        Compila una expresión. Los binop y unop se recorren con una pila
+        explícita en lugar de recursión: una cadena 'a + b + ... + z' de cien
+        mil operandos es un árbol de cien mil niveles. La pila mezcla nodos
+        pendientes y acciones (callables) que emiten al volver de sus operandos.
+        """
+        pending = [node]
+        while pending:
+            item = pending.pop()
+            if callable(item):
+                item()
+            elif item[0] == "binop":
+                self._push_binop(item, pending)
+            elif item[0] == "unop":
+                pending.append(lambda: self.code.emit(NOT, 0, self.line))
+                pending.append(item[2])
+            else:
+                getattr(self, "expr_" + item[0])(item)
+
+    def _push_binop(self, node, pending):
+        """Apila un binop: izquierdo, (salto), derecho y la instrucción, en ese orden"""
+        _, operator, left, right = node
+        if operator in ("&&", "||"):
+            jump = JUMP_IF_FALSE_OR_POP if operator == "&&" else JUMP_IF_TRUE_OR_POP
+            position = []
+            pending.append(lambda: self.code.patch(position[0]))
+            pending.append(right)
+            pending.append(lambda: position.append(self.code.emit(jump, 0, self.line)))
+        else:
+            op = BINARY_OPS[operator]
+            value = self.constant_operand(right)
+            if value is not None:
+                pending.append(lambda: self.code.emit(op, self.code.const(value[0]) + 1, self.line))
+            else:
+                pending.append(lambda: self.code.emit(op, 0, self.line))
+                pending.append(right)
+        pending.append(left)
+
+    def expr_literal(self, node):
+        value = node[1]
+        if isinstance(value, str):
+            target = self.resolve(value)
+            if target is not None:
+                self.code.emit(target[0], target[2], self.line)
+                return
+            value = unescape(value)
+        self.code.emit(LOAD_CONST, self.code.const(value), self.line)
+
+    def constant_operand(self, node):
+        """(valor,) si 'node' es un literal constante (no una variable), si no None"""
+        if node[0] != "literal" or (isinstance(node[1], str) and self.resolve(node[1])):
+            return None
+        return (unescape(node[1]) if isinstance(node[1], str) else node[1],)
+
+    def binary(self, op, right):
+        """Emite 'op' con el operando derecho; las constantes van en el operando"""
+        value = self.constant_operand(right)
+        if value is not None:
+            self.code.emit(op, self.code.const(value[0]) + 1, self.line)
+        else:
+            self.expression(right)
+            self.code.emit(op, 0, self.line)
+
+    def expr_func_call(self, node):
+        _, name, args, line = node
+        line = line or self.line
+        index = self.function_index.get(name)
+        if index is None:
+            raise CompileError(f"Función '{name}' no ha sido declarada", line)
+        expected = len(self.declarations[index][2])
+        if len(args) != expected:
+            raise CompileError(
+                f"Función '{name}' espera {expected} argumentos, se recibieron {len(args)}", line)
+        for arg in args:
+            self.expression(arg)
+        self.code.emit(CALL, index, line)
+
+    def container(self, target):
+        """Carga el arreglo de un acceso: nombre de variable o acceso anidado"""
+        if isinstance(target, str):
+            resolved = self.resolve(target)
+            if resolved is None:
+                raise CompileError(f"Variable '{target}' no ha sido declarada", self.line)
+            self.code.emit(resolved[0], resolved[2], self.line)
+        else:
+            self.expression(target)
+
+    def expr_array_access(self, node):
+        _, target, index, line = node
+        self.container(target)
+        self.expression(index)
+        self.code.emit(INDEX, 0, line or self.line)
+
+    def expr_tuple_access(self, node):
+        _, name, position, line = node
+        self.container(name)
+        self.code.emit(TUPLE_GET, position, line or self.line)
+
+    def _sequence(self, node, op):
+        for element in node[1]:
+            self.expression(element)
+        self.code.emit(op, len(node[1]), node[2] or self.line)
+
+    def expr_vector(self, node):
+        self._sequence(node, BUILD_LIST)
+
+    def expr_array(self, node):
+        self._sequence(node, BUILD_LIST)
+
+    def expr_tuple(self, node):
+        self._sequence(node, BUILD_TUPLE)
+
+
+def compile_program(ast):
+    """Compila el AST de un programa ya verificado"""
+    return Compiler().compile(ast)
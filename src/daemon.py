@@ -0,0 +1,427 @@
+"""
+Daemon de análisis sobre un socket Unix.
+
+Protocolo: una petición JSON por línea y una respuesta JSON por línea.
+
+    {"id": 1, "op": "analyze", "path": "prog.rs"}
+    {"id": 2, "op": "analyze", "source": "fn main() {}", "timeout": 5, "max_errors": 50}
+    {"id": 3, "op": "ping"}
+
+Las peticiones 'analyze' se encolan (cola acotada: si está llena se responde
+de inmediato con "busy") y se reparten entre procesos trabajadores que
+construyen su lexer y su parser una sola vez, al arrancar. Cada consumidor
+de la cola tiene su propio trabajador y solo le da una tarea a la vez; si
+vence el plazo de la petición el proceso se mata y se arranca otro, así que
+el trabajo en curso nunca supera el número de trabajadores.
+
+Uso:
+    python src/daemon.py serve [--socket RUTA] [--workers N]
+    python src/daemon.py analyze archivo.rs [...]
+    python src/daemon.py loadtest archivo.rs [--requests N] [--concurrency C]
+"""
+
+import argparse
+import asyncio
+import getpass
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_SOCKET = os.path.join(
+    tempfile.gettempdir(), f"lng-{(getpass.getuser() or 'anon').replace(' ', '_')}.sock"
+)
+DEFAULT_TIMEOUT = 30.0
+
+
+# ============================================================================
+# TRABAJADORES
+# ============================================================================
+
+def _warm_worker():
+    """Inicializador del proceso: importar el parser construye sus tablas"""
+    import analysis  # noqa: F401
+
+
+def _analyze_job(path, source, max_errors=None):
+    """Tarea ejecutada en un proceso trabajador"""
+    import analysis
+
+    start = time.perf_counter()
+    if source is None:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    result = analysis.analyze_source(source, max_errors).to_dict()
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    result['worker'] = os.getpid()
+    return result
+
+
+def _worker_main(conn):
+    """Bucle del proceso trabajador: (ok, resultado o excepción) por cada tarea"""
+    _warm_worker()
+    conn.send(None)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, _analyze_job(*job)))
+        except Exception as e:
+            conn.send((False, e))
+
+
+class Worker:
+    """Un proceso trabajador dedicado; se reemplaza si vence el plazo de su tarea"""
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+
+    async def start(self):
+        """Arranca el proceso y espera a que tenga construido el parser"""
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+        await self._receive(None)
+
+    def kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+
+    async def run(self, job, timeout):
+        """Ejecuta 'job' en el trabajador; lanza asyncio.TimeoutError si no acaba a tiempo"""
+        self.conn.send(job)
+        try:
+            ok, value = await self._receive(timeout)
+        except asyncio.TimeoutError:
+            # Abandonar la tarea no basta: el proceso seguiría ocupado con ella
+            self.kill()
+            await self.start()
+            raise
+        if not ok:
+            raise value
+        return value
+
+    async def _receive(self, timeout):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = self.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        finally:
+            loop.remove_reader(fd)
+        try:
+            return self.conn.recv()
+        except EOFError:
+            # El proceso murió (p. ej. por falta de memoria): se reemplaza
+            self.kill()
+            await self.start()
+            raise RuntimeError("el proceso trabajador terminó inesperadamente") from None
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class AnalysisDaemon:
+    """Servidor asyncio con cola acotada y un trabajador precalentado por consumidor"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, workers=None, queue_size=64,
+                 timeout=DEFAULT_TIMEOUT):
+        self.socket_path = socket_path
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.queue = None
+        self.pool = []
+        self.server = None
+        self.consumers = []
+        self.counters = {'served': 0, 'busy': 0, 'timeouts': 0, 'failed': 0}
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # Todos los trabajadores arrancan antes de aceptar peticiones
+        self.pool = [Worker() for _ in range(self.workers)]
+        await asyncio.gather(*(worker.start() for worker in self.pool))
+        self.consumers = [asyncio.create_task(self._consume(worker)) for worker in self.pool]
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.consumers:
+            task.cancel()
+        for worker in self.pool:
+            worker.kill()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"✓ Daemon escuchando en {self.socket_path} ({self.workers} trabajadores)")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _consume(self, worker):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future, deadline = await self.queue.get()
+            try:
+                remaining = deadline - loop.time()
+                if future.cancelled():
+                    continue
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                # No se toma otra tarea hasta que esta acaba o se mata su proceso
+                result = await worker.run(job, remaining)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, path, source, timeout, max_errors=None):
+        """Encola una petición; lanza asyncio.QueueFull si no hay espacio"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.put_nowait(((path, source, max_errors), future, loop.time() + timeout))
+        return await future
+
+    async def _dispatch(self, request):
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "petición no válida: se espera un objeto JSON"}
+        op = request.get('op', "analyze")
+        if op == "ping":
+            return {'ok': True, 'pong': True}
+        if op == "stats":
+            return {'ok': True, 'queued': self.queue.qsize(), 'workers': self.workers,
+                    **self.counters}
+        if op != "analyze":
+            return {'ok': False, 'error': f"operación desconocida: {op}"}
+
+        path, source = request.get('path'), request.get('source')
+        if (path is None) == (source is None):
+            return {'ok': False, 'error': "se requiere 'path' o 'source'"}
+        try:
+            timeout = float(request.get('timeout', self.timeout))
+            result = await self.submit(path, source, timeout, request.get('max_errors'))
+        except asyncio.QueueFull:
+            self.counters['busy'] += 1
+            return {'ok': False, 'error': "busy"}
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            return {'ok': False, 'error': "timeout"}
+        except Exception as e:
+            self.counters['failed'] += 1
+            return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        self.counters['served'] += 1
+        return {'ok': True, **result}
+
+    async def _respond(self, request, writer, lock):
+        response = await self._dispatch(request)
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        async with lock:
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        # Las peticiones de una misma conexión se atienden concurrentemente;
+        # las respuestas llevan el 'id' de su petición
+        lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                task = asyncio.create_task(self._respond(request, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+# ============================================================================
+# CLIENTE
+# ============================================================================
+
+class DaemonClient:
+    """Cliente síncrono; envía peticiones de una en una por la misma conexión"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.stream = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def request(self, message):
+        self.next_id += 1
+        message = dict(message, id=self.next_id)
+        self.stream.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("el daemon cerró la conexión")
+        return json.loads(line)
+
+    def analyze(self, path=None, source=None, timeout=None):
+        message = {'op': "analyze"}
+        if path is not None:
+            message['path'] = os.path.abspath(path)
+        if source is not None:
+            message['source'] = source
+        if timeout is not None:
+            message['timeout'] = timeout
+        return self.request(message)
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# BENCHMARK DE CARGA
+# ============================================================================
+
+def load_test(socket_path, source, requests=200, concurrency=8):
+    """
+    Envía 'requests' análisis repartidos en 'concurrency' conexiones.
+
+    Returns:
+        dict: rendimiento (peticiones/s), latencias p50/p95/máx y respuestas fallidas
+    """
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+
+    def run(count):
+        with DaemonClient(socket_path) as client:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.analyze(source=source)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if not response.get('ok'):
+                        failures.append(response.get('error'))
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in per_thread]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(int(p * len(latencies)), len(latencies) - 1)] * 1000
+
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(total, 3),
+        'throughput': round(len(latencies) / total, 1) if total else 0.0,
+        'p50_ms': round(pct(0.50), 3),
+        'p95_ms': round(pct(0.95), 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'failed': len(failures),
+    }
+
+
+# ============================================================================
+# LÍNEA DE COMANDOS
+# ============================================================================
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Daemon de análisis sobre socket Unix")
+    ap.add_argument("--socket", default=DEFAULT_SOCKET, help="Ruta del socket Unix")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Arranca el daemon")
+    serve.add_argument("--workers", type=int, default=None, help="Procesos trabajadores")
+    serve.add_argument("--queue", type=int, default=64, help="Peticiones en espera admitidas")
+    serve.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                       help="Plazo por petición en segundos")
+
+    analyze = sub.add_parser("analyze", help="Analiza archivos usando el daemon")
+    analyze.add_argument("files", nargs="+")
+    analyze.add_argument("--timeout", type=float, default=None)
+
+    load = sub.add_parser("loadtest", help="Benchmark de carga contra el daemon")
+    load.add_argument("file")
+    load.add_argument("--requests", type=int, default=200)
+    load.add_argument("--concurrency", type=int, default=8)
+
+    args = ap.parse_args(argv)
+
+    if args.command == "serve":
+        daemon = AnalysisDaemon(args.socket, args.workers, args.queue, args.timeout)
+        try:
+            asyncio.run(daemon.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "analyze":
+        status = 0
+        with DaemonClient(args.socket) as client:
+            for path in args.files:
+                response = client.analyze(path=path, timeout=args.timeout)
+                if not response.get('ok'):
+                    print(f"✗ {path}: {response.get('error')}")
+                    status = 2
+                    continue
+                errors = (response['lex_errors'] + response['syntax_errors']
+                          + response['semantic_errors'])
+                print(f"{'✓' if not errors else '✗'} {path}: {len(errors)} errores "
+                      f"({response['elapsed_ms']} ms)")
+                for err in errors:
+                    print(f"  - {err}")
+                if errors:
+                    status = max(status, 1)
+        return status
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        source = f.read()
+    print(json.dumps(load_test(args.socket, source, args.requests, args.concurrency), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Plegado de constantes sobre el AST.
+
+Se ejecuta entre parse_code y semantic.analyze: cada subárbol binop/unop cuyos
+operandos son literales se sustituye por un único nodo ("literal", valor).
+Solo se pliega cuando el tipo del resultado coincide con el que calcularía
+el semántico (aritmética entre números, comparaciones entre números o entre
+booleanos, lógica entre booleanos), así que los diagnósticos no cambian.
+Las divisiones entre cero se dejan para la ejecución.
+
+Los literales de texto no se pliegan: en el AST no se distinguen de los
+identificadores.
+
+Tras fold_constants(ast):
+    folded_constants  un registro por subárbol plegado, con la línea de la
+                      sentencia que lo contiene, el valor y los nodos eliminados
+    removed_nodes     total de nodos eliminados
+"""
+
+from compiler import divide, remainder
+
+folded_constants = []
+removed_nodes = 0
+
+# Posición del número de línea en los nodos que lo llevan
+LINE_INDEX = {
+    "var_decl": 5, "func_decl": 5, "if": 4, "while": 3, "for": 4,
+    "assign": 4, "assign_index": 3, "print": 4, "return": 2,
+    "break": 1, "continue": 1, "func_call": 3, "array_access": 3,
+    "tuple_access": 3, "vector": 2, "array": 2, "tuple": 2,
+}
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': divide,
+    '%': remainder,
+}
+
+COMPARISON = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def fold_value(operator, left, right):
+    """
+    Evalúa 'left operator right' sobre valores literales.
+
+    Returns:
+        tuple: (True, valor) si se puede plegar, (False, None) si no
+    """
+    if operator in ARITHMETIC:
+        if _is_number(left) and _is_number(right):
+            if right == 0 and operator in ('/', '%'):
+                return False, None
+            return True, ARITHMETIC[operator](left, right)
+    elif operator in COMPARISON:
+        both_numbers = _is_number(left) and _is_number(right)
+        both_bools = isinstance(left, bool) and isinstance(right, bool)
+        if both_numbers or both_bools:
+            return True, COMPARISON[operator](left, right)
+    elif operator in ('&&', '||'):
+        if isinstance(left, bool) and isinstance(right, bool):
+            return True, (left and right) if operator == '&&' else (left or right)
+    return False, None
+
+
+def _constant(node):
+    """(True, valor) si el nodo es un literal plegable"""
+    if isinstance(node, tuple) and len(node) == 2 and node[0] == "literal":
+        value = node[1]
+        if isinstance(value, (bool, int, float)):
+            return True, value
+    return False, None
+
+
+def _fold_node(node):
+    """Intenta plegar un binop/unop con hijos ya plegados; devuelve (literal, eliminados)"""
+    if node[0] == "binop":
+        ok_left, left = _constant(node[2])
+        ok_right, right = _constant(node[3])
+        if ok_left and ok_right:
+            ok, value = fold_value(node[1], left, right)
+            if ok:
+                return ("literal", value), 2
+    elif node[0] == "unop" and node[1] == '!':
+        ok, value = _constant(node[2])
+        if ok and isinstance(value, bool):
+            return ("literal", not value), 1
+    return None, 0
+
+
+def fold_constants(ast):
+    """
+    Pliega las expresiones constantes del AST (sin recursión).
+
+    Returns:
+        El AST resultante; los nodos sin cambios se comparten con el original
+    """
+    global folded_constants, removed_nodes
+    folded_constants = []
+    removed_nodes = 0
+    if ast is None:
+        return None
+
+    # Preorden con la línea de la sentencia más cercana
+    order = []
+    stack = [(ast, 0)]
+    while stack:
+        node, line = stack.pop()
+        if isinstance(node, tuple):
+            if node and isinstance(node[0], str):
+                index = LINE_INDEX.get(node[0])
+                if index is not None and index < len(node) and isinstance(node[index], int):
+                    line = node[index] or line
+            order.append((node, line))
+            stack.extend((child, line) for child in node if isinstance(child, (tuple, list)))
+        elif isinstance(node, list):
+            order.append((node, line))
+            stack.extend((child, line) for child in node if isinstance(child, (tuple, list)))
+
+    # En preorden inverso los hijos se procesan antes que sus padres
+    replaced = {}
+    records = {}
+    for node, line in reversed(order):
+        children = [replaced.get(id(child), child) for child in node]
+        changed = any(new is not old for new, old in zip(children, node))
+        current = (tuple(children) if isinstance(node, tuple) else children) if changed else node
+
+        if isinstance(current, tuple) and current and current[0] in ("binop", "unop"):
+            literal, removed = _fold_node(current)
+            if literal is not None:
+                removed_nodes += removed
+                # Un plegado que contiene a otros los sustituye en el registro
+                for child in current[2:]:
+                    inner = records.pop(id(child), None)
+                    if inner is not None:
+                        removed += inner['nodes']
+                records[id(literal)] = {'line': line, 'value': literal[1], 'nodes': removed}
+                current = literal
+                changed = True
+
+        if changed:
+            replaced[id(node)] = current
+
+    folded_constants = sorted(records.values(), key=lambda r: r['line'])
+    return replaced.get(id(ast), ast)
@@ -0,0 +1,28 @@
+"""
+Internado de identificadores y literales de texto.
+
+Cada análisis usa un Interner (lo crea lexer.build_lexer) que guarda una
+única instancia de str para cada texto distinto. Los tokens, el AST y las
+tablas del semántico comparten así la misma cadena para cada nombre: las
+búsquedas en diccionarios se resuelven por identidad y los nombres repetidos
+no se duplican en memoria.
+"""
+
+
+class Interner:
+    """Tabla texto -> instancia canónica del texto"""
+
+    __slots__ = ("_texts",)
+
+    def __init__(self):
+        self._texts = {}
+
+    def intern(self, text):
+        """Devuelve la instancia canónica de 'text' (la registra si es nueva)"""
+        return self._texts.setdefault(text, text)
+
+    def __contains__(self, text):
+        return text in self._texts
+
+    def __len__(self):
+        return len(self._texts)
@@ -0,0 +1,232 @@
+"""
+Intérprete directo sobre el AST (tree-walking).
+
+Es la referencia sencilla con la que se compara la máquina virtual de
+src/vm.py: recorre el AST recursivamente, guarda las variables en una pila de
+diccionarios por ámbito y usa excepciones para break, continue y return.
+Produce la misma salida que la VM.
+"""
+
+import sys
+
+from compiler import CompileError, divide, remainder, unescape
+from vm import VMError, render_print
+
+
+class _Break(Exception):
+    pass
+
+
+class _Continue(Exception):
+    pass
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': divide,
+    '%': remainder,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class Interpreter:
+    """Evalúa un programa recorriendo su AST"""
+
+    def __init__(self, output=None):
+        self.output = output or sys.stdout.write
+        self.functions = {}
+        self.globals = {}
+        self.scopes = []
+        self.line = 0
+
+    # -- Variables -----------------------------------------------------------
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope
+        if name in self.globals:
+            return self.globals
+        return None
+
+    # -- Ejecución -----------------------------------------------------------
+
+    def run(self, ast):
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, tuple):
+                if node[0] == "func_decl":
+                    self.functions.setdefault(node[1], node)
+                elif node[0] in ("program", "block"):
+                    stack.extend(reversed(node[1]))
+
+        self.scopes = [self.globals]
+        try:
+            self.execute_all(ast[1])
+            if "main" in self.functions:
+                self.call("main", [])
+        except _Return:
+            pass
+        except (ZeroDivisionError, IndexError, TypeError) as e:
+            message = "índice fuera de rango" if isinstance(e, IndexError) else str(e)
+            raise VMError(message, self.line) from None
+
+    def execute_all(self, statements):
+        for stmt in statements:
+            if stmt is not None:
+                self.execute(stmt)
+
+    def execute(self, node):
+        kind = node[0]
+        if kind == "var_decl":
+            self.line = node[5] or self.line
+            value = self.evaluate(node[3]) if node[3] is not None else None
+            self.scopes[-1][node[1]] = value
+        elif kind == "assign":
+            _, name, operator, value, line = node
+            self.line = line or self.line
+            scope = self.lookup(name)
+            if scope is None:
+                raise CompileError(f"Variable '{name}' no ha sido declarada", self.line)
+            result = self.evaluate(value)
+            if operator != "=":
+                result = ARITHMETIC[operator[0]](scope[name], result)
+            scope[name] = result
+        elif kind == "assign_index":
+            _, access, value, line = node
+            self.line = line or self.line
+            container = self.container(access[1])
+            index = self.evaluate(access[2])
+            if index < 0:
+                raise IndexError(index)
+            container[index] = self.evaluate(value)
+        elif kind == "expr_stmt":
+            self.evaluate(node[1])
+        elif kind == "print":
+            self.line = node[4] or self.line
+            values = [self.evaluate(arg) for arg in node[2]]
+            self.output(render_print(values) + ("\n" if node[1] == "println" else ""))
+        elif kind == "if":
+            self.line = node[4] or self.line
+            if self.evaluate(node[1]):
+                self.execute(node[2])
+            elif node[3] is not None:
+                self.execute(node[3])
+        elif kind == "while":
+            self.line = node[3] or self.line
+            while self.evaluate(node[1]):
+                try:
+                    self.execute(node[2])
+                except _Break:
+                    break
+                except _Continue:
+                    continue
+        elif kind == "for":
+            self.line = node[4] or self.line
+            iterable = node[2]
+            if isinstance(iterable, tuple) and iterable[0] == "range":
+                values = range(self.evaluate(iterable[1]), self.evaluate(iterable[2]))
+            else:
+                values = list(self.evaluate(iterable))
+            for value in values:
+                self.scopes.append({node[1]: value})
+                try:
+                    self.execute(node[3])
+                except _Break:
+                    break
+                except _Continue:
+                    continue
+                finally:
+                    self.scopes.pop()
+        elif kind == "block":
+            self.scopes.append({})
+            try:
+                self.execute_all(node[1])
+            finally:
+                self.scopes.pop()
+        elif kind == "return":
+            value = self.evaluate(node[1]) if node[1] is not None else None
+            raise _Return(value)
+        elif kind == "break":
+            raise _Break()
+        elif kind == "continue":
+            raise _Continue()
+
+    def call(self, name, values):
+        function = self.functions.get(name)
+        if function is None:
+            raise CompileError(f"Función '{name}' no ha sido declarada", self.line)
+        params = function[2]
+        saved = self.scopes
+        self.scopes = [{param[1]: value for param, value in zip(params, values)}]
+        try:
+            self.execute_all(function[4][1])
+        except _Return as r:
+            return r.value
+        finally:
+            self.scopes = saved
+        return None
+
+    # -- Expresiones ---------------------------------------------------------
+
+    def container(self, target):
+        if isinstance(target, str):
+            scope = self.lookup(target)
+            if scope is None:
+                raise CompileError(f"Variable '{target}' no ha sido declarada", self.line)
+            return scope[target]
+        return self.evaluate(target)
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == "literal":
+            value = node[1]
+            if isinstance(value, str):
+                scope = self.lookup(value)
+                if scope is not None:
+                    return scope[value]
+                return unescape(value)
+            return value
+        if kind == "binop":
+            operator = node[1]
+            left = self.evaluate(node[2])
+            if operator == "&&":
+                return left and self.evaluate(node[3])
+            if operator == "||":
+                return left or self.evaluate(node[3])
+            return ARITHMETIC[operator](left, self.evaluate(node[3]))
+        if kind == "unop":
+            return not self.evaluate(node[2])
+        if kind == "func_call":
+            return self.call(node[1], [self.evaluate(arg) for arg in node[2]])
+        if kind == "array_access":
+            sequence = self.container(node[1])
+            index = self.evaluate(node[2])
+            if index < 0:
+                raise IndexError(index)
+            return sequence[index]
+        if kind == "tuple_access":
+            return self.container(node[1])[node[2]]
+        if kind in ("vector", "array"):
+            return [self.evaluate(element) for element in node[1]]
+        if kind == "tuple":
+            return tuple(self.evaluate(element) for element in node[1])
+        raise CompileError(f"Expresión no soportada: {kind}", self.line)
+
+
+def interpret(ast, output=None):
+    """Ejecuta un AST ya verificado con el intérprete de árbol"""
+    Interpreter(output).run(ast)
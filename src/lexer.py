@@ -1,4 +1,6 @@
 import ply.lex as lex
+from budget import budget
+from interner import Interner
 
 reserved = {
     "let": "LET",
@@ -103,13 +105,13 @@ char_escape = r"(\\.|[^'\\])"
 @lex.TOKEN(r'"' + string_escape + r'"')
 def t_STRING(t):
     # devuelve contenido sin comillas
-    t.value = t.value[1:-1]
+    t.value = t.lexer.interner.intern(t.value[1:-1])
     return t
 
 
 @lex.TOKEN(r"'" + char_escape + r"'")
 def t_CHAR(t):
-    t.value = t.value[1:-1]
+    t.value = t.lexer.interner.intern(t.value[1:-1])
     return t
 
 
@@ -128,19 +130,21 @@ def t_INTEGER(t):
 def t_ID(t):
     r"[a-zA-Z_][a-zA-Z0-9_]*"
     t.type = reserved.get(t.value, "ID")
+    if t.type == "ID":
+        t.value = t.lexer.interner.intern(t.value)
     return t
 
 
 # Paul Perdomo
 def t_COMMENT_SINGLE(t):
     r"//[^\n]*"
-    t.lexer.lineno += 1
+    # El salto de línea final lo contabiliza t_newline
     pass
 
 
 def t_COMMENT_MULTI(t):
     r"/\*[\s\S]*?\*/"
-    t.lexer.lineno += t.value.count("\\n")
+    t.lexer.lineno += t.value.count("\n")
     pass
 
 
@@ -153,9 +157,76 @@ def t_newline(t):
     t.lexer.lineno += t.value.count("\n")
 
 
+class LexError:
+    """Error léxico: tramo de caracteres ilegales consecutivos"""
+
+    __slots__ = ("line", "column", "lexpos", "text")
+
+    def __init__(self, line, column, lexpos, text):
+        self.line = line
+        self.column = column
+        self.lexpos = lexpos
+        self.text = text
+
+    def __str__(self):
+        if len(self.text) == 1:
+            return f"Illegal character '{self.text}' at line {self.line}, column {self.column}"
+        end = self.column + len(self.text) - 1
+        return (f"Illegal characters '{self.text}' at line {self.line}, "
+                f"columns {self.column}-{end}")
+
+    def __repr__(self):
+        return f"LexError({self.line}, {self.column}, {self.text!r})"
+
+
+def _starts_token(lexer, pos):
+    """Indica si en 'pos' empieza un token válido o un carácter ignorado"""
+    data = lexer.lexdata
+    if data[pos] in lexer.lexignore:
+        return True
+    for regex, _ in lexer.lexre:
+        if regex.match(data, pos):
+            return True
+    return False
+
+
 def t_error(t):
-    print(f"Illegal character '{t.value[0]}' at line {t.lexer.lineno}")
-    t.lexer.skip(1)
+    # Los caracteres ilegales consecutivos se agrupan en un único error
+    lexer = t.lexer
+    data = lexer.lexdata
+    start = lexer.lexpos
+    end = start + 1
+    while end < len(data) and not _starts_token(lexer, end):
+        end += 1
+
+    column = start - data.rfind("\n", 0, start)
+    lexer.errors.append(LexError(lexer.lineno, column, start, data[start:end]))
+    lexer.skip(end - start)
+    lexer.budget.charge("léxico")
 
 
 lexer = lex.lex()
+lexer.errors = []
+lexer.interner = Interner()
+lexer.budget = budget
+
+
+def build_lexer(interner=None, error_budget=None):
+    """
+    Crea un lexer independiente (tablas compartidas, estado propio) con su
+    propia lista de errores en 'errors'. Cada hilo o análisis debe usar el
+    suyo: el lexer no escribe nada en stdout.
+
+    Los identificadores y literales de texto se internan en 'interner' (uno
+    nuevo si no se pasa); compartirlo entre archivos unifica sus nombres.
+
+    Los errores se cargan a 'error_budget' (por defecto el presupuesto
+    global, que comparten las tres fases del análisis); quien analiza texto
+    fuera del pipeline, como el resaltado del editor, pasa uno propio.
+    """
+    lx = lexer.clone()
+    lx.lineno = 1
+    lx.errors = []
+    lx.interner = interner if interner is not None else Interner()
+    lx.budget = error_budget if error_budget is not None else budget
+    return lx
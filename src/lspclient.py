@@ -0,0 +1,135 @@
+"""
+Cliente mínimo del servidor de lenguaje (src/server.py) por stdio.
+
+Sirve para probar el servidor en local sin un editor: arranca
+'main.py --server' como subproceso y ejecuta una sesión guionizada.
+
+Uso:
+    python src/lspclient.py ARCHIVO LÍNEA:COLUMNA
+
+La sesión envía initialize, didOpen de ARCHIVO (muestra los diagnósticos),
+hover y definition en LÍNEA:COLUMNA (base 1, como los mensajes de error),
+shutdown y exit. Sale con el código del servidor.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(os.path.dirname(HERE), "main.py")
+
+
+class LanguageClient:
+    """Habla JSON-RPC con un servidor LSP lanzado como subproceso"""
+
+    def __init__(self, command=None):
+        self.process = subprocess.Popen(command or [sys.executable, MAIN, "--server"],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.next_id = 1
+        self.notifications = []   # notificaciones recibidas mientras se esperaba una respuesta
+
+    def _send(self, message):
+        message['jsonrpc'] = "2.0"
+        body = json.dumps(message).encode("utf-8")
+        self.process.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.process.stdin.flush()
+
+    def _receive(self):
+        length = None
+        while True:
+            header = self.process.stdout.readline()
+            if not header:
+                raise ConnectionError("el servidor cerró la conexión")
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        return json.loads(self.process.stdout.read(length).decode("utf-8"))
+
+    def notify(self, method, params=None):
+        self._send({'method': method, 'params': params or {}})
+
+    def request(self, method, params=None):
+        """Envía una petición y devuelve su respuesta (con 'result' o 'error')"""
+        request_id = self.next_id
+        self.next_id += 1
+        self._send({'id': request_id, 'method': method, 'params': params or {}})
+        while True:
+            message = self._receive()
+            if message.get('id') == request_id:
+                return message
+            self.notifications.append(message)
+
+    def wait_notification(self, method):
+        """Primera notificación 'method' pendiente (o la siguiente que llegue)"""
+        for i, message in enumerate(self.notifications):
+            if message.get('method') == method:
+                return self.notifications.pop(i)
+        while True:
+            message = self._receive()
+            if message.get('method') == method:
+                return message
+            self.notifications.append(message)
+
+    def open(self, path):
+        """didOpen de un archivo; devuelve (uri, diagnósticos publicados)"""
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        uri = "file://" + os.path.abspath(path)
+        self.notify("textDocument/didOpen", {
+            'textDocument': {'uri': uri, 'languageId': "rust", 'version': 1, 'text': text}})
+        return uri, self.wait_notification("textDocument/publishDiagnostics")['params']['diagnostics']
+
+    def position(self, method, uri, line, character):
+        """Petición sobre una posición LSP (base 0)"""
+        return self.request(method, {'textDocument': {'uri': uri},
+                                     'position': {'line': line, 'character': character}})
+
+    def close(self):
+        """shutdown + exit; devuelve el código de salida del servidor"""
+        self.request("shutdown")
+        self.notify("exit")
+        self.process.stdin.close()
+        return self.process.wait()
+
+
+def run_session(path, line, column):
+    """Sesión guionizada sobre 'path' en (line, column), ambos en base 1"""
+    client = LanguageClient()
+    try:
+        initialize = client.request("initialize", {'processId': os.getpid(), 'capabilities': {}})
+        print("initialize:", json.dumps(initialize.get('result', initialize.get('error'))))
+        client.notify("initialized")
+
+        uri, diagnostics = client.open(path)
+        print(f"diagnósticos: {len(diagnostics)}")
+        for diagnostic in diagnostics:
+            start = diagnostic['range']['start']
+            print(f"  {start['line'] + 1}:{start['character'] + 1} {diagnostic['message']}")
+
+        for method in ("textDocument/hover", "textDocument/definition"):
+            response = client.position(method, uri, line - 1, column - 1)
+            print(f"{method.split('/')[1]}:", json.dumps(response.get('result', response.get('error')),
+                                                          ensure_ascii=False))
+    finally:
+        code = client.close()
+    print(f"servidor terminado con código {code}")
+    return code
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sesión de prueba contra el servidor de lenguaje")
+    ap.add_argument("archivo")
+    ap.add_argument("posicion", metavar="LÍNEA:COLUMNA")
+    args = ap.parse_args(argv)
+    line, _, column = args.posicion.partition(":")
+    return run_session(args.archivo, int(line), int(column or 1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
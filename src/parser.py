@@ -1,9 +1,16 @@
 import ply.yacc as yacc
 from lexer import tokens
+from budget import budget, ErrorBudgetExceeded
 
 # Lista para almacenar errores sintácticos
 syntax_errors = []
 
+# Motor de análisis de parse_code: "ply" (tablas LALR) o "rd" (rdparser.py)
+engine = "ply"
+
+# Literales booleanos: el token guarda el texto, el AST el bool
+BOOLEAN_TOKENS = ("TRUE", "FALSE")
+
 # Precedencia y asociatividad de operadores
 precedence = (
     ("left", "OR"),
@@ -25,10 +32,11 @@ def p_program(p):
 def p_statement_list(p):
     """statement_list : statement_list statement
     | statement"""
+    # Las sentencias descartadas por recuperación de errores llegan como None
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[0] = p[1] + [p[2]] if p[2] is not None else p[1]
     else:
-        p[0] = [p[1]]
+        p[0] = [p[1]] if p[1] is not None else []
 
 
 def p_statement(p):
@@ -193,6 +201,10 @@ def p_expression_primary(p):
     if len(p) == 2:
         if isinstance(p[1], tuple):
             p[0] = p[1]
+        elif p.slice[1].type in BOOLEAN_TOKENS:
+            # El token conserva el texto 'true'/'false' para los mensajes y
+            # el log; el AST lleva un bool, igual que los números
+            p[0] = ("literal", p.slice[1].type == "TRUE")
         else:
             p[0] = ("literal", p[1])
     else:
@@ -322,6 +334,28 @@ def p_block(p):
         p[0] = ("block", [])
 
 
+# RECUPERACIÓN DE ERRORES (modo pánico)
+# Tras un error, PLY descarta tokens hasta poder sincronizar en ';' o en un
+# bloque completo '{ ... }' (nivel de sentencia), o en el '}' que cierra el
+# bloque actual. La sentencia dañada se omite del AST y el resto del programa
+# sigue disponible para el análisis semántico.
+def p_statement_error(p):
+    """statement : error SEMICOLON
+    | error block
+    | error block ELSE block
+    | error block ELSE if_statement"""
+    p[0] = None
+
+
+def p_block_error(p):
+    """block : LBRACE error RBRACE
+    | LBRACE statement_list error RBRACE"""
+    if len(p) == 5:
+        p[0] = ("block", p[2])
+    else:
+        p[0] = ("block", [])
+
+
 # DECLARACIÓN DE FUNCIONES - Danilo Drouet
 def p_function_declaration(p):
     """function_declaration : FN ID LPAREN parameter_list RPAREN block
@@ -425,21 +459,55 @@ def p_error(p):
         error_msg = "Error de sintaxis: fin de archivo inesperado"
         syntax_errors.append(error_msg)
 
-    parser.errok()
+    budget.charge("sintáctico")
+
+    # No se llama a parser.errok(): PLY entra en modo recuperación y no informa
+    # nuevos errores hasta que las reglas con 'error' resincronizan el análisis
 
 
 parser = yacc.yacc()
 
 
-def parse_code(code):
+def parse_code(code, tokens=None, lexer=None):
     """
-    Analiza el código y retorna el AST y los errores
+    Analiza el código y retorna el AST y los errores.
+
+    Si se pasan los tokens ya reconocidos (p. ej. los de la fase léxica) se
+    usan directamente en lugar de volver a ejecutar el lexer. Si se pasa un
+    lexer, sus errores quedan en lexer.errors; si no, se crea uno nuevo.
+    Si se agota el presupuesto de errores el análisis se detiene: el AST es
+    None y el último error explica el motivo.
+
+    Con engine = "rd" el análisis lo hace el parser especializado de
+    rdparser.py, que produce el mismo AST y los mismos errores.
     """
-    from lexer import lexer
+    if engine == "rd":
+        import rdparser
+        return rdparser.parse_code(code, tokens=tokens, lexer=lexer)
+    return parse_with_ply(code, tokens=tokens, lexer=lexer)
+
+
+def parse_with_ply(code, tokens=None, lexer=None):
+    """parse_code con el parser LALR de PLY, sea cual sea 'engine'"""
+    from lexer import build_lexer
 
     global syntax_errors
     syntax_errors = []
 
-    result = parser.parse(code, lexer=lexer)
+    if lexer is None:
+        lexer = build_lexer()
+    lexer.lineno = 1
+    tokenfunc = _token_source(tokens) if tokens is not None else None
+    try:
+        result = parser.parse(code, lexer=lexer, tokenfunc=tokenfunc)
+    except ErrorBudgetExceeded as e:
+        syntax_errors.append(str(e))
+        result = None
+
+    return result, syntax_errors
+
 
-    return result, syntax_errors
\ No newline at end of file
+def _token_source(tokens):
+    """Función de tokens para PLY sobre una lista ya reconocida (None al final)"""
+    it = iter(tokens)
+    return lambda: next(it, None)
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Análisis de proyectos de varios archivos .rs con una tabla de funciones común.
+
+Cada archivo se analiza por separado, pero las llamadas se comprueban contra
+las funciones de todo el proyecto. El trabajo se reparte entre procesos en
+dos fases, con una mezcla de resultados entre ellas:
+
+    map     cada proceso analiza sintácticamente un archivo y extrae las
+            firmas de sus funciones (semantic.function_signatures)
+    reduce  las firmas se mezclan, en el orden de los archivos, en la tabla
+            global; una función declarada en dos archivos es un error en el
+            segundo
+    check   cada proceso recibe la tabla global una sola vez (al arrancar) y
+            analiza los archivos con analysis.analyze_source, pasándola como
+            'external' (las funciones del propio archivo tienen prioridad)
+
+Los procesos solo intercambian firmas y listas de errores: los AST no viajan
+entre procesos y cada archivo se vuelve a analizar en la fase check.
+
+Uso:
+    python main.py --project DIR [--jobs N] [--max-errors N]
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import analysis
+import lexer as lexmod
+import parser as parsemod
+import semantic as semmod
+import tracing
+from budget import budget
+from stats import stats
+from watch import iter_sources
+
+# Tabla global de la fase check en cada proceso: nombre -> firma
+_global_table = {}
+
+
+class FileReport:
+    """Errores de un archivo del proyecto"""
+
+    def __init__(self, path, lex_errors, syntax_errors, semantic_errors):
+        self.path = path
+        self.lex_errors = lex_errors
+        self.syntax_errors = syntax_errors
+        self.semantic_errors = semantic_errors
+
+    @property
+    def errors(self):
+        return self.lex_errors + self.syntax_errors + self.semantic_errors
+
+
+class ProjectResult:
+    """Resultado de analyze_project"""
+
+    def __init__(self, files, functions, duplicates):
+        self.files = files            # [FileReport] en el orden de entrada
+        self.functions = functions    # nombre -> (firma, archivo, línea)
+        self.duplicates = duplicates  # [(nombre, archivo, línea, archivo previo, línea previa)]
+
+    @property
+    def error_count(self):
+        return sum(len(report.errors) for report in self.files)
+
+
+def find_sources(root):
+    """Archivos .rs del árbol, ordenados (el orden decide los duplicados)"""
+    return sorted(iter_sources(root))
+
+
+def _read(path):
+    if tracing.enabled:
+        tracing.current_file = path
+    with stats.phase("read"), open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _init_worker(engine, max_errors, table=None, trace=None):
+    """Inicializa un proceso de la fase map (sin tabla) o de la fase check"""
+    global _global_table
+    parsemod.engine = engine
+    semmod.echo = False
+    budget.reset(max_errors)
+    _global_table = table or {}
+    tracing.init_worker(trace)
+
+
+def _map_file(task):
+    """Fase map: firmas de las funciones de un archivo"""
+    path, max_errors = task
+    try:
+        text = _read(path)
+    except OSError:
+        return []
+    budget.reset(max_errors)
+    if tracing.enabled:
+        tracing.begin("signatures", "project")
+    ast, _ = parsemod.parse_code(text, lexer=lexmod.build_lexer())
+    signatures = semmod.function_signatures(ast) if ast else []
+    if tracing.enabled:
+        tracing.end()
+    return signatures
+
+
+def merge_signatures(paths, signatures):
+    """
+    Fase reduce: mezcla las firmas de cada archivo en la tabla global.
+
+    La primera declaración de un nombre (en el orden de 'paths') es la que
+    vale. Las repeticiones dentro de un mismo archivo ya las informa el
+    semántico de ese archivo, así que aquí solo se recogen las de otro.
+
+    Returns:
+        tuple: (tabla nombre -> (firma, archivo, línea), duplicados)
+    """
+    table = {}
+    duplicates = []
+    for path, functions in zip(paths, signatures):
+        for name, signature, line in functions:
+            previous = table.get(name)
+            if previous is None:
+                table[name] = (signature, path, line)
+            elif previous[1] != path:
+                duplicates.append((name, path, line, previous[1], previous[2]))
+    return table, duplicates
+
+
+def _check_file(task):
+    """Fase check: análisis completo de un archivo contra la tabla global"""
+    path, max_errors = task
+    try:
+        text = _read(path)
+    except OSError as e:
+        return FileReport(path, [f"No se puede leer el archivo: {e}"], [], [])
+    result = analysis.analyze_source(text, max_errors, external=_global_table)
+    return FileReport(path, result.lex_errors, result.syntax_errors, result.semantic_errors)
+
+
+def _run(tasks, function, workers, initargs):
+    """Ejecuta una fase en un pool (o en este proceso si workers <= 1)"""
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(*initargs)
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=initargs + (tracing.worker_settings(),)) as pool:
+        return list(pool.map(function, tasks,
+                             chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def analyze_project(paths, workers=None, max_errors=None):
+    """
+    Analiza los archivos de un proyecto con una tabla de funciones común.
+
+    Args:
+        paths: archivos .rs; su orden decide qué declaración repetida vale
+        workers: procesos de cada fase (por defecto, uno por CPU)
+        max_errors: presupuesto de errores de cada archivo
+
+    Returns:
+        ProjectResult
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, max_errors) for path in paths]
+
+    echo = semmod.echo
+    try:
+        signatures = _run(tasks, _map_file, workers, (parsemod.engine, max_errors, None))
+        table, duplicates = merge_signatures(paths, signatures)
+        external = {name: signature for name, (signature, _, _) in table.items()}
+        reports = _run(tasks, _check_file, workers, (parsemod.engine, max_errors, external))
+    finally:
+        semmod.echo = echo
+        tracing.current_file = None
+        budget.reset()
+        _init_worker(parsemod.engine, None)
+
+    by_path = {report.path: report for report in reports}
+    for name, path, line, first_path, first_line in duplicates:
+        by_path[path].semantic_errors.append(
+            f"Línea {line}: Función '{name}' ya fue declarada en {first_path}:{first_line}")
+    return ProjectResult(reports, table, duplicates)
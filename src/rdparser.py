@@ -0,0 +1,422 @@
+"""
+Parser especializado (descenso recursivo + precedencia de operadores).
+
+Reconoce la misma gramática que src/parser.py y construye el mismo AST, pero
+sin pasar por la maquinaria genérica de PLY: cada sentencia se despacha por
+su primer token con una tabla (STATEMENTS) y las expresiones binarias se
+resuelven con pilas de operandos y operadores, de modo que las cadenas
+'a + b + c + ...' no consumen pila de Python. La tabla de precedencias se
+obtiene de parser.precedence, así que ambos parsers no pueden divergir en
+eso.
+
+Solo se usa para programas correctos: ante el primer token inesperado (o si
+el anidamiento agota la pila de Python) el análisis se repite con PLY, que
+informa los errores y hace la recuperación. Así los diagnósticos son siempre
+los de PLY.
+
+Se activa con parser.engine = "rd" (main.py --parser rd).
+"""
+
+import parser as parsemod
+from budget import ErrorBudgetExceeded
+
+# Operadores binarios: tipo de token -> nivel (mayor = liga más fuerte).
+# Todos son asociativos por la izquierda; NOT es prefijo y liga más que todos
+BINARY_LEVELS = {
+    token: level
+    for level, (assoc, *names) in enumerate(parsemod.precedence, 1)
+    if assoc == "left"
+    for token in names
+}
+
+ASSIGN_OPS = ("ASSIGN", "PLUS_ASSIGN", "MINUS_ASSIGN", "MULT_ASSIGN", "DIV_ASSIGN", "MOD_ASSIGN")
+
+LITERAL_TOKENS = ("INTEGER", "FLOAT", "STRING", "CHAR", "TRUE", "FALSE")
+BOOLEAN_TOKENS = parsemod.BOOLEAN_TOKENS
+
+# Operandos de un solo token, salvo que un ID vaya seguido de alguno de estos
+SIMPLE_OPERANDS = frozenset(LITERAL_TOKENS + ("ID",))
+OPERAND_SUFFIXES = frozenset(("LBRACKET", "LPAREN", "PERIOD"))
+
+
+class _Mismatch(Exception):
+    """El programa no es correcto (o es demasiado profundo): se usa PLY"""
+
+
+class RDParser:
+    """Parser de un programa ya convertido en tokens"""
+
+    def __init__(self, types, values, lines):
+        # Columnas paralelas de tipo, valor y línea, terminadas en '$end'
+        self.types = types + ["$end"]
+        self.values = values + [None]
+        self.lines = lines + [0]
+        self.pos = 0
+
+    # -- Tokens --------------------------------------------------------------
+
+    def expect(self, token_type):
+        """Consume un token del tipo indicado y devuelve su posición"""
+        pos = self.pos
+        if self.types[pos] != token_type:
+            raise _Mismatch(pos)
+        self.pos = pos + 1
+        return pos
+
+    def accept(self, token_type):
+        if self.types[self.pos] == token_type:
+            self.pos += 1
+            return True
+        return False
+
+    # -- Programa y sentencias -----------------------------------------------
+
+    def parse_program(self):
+        statements = self.statement_list("$end")
+        if not statements:
+            raise _Mismatch(self.pos)
+        return ("program", statements)
+
+    def statement_list(self, end):
+        statements = []
+        types = self.types
+        while types[self.pos] != end:
+            parse = STATEMENTS.get(types[self.pos], RDParser.expression_statement)
+            statements.append(parse(self))
+        return statements
+
+    def block(self):
+        self.expect("LBRACE")
+        statements = self.statement_list("RBRACE")
+        self.pos += 1
+        return ("block", statements)
+
+    def variable_declaration(self):
+        line = self.lines[self.expect("LET")]
+        mutable = self.accept("MUT")
+        name = self.values[self.expect("ID")]
+        annotation = value = None
+        if self.accept("COLON"):
+            annotation = self.type_annotation()
+        if self.accept("ASSIGN"):
+            value = self.expression()
+        self.expect("SEMICOLON")
+        return ("var_decl", name, annotation, value, mutable, line)
+
+    def type_annotation(self):
+        kind = self.types[self.pos]
+        if kind == "ID":
+            self.pos += 1
+            return self.values[self.pos - 1]
+        if kind == "VEC":
+            self.pos += 1
+            self.expect("LESS_THAN")
+            element = self.type_annotation()
+            self.expect("GREATER_THAN")
+            return ("Vec", element)
+        if kind == "LBRACKET":
+            self.pos += 1
+            element = self.type_annotation()
+            self.expect("SEMICOLON")
+            size = self.values[self.expect("INTEGER")]
+            self.expect("RBRACKET")
+            return ("Array", element, size)
+        if kind == "LPAREN":
+            self.pos += 1
+            elements = [self.type_annotation()]
+            while self.accept("COMMA"):
+                elements.append(self.type_annotation())
+            self.expect("RPAREN")
+            return ("Tuple", elements)
+        raise _Mismatch(self.pos)
+
+    def id_statement(self):
+        """Asignación (x = e; x += e; a[i] = e;) o sentencia de expresión"""
+        pos = self.pos
+        following = self.types[pos + 1]
+        if following in ASSIGN_OPS:
+            self.pos = pos + 2
+            value = self.expression()
+            self.expect("SEMICOLON")
+            return ("assign", self.values[pos], self.values[pos + 1], value, self.lines[pos])
+        if following == "LBRACKET":
+            self.pos = pos + 1
+            access = self.array_access(self.values[pos])
+            if self.accept("ASSIGN"):
+                value = self.expression()
+                self.expect("SEMICOLON")
+                # PLY no da línea a un no terminal: p.lineno(1) vale 0
+                return ("assign_index", access, value, 0)
+            expression = self.expression(access)
+            self.expect("SEMICOLON")
+            return ("expr_stmt", expression)
+        return self.expression_statement()
+
+    def expression_statement(self):
+        expression = self.expression()
+        self.expect("SEMICOLON")
+        return ("expr_stmt", expression)
+
+    def print_statement(self):
+        pos = self.pos
+        self.pos += 1
+        is_macro = self.accept("NOT")
+        self.expect("LPAREN")
+        args = [] if self.types[self.pos] == "RPAREN" else self.expression_list()
+        self.expect("RPAREN")
+        self.expect("SEMICOLON")
+        return ("print", self.values[pos], args, is_macro, self.lines[pos])
+
+    def if_statement(self):
+        # Las cadenas else if se recorren en bucle y se encadenan al final
+        chain = []
+        while True:
+            line = self.lines[self.expect("IF")]
+            condition = self.expression()
+            then = self.block()
+            if not self.accept("ELSE"):
+                otherwise = None
+                break
+            if self.types[self.pos] != "IF":
+                otherwise = self.block()
+                break
+            chain.append((condition, then, line))
+        node = ("if", condition, then, otherwise, line)
+        for condition, then, line in reversed(chain):
+            node = ("if", condition, then, node, line)
+        return node
+
+    def while_statement(self):
+        line = self.lines[self.expect("WHILE")]
+        condition = self.expression()
+        return ("while", condition, self.block(), line)
+
+    def for_statement(self):
+        line = self.lines[self.expect("FOR")]
+        name = self.values[self.expect("ID")]
+        self.expect("IN")
+        iterable = self.expression()
+        if self.accept("PERIOD"):
+            self.expect("PERIOD")
+            iterable = ("range", iterable, self.expression())
+        return ("for", name, iterable, self.block(), line)
+
+    def function_declaration(self):
+        line = self.lines[self.expect("FN")]
+        name = self.values[self.expect("ID")]
+        self.expect("LPAREN")
+        params = []
+        if self.types[self.pos] != "RPAREN":
+            while True:
+                param = self.values[self.expect("ID")]
+                self.expect("COLON")
+                params.append(("param", param, self.type_annotation()))
+                if not self.accept("COMMA"):
+                    break
+        self.expect("RPAREN")
+        return_type = self.type_annotation() if self.accept("ARROW") else None
+        return ("func_decl", name, params, return_type, self.block(), line)
+
+    def return_statement(self):
+        line = self.lines[self.expect("RETURN")]
+        value = None if self.types[self.pos] == "SEMICOLON" else self.expression()
+        self.expect("SEMICOLON")
+        return ("return", value, line)
+
+    def break_statement(self):
+        line = self.lines[self.expect("BREAK")]
+        self.expect("SEMICOLON")
+        return ("break", line)
+
+    def continue_statement(self):
+        line = self.lines[self.expect("CONTINUE")]
+        self.expect("SEMICOLON")
+        return ("continue", line)
+
+    # -- Expresiones ---------------------------------------------------------
+
+    def expression(self, first=None):
+        """
+        Expresión completa por precedencia de operadores, sin recursión en
+        los operadores binarios. 'first' es un primer operando ya analizado.
+        """
+        types, values = self.types, self.values
+        levels = BINARY_LEVELS
+        operands = []
+        operators = []  # (nivel, operador)
+        while True:
+            if first is not None:
+                operand, first = first, None
+            else:
+                pos = self.pos
+                kind = types[pos]
+                if kind in SIMPLE_OPERANDS and types[pos + 1] not in OPERAND_SUFFIXES:
+                    # Literal o identificador suelto: el caso más frecuente
+                    self.pos = pos + 1
+                    operand = ("literal", values[pos])
+                elif kind == "NOT":
+                    # Los '!' prefijos ligan más que cualquier operador binario
+                    nots = []
+                    while types[self.pos] == "NOT":
+                        nots.append(values[self.pos])
+                        self.pos += 1
+                    operand = self.primary()
+                    for operator in reversed(nots):
+                        operand = ("unop", operator, operand)
+                else:
+                    operand = self.primary()
+
+            level = levels.get(types[self.pos])
+            if level is None:
+                if not operators:
+                    return operand
+                operands.append(operand)
+                break
+            operands.append(operand)
+            while operators and operators[-1][0] >= level:
+                _, operator = operators.pop()
+                right = operands.pop()
+                operands[-1] = ("binop", operator, operands[-1], right)
+            operators.append((level, values[self.pos]))
+            self.pos += 1
+
+        while operators:
+            _, operator = operators.pop()
+            right = operands.pop()
+            operands[-1] = ("binop", operator, operands[-1], right)
+        return operands[0]
+
+    def expression_list(self):
+        expressions = [self.expression()]
+        while self.accept("COMMA"):
+            expressions.append(self.expression())
+        return expressions
+
+    def array_access(self, base):
+        """ID [ e ] [ e ]... con la línea de cada '['"""
+        node = base
+        while self.types[self.pos] == "LBRACKET":
+            line = self.lines[self.pos]
+            self.pos += 1
+            index = self.expression()
+            self.expect("RBRACKET")
+            node = ("array_access", node, index, line)
+        return node
+
+    def primary(self):
+        pos = self.pos
+        kind = self.types[pos]
+        if kind in LITERAL_TOKENS:
+            self.pos = pos + 1
+            return ("literal", self.values[pos])
+        if kind == "ID":
+            following = self.types[pos + 1]
+            self.pos = pos + 1
+            if following == "LBRACKET":
+                return self.array_access(self.values[pos])
+            if following == "LPAREN":
+                self.pos += 1
+                args = [] if self.types[self.pos] == "RPAREN" else self.expression_list()
+                self.expect("RPAREN")
+                return ("func_call", self.values[pos], args, self.lines[pos])
+            if following == "PERIOD":
+                # ID . siempre es acceso a tupla (como en PLY, que desplaza el '.')
+                self.pos += 1
+                index = self.values[self.expect("INTEGER")]
+                return ("tuple_access", self.values[pos], index, self.lines[pos])
+            return ("literal", self.values[pos])
+        if kind == "LPAREN":
+            self.pos = pos + 1
+            inner = self.expression()
+            if self.accept("COMMA"):
+                # Solo pares: PLY resuelve el conflicto desplazando la ','
+                second = self.expression()
+                self.expect("RPAREN")
+                return ("tuple", [inner, second], self.lines[pos])
+            self.expect("RPAREN")
+            return inner
+        if kind == "LBRACKET":
+            self.pos = pos + 1
+            elements = [] if self.types[self.pos] == "RBRACKET" else self.expression_list()
+            self.expect("RBRACKET")
+            return ("array", elements, self.lines[pos])
+        if kind == "VEC":
+            self.pos = pos + 1
+            self.expect("NOT")
+            self.expect("LBRACKET")
+            elements = [] if self.types[self.pos] == "RBRACKET" else self.expression_list()
+            self.expect("RBRACKET")
+            return ("vector", elements, self.lines[pos])
+        raise _Mismatch(pos)
+
+
+# Sentencias por su primer token; el resto son sentencias de expresión
+STATEMENTS = {
+    "LET": RDParser.variable_declaration,
+    "ID": RDParser.id_statement,
+    "PRINT": RDParser.print_statement,
+    "PRINTLN": RDParser.print_statement,
+    "IF": RDParser.if_statement,
+    "WHILE": RDParser.while_statement,
+    "FOR": RDParser.for_statement,
+    "FN": RDParser.function_declaration,
+    "RETURN": RDParser.return_statement,
+    "BREAK": RDParser.break_statement,
+    "CONTINUE": RDParser.continue_statement,
+    "LBRACE": RDParser.block,
+}
+
+
+def _columns(tokens):
+    """Tipos, valores y líneas de los tokens (sin conservar los LexToken)"""
+    types, values, lines = [], [], []
+    for tok in tokens:
+        kind = tok.type
+        types.append(kind)
+        # Como en parser.p_expression_primary: true/false llegan al AST como bool
+        values.append(tok.value if kind not in BOOLEAN_TOKENS else kind == "TRUE")
+        lines.append(tok.lineno)
+    return types, values, lines
+
+
+def parse_code(code, tokens=None, lexer=None):
+    """
+    Igual que parser.parse_code. Si el programa no es correcto, el resultado
+    es el del análisis con PLY.
+
+    Sin tokens previos el código se convierte en tokens antes de analizarlo.
+    Si después hay que recurrir a PLY se deshace lo que ese paso dejó en
+    lexer.errors y en el presupuesto de errores, y PLY repite el léxico
+    intercalado con el sintáctico: así los errores, su orden y el corte por
+    presupuesto son los mismos que con engine = "ply". Por lo mismo, unos
+    tokens que se reconocen a medida que se piden (un generador) van
+    directamente a PLY si el presupuesto de errores tiene límite.
+    """
+    from lexer import build_lexer
+
+    if lexer is None:
+        lexer = build_lexer()
+    lexer.lineno = 1
+    # Como PLY, que da el texto al lexer aunque reciba los tokens
+    lexer.input(code)
+
+    if tokens is None:
+        used, lex_errors = lexer.budget.used, len(lexer.errors)
+        source = iter(lexer.token, None)
+    elif isinstance(tokens, (list, tuple)) or lexer.budget.limit is None:
+        tokens = source = list(tokens)
+    else:
+        return parsemod.parse_with_ply(code, tokens=tokens, lexer=lexer)
+
+    try:
+        ast = RDParser(*_columns(source)).parse_program()
+    except (_Mismatch, RecursionError, ErrorBudgetExceeded):
+        pass
+    else:
+        parsemod.syntax_errors = []
+        return ast, parsemod.syntax_errors
+
+    if tokens is None:
+        lexer.budget.used = used
+        del lexer.errors[lex_errors:]
+    return parsemod.parse_with_ply(code, tokens=tokens, lexer=lexer)
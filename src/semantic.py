@@ -3,10 +3,44 @@
 # Analizador Semántico - Proyecto Compiladores
 # ============================================================================
 
+from concurrent.futures import ProcessPoolExecutor
+
+import tracing
+from budget import budget, ErrorBudgetExceeded
+from typetable import (I32, F64, BOOL, CHAR, STRING, LITERAL_TYPES,
+                       from_annotation, arithmetic_result)
+
 semantic_errors = []
 symbol_table = {}
 function_table = {}
 
+# Variables locales de cada función analizada, en orden de fuente; al final
+# del análisis se añaden a symbol_table para los informes
+function_locals = []
+
+# Índice de referencias cruzadas (ver src/xref.py): una entrada
+# (nombre, línea, declaración, es_definición) por aparición de un nombre, en
+# orden de fuente. Una declaración es la tupla (nombre, línea, clase), o None
+# si el nombre no se resolvió; symbol_decls/function_decls dicen cuál es la
+# visible para cada nombre
+xref_records = []
+symbol_decls = {}
+function_decls = {}
+
+# Tipo de cada declaración y función en la que está (None en el nivel
+# superior): declaración -> (tipo, función). El de una función es el de retorno
+declaration_types = {}
+
+# Si es falso add_error no imprime (procesos del análisis en paralelo)
+echo = True
+
+# Número mínimo de funciones de nivel superior para repartirlas entre procesos
+MIN_PARALLEL_FUNCTIONS = 16
+
+# Tipo usado para crear las tablas en cada análisis; stats lo sustituye por
+# un diccionario que cuenta las búsquedas
+table_factory = dict
+
 context = {
     'in_loop': False,
     'in_function': None,
@@ -22,7 +56,9 @@ def add_error(message, line=0):
     error = f"Línea {line}: {message}"
     if error not in semantic_errors:
         semantic_errors.append(error)
-        print(f"❌ {error}")
+        if echo:
+            print(f"❌ {error}")
+        budget.charge("semántico")
 
 
 def get_line_from_node(node):
@@ -35,11 +71,117 @@ def get_line_from_node(node):
     return 0
 
 
+def declare(name, line, kind, symbol_type=None):
+    """Registra la definición de una variable, parámetro o función"""
+    key = (name, line, kind)
+    if kind == "function":
+        function_decls[name] = key
+    else:
+        symbol_decls[name] = key
+    xref_records.append((name, line, key, True))
+    declaration_types[key] = (symbol_type, context['in_function'])
+
+
+def collect_uses(node, line=0):
+    """
+    Apariciones de nombres en una expresión, en orden de fuente y resueltas
+    con el scope actual (declaración None si no hay ninguna visible). No se
+    añaden a xref_records: el llamador decide en qué orden van.
+    """
+    uses = []
+    pending = [(node, line)]
+    while pending:
+        node, line = pending.pop()
+        if isinstance(node, list):
+            pending.extend((item, line) for item in reversed(node))
+            continue
+        if not isinstance(node, tuple):
+            continue
+        head = node[0]
+        if head == "literal":
+            name = node[1]
+        elif head == "binop":
+            pending.append((node[3], line))
+            pending.append((node[2], line))
+            continue
+        elif head == "func_call":
+            uses.append((node[1], node[3] or line, function_decls.get(node[1]), False))
+            pending.append((node[2], node[3] or line))
+            continue
+        elif head == "array_access" or head == "tuple_access":
+            if head == "array_access":
+                pending.append((node[2], node[3] or line))
+            name = node[1]
+            line = node[3] or line
+            if not isinstance(name, str):
+                pending.append((name, line))
+                continue
+        elif head == "unop":
+            pending.append((node[2], line))
+            continue
+        elif head == "range":
+            pending.append((node[2], line))
+            pending.append((node[1], line))
+            continue
+        elif head in ("vector", "array", "tuple"):
+            pending.append((node[1], node[2] or line))
+            continue
+        else:
+            continue
+
+        # Un nombre: variable visible, función o nombre sin declarar
+        if isinstance(name, str):
+            key = symbol_decls.get(name) if name in symbol_table else function_decls.get(name)
+            if key is not None or name.isidentifier():
+                uses.append((name, line, key, False))
+    return uses
+
+
 def get_expression_type(node, line=0):
     """
     Retorna el tipo de una expresión del AST.
     También verifica que las variables usadas existan.
+
+    Las operaciones se resuelven en postorden con una pila explícita, así que
+    las cadenas 'a + b + c + ...' no dependen del límite de recursión.
     """
+    pending = [(node, line, False)]
+    types = []
+    while pending:
+        node, line, ready = pending.pop()
+        if isinstance(node, tuple) and node[0] in ("binop", "unop"):
+            node_line = get_line_from_node(node) or line
+            if node[0] == "unop":
+                if node[1] == '!':
+                    types.append(BOOL)
+                elif node[1] == '-':
+                    # Mismo tipo que el operando
+                    pending.append((node[2], node_line, False))
+                else:
+                    types.append(None)
+            elif not ready:
+                # Primero el operando izquierdo: los errores salen en orden
+                pending.append((node, line, True))
+                pending.append((node[3], node_line, False))
+                pending.append((node[2], node_line, False))
+            else:
+                right_type = types.pop()
+                left_type = types.pop()
+                operator = node[1]
+                if operator in ['+', '-', '*', '/', '%']:
+                    # Retorna el tipo dominante (f64 > i32)
+                    types.append(arithmetic_result(left_type, right_type))
+                elif operator in ['==', '!=', '<', '>', '<=', '>=', '&&', '||']:
+                    types.append(BOOL)
+                else:
+                    types.append(None)
+        else:
+            types.append(get_operand_type(node, line))
+    return types[0]
+
+
+def get_operand_type(node, line=0):
+    """Tipo de una expresión que no es una operación (identificador, literal, llamada...)"""
     # CASO 1: Es un identificador (string)
     if isinstance(node, str):
         if node in symbol_table:
@@ -57,12 +199,9 @@ def get_expression_type(node, line=0):
         # Literales
         if head == "literal":
             value = node[1]
-            if isinstance(value, bool):
-                return "bool"
-            elif isinstance(value, int):
-                return "i32"
-            elif isinstance(value, float):
-                return "f64"
+            literal_type = LITERAL_TYPES.get(type(value))
+            if literal_type is not None:
+                return literal_type
             elif isinstance(value, str):
                 # Si es un string que parece ser un ID, verificar si existe
                 if value.isidentifier():
@@ -72,30 +211,7 @@ def get_expression_type(node, line=0):
                         add_error(f"Variable '{value}' no ha sido declarada", node_line)
                         return None
                 # String literal normal
-                return "char" if len(value) == 1 else "String"
-        
-        # Operaciones Binarias
-        elif head == "binop":
-            operator = node[1]
-            left_type = get_expression_type(node[2], node_line)
-            right_type = get_expression_type(node[3], node_line)
-            
-            if operator in ['+', '-', '*', '/', '%']:
-                # Retorna el tipo dominante (f64 > i32)
-                if left_type == "f64" or right_type == "f64":
-                    return "f64"
-                if left_type == "i32" or right_type == "i32":
-                    return "i32"
-                return left_type
-            elif operator in ['==', '!=', '<', '>', '<=', '>=', '&&', '||']:
-                return "bool"
-        
-        # Operaciones Unarias
-        elif head == "unop":
-            if node[1] == '!':
-                return "bool"
-            if node[1] == '-':
-                return get_expression_type(node[2], node_line)
+                return CHAR if len(value) == 1 else STRING
 
         # Llamadas a Función
         elif head == "func_call":
@@ -123,7 +239,7 @@ def check_variable_declaration(node, line=0):
     """Verifica declaraciones de variables"""
     if node[0] == "var_decl":
         name = node[1]
-        declared_type = node[2]
+        declared_type = from_annotation(node[2])
         value = node[3]
         is_mut = node[4]
         node_line = node[5] if len(node) > 5 else line
@@ -131,13 +247,14 @@ def check_variable_declaration(node, line=0):
         # Error 1: Redeclaración
         if name in symbol_table:
             add_error(f"Variable '{name}' ya fue declarada previamente", node_line)
+            xref_records.append((name, node_line, None, True))
             return
 
         # Error 2: Tipos incompatibles
         if value is not None:
             value_type = get_expression_type(value, node_line)
             if declared_type and value_type:
-                if value_type != declared_type:
+                if value_type is not declared_type:
                     add_error(f"Tipo incompatible: se esperaba '{declared_type}' pero se obtuvo '{value_type}'", node_line)
             # Si no hay tipo declarado, inferir del valor
             elif not declared_type:
@@ -149,6 +266,7 @@ def check_variable_declaration(node, line=0):
             'mutable': is_mut,
             'initialized': value is not None
         }
+        declare(name, node_line, "variable", declared_type)
 
 
 def check_assignment(node, line=0):
@@ -175,7 +293,7 @@ def check_assignment(node, line=0):
         value_type = get_expression_type(value, node_line)
         if var_info['type'] and value_type:
             if operator == '=':
-                if var_info['type'] != value_type:
+                if var_info['type'] is not value_type:
                     add_error(f"Tipo incompatible: '{name}' es '{var_info['type']}' pero se asigna '{value_type}'", node_line)
 
         var_info['initialized'] = True
@@ -197,7 +315,7 @@ def check_data_structures(node, line=0):
             has_error = False
             for i, elem in enumerate(elements[1:], 1):
                 elem_type = get_expression_type(elem, node_line)
-                if elem_type and first_type and elem_type != first_type:
+                if elem_type and first_type and elem_type is not first_type:
                     if not has_error:
                         add_error(f"Tipo inconsistente en {'vector' if node[0] == 'vector' else 'array'}: elementos tienen tipos diferentes ('{first_type}' y '{elem_type}')", node_line)
                         has_error = True
@@ -215,7 +333,7 @@ def check_data_structures(node, line=0):
         
         # Verificar que el índice es entero
         index_type = get_expression_type(index, node_line)
-        if index_type and index_type != "i32":
+        if index_type and index_type is not I32:
             add_error(f"Índice de array debe ser entero (i32), se obtuvo '{index_type}'", node_line)
     
     # Acceso a tuplas
@@ -233,7 +351,7 @@ def check_boolean_conditions(node, line=0):
         condition = node[1]
         condition_type = get_expression_type(condition, node_line)
         
-        if condition_type and condition_type != "bool":
+        if condition_type and condition_type is not BOOL:
             add_error(f"Condición en '{node[0]}' debe ser booleana, se obtuvo '{condition_type}'", node_line)
 
 
@@ -244,39 +362,67 @@ def check_boolean_conditions(node, line=0):
 def check_function_declaration(node, line=0):
     """Verifica el cuerpo de las funciones (ya registradas en fase 1)"""
     if node[0] == "func_decl":
-        name = node[1]
-        params = node[2]
-        return_type = node[3]
-        body = node[4]
-        node_line = node[5] if len(node) > 5 else line
-        
-        # Cambiar contexto para analizar el cuerpo
-        old_context = context.copy()
-        old_symbols = list(symbol_table.keys())
-        
-        context['in_function'] = name
-        context['return_type'] = return_type
-        
-        # Agregar parámetros como variables locales
-        for param in params:
-            param_name = param[1]
-            param_type = param[2]
-            symbol_table[param_name] = {
-                'type': param_type,
-                'mutable': False,
-                'initialized': True
-            }
-        
-        # Analizar cuerpo de la función
-        analyze_node(body, node_line)
-        
-        # Limpiar parámetros del scope
-        for param in params:
-            if param[1] in symbol_table:
-                del symbol_table[param[1]]
-        
-        # Restaurar contexto
-        context.update(old_context)
+        state = enter_function(node, line)
+        analyze_node(node[4], state[0])
+        leave_function(state)
+
+
+def enter_function(node, line=0):
+    """
+    Prepara el análisis del cuerpo de una función: contexto y parámetros.
+
+    Returns:
+        tuple: estado para leave_function (la línea de la función primero)
+    """
+    name = node[1]
+    params = node[2]
+    return_type = from_annotation(node[3])
+    node_line = node[5] if len(node) > 5 else line
+    if tracing.enabled:
+        tracing.begin(f"fn {name}", "semantic", line=node_line)
+    
+    # Cambiar contexto para analizar el cuerpo
+    old_context = context.copy()
+    # El cuerpo se analiza sobre una copia de las variables visibles: lo que
+    # declare o modifique no afecta al resto del programa ni a otras funciones
+    visible = {var: dict(info) for var, info in symbol_table.items()}
+    visible_decls = dict(symbol_decls)
+    
+    context['in_function'] = name
+    context['return_type'] = return_type
+    
+    # Agregar parámetros como variables locales
+    for param in params:
+        param_name = param[1]
+        param_type = from_annotation(param[2])
+        symbol_table[param_name] = {
+            'type': param_type,
+            'mutable': False,
+            'initialized': True
+        }
+        declare(param_name, node_line, "parameter", param_type)
+    return node_line, params, visible, old_context, visible_decls
+
+
+def leave_function(state):
+    """Guarda las locales de la función y restaura el scope y el contexto"""
+    _, params, visible, old_context, visible_decls = state
+    
+    # Guardar las locales (sin parámetros) y restaurar el scope
+    param_names = {param[1] for param in params}
+    function_locals.append({
+        var: info for var, info in symbol_table.items()
+        if var not in visible and var not in param_names
+    })
+    symbol_table.clear()
+    symbol_table.update(visible)
+    symbol_decls.clear()
+    symbol_decls.update(visible_decls)
+    
+    # Restaurar contexto
+    context.update(old_context)
+    if tracing.enabled:
+        tracing.end()
 
 
 def check_function_call(node, line=0):
@@ -301,7 +447,7 @@ def check_function_call(node, line=0):
         # Error: Tipos de argumentos incorrectos
         for i, (arg, expected_type) in enumerate(zip(args, func_info['params'])):
             arg_type = get_expression_type(arg, node_line)
-            if arg_type and expected_type and arg_type != expected_type:
+            if arg_type and expected_type and arg_type is not expected_type:
                 add_error(f"Argumento {i+1} de '{name}': se esperaba '{expected_type}', se obtuvo '{arg_type}'", node_line)
 
 
@@ -333,193 +479,345 @@ def check_control_flow(node, line=0):
         # Error: tipo de retorno incorrecto
         elif expected_type is not None and return_value is not None:
             return_type = get_expression_type(return_value, node_line)
-            if return_type and return_type != expected_type:
+            if return_type and return_type is not expected_type:
                 add_error(f"Tipo de retorno incorrecto: se esperaba '{expected_type}', se obtuvo '{return_type}'", node_line)
 
 
 # ============================================================================
-# FUNCIÓN PRINCIPAL DE ANÁLISIS RECURSIVO
+# FUNCIÓN PRINCIPAL DE ANÁLISIS
 # ============================================================================
 
+def _restore_loop(in_loop):
+    context['in_loop'] = in_loop
+
+
+def _leave_for(iter_var, old_var, old_decl, in_loop):
+    if old_var:
+        symbol_table[iter_var] = old_var
+    elif iter_var in symbol_table:
+        del symbol_table[iter_var]
+    if old_decl:
+        symbol_decls[iter_var] = old_decl
+    else:
+        symbol_decls.pop(iter_var, None)
+    context['in_loop'] = in_loop
+
+
 def analyze_node(node, line=0):
-    """Analiza recursivamente un nodo del AST"""
-    if node is None or not isinstance(node, tuple):
-        return
-    
-    node_type = node[0]
-    node_line = get_line_from_node(node) or line
-    
-    # Anthony Herrera - Variables y asignaciones
-    if node_type == "var_decl":
-        check_variable_declaration(node, node_line)
-        # También analizar el valor de inicialización
-        if len(node) > 3 and node[3] is not None:
-            analyze_node(node[3], node_line)
-    
-    elif node_type == "assign" or node_type == "assign_index":
-        check_assignment(node, node_line)
-        # Analizar el valor asignado
-        if len(node) > 3:
-            analyze_node(node[3], node_line)
-    
-    # Paul Perdomo - Estructuras de datos y condiciones
-    elif node_type in ["vector", "array"]:
-        check_data_structures(node, node_line)
-        # Analizar cada elemento
-        if len(node) > 1:
-            for elem in node[1]:
-                analyze_node(elem, node_line)
-    
-    elif node_type == "array_access":
-        check_data_structures(node, node_line)
-        # Analizar el índice
-        if len(node) > 2:
-            analyze_node(node[2], node_line)
-    
-    elif node_type == "tuple_access":
-        check_data_structures(node, node_line)
-    
-    elif node_type in ["if", "while"]:
-        check_boolean_conditions(node, node_line)
-        # Analizar condición
-        if len(node) > 1:
-            analyze_node(node[1], node_line)
-        # Analizar bloque then
-        if len(node) > 2:
-            if node_type == "while":
-                old_in_loop = context['in_loop']
-                context['in_loop'] = True
-                analyze_node(node[2], node_line)
-                context['in_loop'] = old_in_loop
+    """
+    Analiza un nodo del AST y todos sus descendientes.
+
+    El recorrido usa una pila explícita en lugar de recursión: los hijos se
+    apilan en orden inverso y lo que hay que hacer al salir de un nodo
+    (restaurar el contexto del bucle, la variable del for o el scope de una
+    función) se apila como una acción antes que ellos.
+    """
+    pending = [(node, line)]
+    while pending:
+        node, line = pending.pop()
+        if not isinstance(node, tuple):
+            if callable(node):
+                node(*line)
+            continue
+        
+        node_type = node[0]
+        node_line = get_line_from_node(node) or line
+        
+        # Anthony Herrera - Variables y asignaciones
+        if node_type == "var_decl":
+            # Los usos del valor se resuelven antes de declarar el nombre
+            uses = collect_uses(node[3], node_line) if len(node) > 3 else []
+            check_variable_declaration(node, node_line)
+            xref_records.extend(uses)
+            # También analizar el valor de inicialización
+            if len(node) > 3 and node[3] is not None:
+                pending.append((node[3], node_line))
+        
+        elif node_type == "assign" or node_type == "assign_index":
+            if node_type == "assign":
+                xref_records.extend(collect_uses(("literal", node[1]), node_line))
+                xref_records.extend(collect_uses(node[3], node_line))
             else:
-                analyze_node(node[2], node_line)
-        # Analizar bloque else
-        if len(node) > 3 and node[3] is not None:
-            analyze_node(node[3], node_line)
-    
-    # Danilo Drouet - Funciones y control de flujo
-    elif node_type == "func_decl":
-        check_function_declaration(node, node_line)
-    
-    elif node_type == "func_call":
-        check_function_call(node, node_line)
-        # Analizar argumentos
-        if len(node) > 2:
-            for arg in node[2]:
-                analyze_node(arg, node_line)
-    
-    elif node_type in ["return", "break", "continue"]:
-        check_control_flow(node, node_line)
-        # Si es return con valor, analizar el valor
-        if node_type == "return" and len(node) > 1 and node[1] is not None:
-            analyze_node(node[1], node_line)
-    
-    # For loops
-    elif node_type == "for":
-        old_in_loop = context['in_loop']
-        context['in_loop'] = True
+                # La línea de assign_index es 0 (la de un no terminal en PLY):
+                # vale la del acceso, también para los usos del valor
+                access_line = get_line_from_node(node[1]) or node_line
+                xref_records.extend(collect_uses([node[1], node[2]], access_line))
+            check_assignment(node, node_line)
+            # Analizar el valor asignado (node[2] en assign_index; node[3] es la línea)
+            value = node[3] if node_type == "assign" else node[2]
+            pending.append((value, node_line))
         
-        # Variable de iteración
-        iter_var = node[1]
-        old_var = symbol_table.get(iter_var)
-        symbol_table[iter_var] = {
-            'type': 'i32',
-            'mutable': False,
-            'initialized': True
-        }
+        # Paul Perdomo - Estructuras de datos y condiciones
+        elif node_type in ["vector", "array"]:
+            check_data_structures(node, node_line)
+            # Analizar cada elemento
+            if len(node) > 1:
+                pending.extend((elem, node_line) for elem in reversed(node[1]))
         
-        # Analizar rango y cuerpo
-        if len(node) > 2:
-            analyze_node(node[2], node_line)
-        if len(node) > 3:
-            analyze_node(node[3], node_line)
+        elif node_type == "array_access":
+            check_data_structures(node, node_line)
+            # Analizar el índice
+            if len(node) > 2:
+                pending.append((node[2], node_line))
         
-        # Restaurar
-        if old_var:
-            symbol_table[iter_var] = old_var
-        elif iter_var in symbol_table:
-            del symbol_table[iter_var]
+        elif node_type == "tuple_access":
+            check_data_structures(node, node_line)
         
-        context['in_loop'] = old_in_loop
-    
-    # Recursividad general
-    elif node_type == "program":
-        for stmt in node[1]:
-            analyze_node(stmt, node_line)
-    
-    elif node_type == "block":
-        for stmt in node[1]:
-            analyze_node(stmt, node_line)
-    
-    elif node_type == "binop":
-        # Analizar ambos operandos
-        if len(node) > 2:
-            analyze_node(node[2], node_line)
-        if len(node) > 3:
-            analyze_node(node[3], node_line)
-    
-    elif node_type == "unop":
-        # Analizar operando
-        if len(node) > 2:
-            analyze_node(node[2], node_line)
-    
-    elif node_type == "expr_stmt":
-        # Analizar la expresión
-        if len(node) > 1:
-            analyze_node(node[1], node_line)
-    
-    elif node_type == "print":
-        # Analizar argumentos de print
-        if len(node) > 2 and node[2]:
-            for arg in node[2]:
-                analyze_node(arg, node_line)
+        elif node_type in ["if", "while"]:
+            xref_records.extend(collect_uses(node[1], node_line))
+            check_boolean_conditions(node, node_line)
+            # Condición, bloque then (dentro del bucle si es while) y bloque else
+            if len(node) > 3 and node[3] is not None:
+                pending.append((node[3], node_line))
+            if len(node) > 2:
+                if node_type == "while":
+                    pending.append((_restore_loop, (context['in_loop'],)))
+                    pending.append((node[2], node_line))
+                    pending.append((_restore_loop, (True,)))
+                else:
+                    pending.append((node[2], node_line))
+            if len(node) > 1:
+                pending.append((node[1], node_line))
+        
+        # Danilo Drouet - Funciones y control de flujo
+        elif node_type == "func_decl":
+            state = enter_function(node, node_line)
+            pending.append((leave_function, (state,)))
+            pending.append((node[4], state[0]))
+        
+        elif node_type == "func_call":
+            check_function_call(node, node_line)
+            # Analizar argumentos
+            if len(node) > 2:
+                pending.extend((arg, node_line) for arg in reversed(node[2]))
+        
+        elif node_type in ["return", "break", "continue"]:
+            if node_type == "return":
+                xref_records.extend(collect_uses(node[1], node_line))
+            check_control_flow(node, node_line)
+            # Si es return con valor, analizar el valor
+            if node_type == "return" and len(node) > 1 and node[1] is not None:
+                pending.append((node[1], node_line))
+        
+        # For loops
+        elif node_type == "for":
+            old_in_loop = context['in_loop']
+            context['in_loop'] = True
+            
+            # Variable de iteración (el rango se resuelve antes de declararla)
+            iter_var = node[1]
+            uses = collect_uses(node[2], node_line)
+            old_var = symbol_table.get(iter_var)
+            old_decl = symbol_decls.get(iter_var)
+            symbol_table[iter_var] = {
+                'type': I32,
+                'mutable': False,
+                'initialized': True
+            }
+            declare(iter_var, node_line, "variable", I32)
+            xref_records.extend(uses)
+            
+            # Analizar rango y cuerpo; al salir se restaura la variable
+            pending.append((_leave_for, (iter_var, old_var, old_decl, old_in_loop)))
+            if len(node) > 3:
+                pending.append((node[3], node_line))
+            if len(node) > 2:
+                pending.append((node[2], node_line))
+        
+        elif node_type == "program" or node_type == "block":
+            pending.extend((stmt, node_line) for stmt in reversed(node[1]))
+        
+        elif node_type == "binop":
+            # Analizar ambos operandos
+            if len(node) > 3:
+                pending.append((node[3], node_line))
+            if len(node) > 2:
+                pending.append((node[2], node_line))
+        
+        elif node_type == "unop":
+            # Analizar operando
+            if len(node) > 2:
+                pending.append((node[2], node_line))
+        
+        elif node_type == "expr_stmt":
+            xref_records.extend(collect_uses(node[1], node_line))
+            # Analizar la expresión
+            if len(node) > 1:
+                pending.append((node[1], node_line))
+        
+        elif node_type == "print":
+            xref_records.extend(collect_uses(node[2], node_line))
+            # Analizar argumentos de print
+            if len(node) > 2 and node[2]:
+                pending.extend((arg, node_line) for arg in reversed(node[2]))
 
 
 # ============================================================================
 # FUNCIÓN PRINCIPAL PÚBLICA
 # ============================================================================
 
+def function_signatures(node):
+    """
+    Funciones declaradas en el programa, sin analizar sus cuerpos.
+
+    Returns:
+        list: (nombre, {'params', 'return_type'}, línea) en orden de fuente
+    """
+    signatures = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if node is None or not isinstance(node, tuple):
+            continue
+        
+        node_type = node[0]
+        
+        if node_type == "func_decl":
+            params = node[2]
+            node_line = node[5] if len(node) > 5 else 0
+            signatures.append((node[1], {
+                'params': [from_annotation(p[2]) for p in params],
+                'return_type': from_annotation(node[3])
+            }, node_line))
+        
+        # Solo se desciende a nodos que contienen otras declaraciones
+        elif node_type == "program" or node_type == "block":
+            pending.extend(reversed(node[1]))
+    return signatures
+
+
 def register_functions(node):
     """Primera pasada: Registrar todas las declaraciones de funciones"""
-    if node is None or not isinstance(node, tuple):
-        return
-    
-    node_type = node[0]
-    
-    # Registrar función sin analizar su cuerpo
-    if node_type == "func_decl":
-        name = node[1]
-        params = node[2]
-        return_type = node[3]
-        node_line = node[5] if len(node) > 5 else 0
-        
+    for name, signature, node_line in function_signatures(node):
         # Verificar redeclaración
         if name in function_table:
             add_error(f"Función '{name}' ya fue declarada previamente", node_line)
         else:
-            param_types = [p[2] for p in params]
-            function_table[name] = {
-                'params': param_types,
-                'return_type': return_type
-            }
-    
-    # Recursión solo en nodos que contienen otras declaraciones
-    elif node_type == "program":
-        for stmt in node[1]:
-            register_functions(stmt)
-    elif node_type == "block":
-        for stmt in node[1]:
-            register_functions(stmt)
-
-
-def analyze(ast):
-    """Punto de entrada del análisis semántico"""
-    global semantic_errors, symbol_table, function_table, context
+            function_table[name] = signature
+            declare(name, node_line, "function", signature['return_type'])
+
+
+def _init_worker(functions, decls, trace=None):
+    """Inicializa un proceso del análisis en paralelo"""
+    global function_table, function_decls, echo
+    function_table = functions
+    function_decls = decls
+    echo = False
+    budget.reset()
+    tracing.init_worker(trace)
+
+
+def _check_function(task):
+    """Analiza el cuerpo de una función en un proceso del pool"""
+    global semantic_errors, symbol_table, function_locals, context
+    global xref_records, symbol_decls, declaration_types
+    node, visible, visible_decls = task
+    semantic_errors = []
+    function_locals = []
+    xref_records = []
+    declaration_types = {}
+    symbol_table = visible
+    symbol_decls = visible_decls
+    context = {
+        'in_loop': False,
+        'in_function': None,
+        'return_type': None
+    }
+    check_function_declaration(node, node[5] if len(node) > 5 else 0)
+    return semantic_errors, function_locals, xref_records, declaration_types
+
+
+def analyze_program_parallel(program, workers):
+    """
+    Segunda fase repartiendo los cuerpos de las funciones de nivel superior
+    entre 'workers' procesos. Cada proceso recibe una copia de function_table
+    y de las variables visibles en el punto de la declaración; los errores,
+    las locales y las referencias se mezclan en orden de fuente (los errores
+    sin duplicados).
+    """
+    global semantic_errors, function_locals, xref_records
+
+    # Las sentencias de nivel superior se analizan aquí, en orden; las
+    # funciones quedan pendientes con la posición que ocuparían sus resultados
+    pending = []
+    for stmt in program[1]:
+        if isinstance(stmt, tuple) and stmt[0] == "func_decl":
+            visible = {var: dict(info) for var, info in symbol_table.items()}
+            positions = (len(semantic_errors), len(function_locals), len(xref_records))
+            pending.append((positions, (stmt, visible, dict(symbol_decls))))
+        else:
+            analyze_node(stmt)
+
+    tasks = [task for _, task in pending]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dict(function_table), dict(function_decls),
+                                       tracing.worker_settings())) as pool:
+        results = list(pool.map(_check_function, tasks,
+                                chunksize=max(1, len(tasks) // (workers * 4))))
+
+    errors = []
+    seen = set()
+    merged_locals = []
+    merged_records = []
+    error_pos = local_pos = record_pos = 0
+
+    def take(items, new):
+        for error in items:
+            if error not in seen:
+                seen.add(error)
+                errors.append(error)
+                if new:
+                    if echo:
+                        print(f"❌ {error}")
+                    budget.charge("semántico")
+
+    try:
+        for ((error_at, local_at, record_at), _), result in zip(pending, results):
+            func_errors, func_locals, func_records, func_types = result
+            take(semantic_errors[error_pos:error_at], False)
+            error_pos = error_at
+            take(func_errors, True)
+            merged_locals.extend(function_locals[local_pos:local_at])
+            local_pos = local_at
+            merged_locals.extend(func_locals)
+            merged_records.extend(xref_records[record_pos:record_at])
+            record_pos = record_at
+            merged_records.extend(func_records)
+            declaration_types.update(func_types)
+        take(semantic_errors[error_pos:], False)
+        merged_locals.extend(function_locals[local_pos:])
+        merged_records.extend(xref_records[record_pos:])
+    finally:
+        semantic_errors = errors
+        function_locals = merged_locals
+        xref_records = merged_records
+
+
+def analyze(ast, workers=None, external=None):
+    """
+    Punto de entrada del análisis semántico.
+
+    Con workers > 1 y al menos MIN_PARALLEL_FUNCTIONS funciones de nivel
+    superior, sus cuerpos se analizan en paralelo; el resultado es el mismo
+    que en serie.
+
+    'external' son las funciones declaradas en otros archivos del proyecto
+    (nombre -> firma, como en function_table): las llamadas a ellas se
+    comprueban igual que las locales, pero no entran en el índice de
+    referencias. Una función del propio programa oculta a la externa.
+    """
+    global semantic_errors, symbol_table, function_table, function_locals, context
+    global xref_records, symbol_decls, function_decls, declaration_types
     
     # Reiniciar estado
     semantic_errors = []
-    symbol_table = {}
-    function_table = {}
+    symbol_table = table_factory()
+    function_table = table_factory()
+    function_locals = []
+    xref_records = []
+    symbol_decls = {}
+    function_decls = {}
+    declaration_types = {}
     context = {
         'in_loop': False,
         'in_function': None,
@@ -527,10 +825,35 @@ def analyze(ast):
     }
     
     if ast:
-        # FASE 1: Registrar todas las funciones primero
-        register_functions(ast)
-        
-        # FASE 2: Analizar el contenido completo
-        analyze_node(ast)
+        trace_depth = tracing.depth()
+        try:
+            # FASE 1: Registrar todas las funciones primero (las del propio
+            # archivo tienen prioridad sobre las externas)
+            if tracing.enabled:
+                tracing.begin("register_functions", "semantic")
+            register_functions(ast)
+            if tracing.enabled:
+                tracing.end()
+            for name, signature in (external or {}).items():
+                function_table.setdefault(name, signature)
+
+            # FASE 2: Analizar el contenido completo
+            functions = sum(1 for stmt in ast[1]
+                            if isinstance(stmt, tuple) and stmt[0] == "func_decl") \
+                if ast[0] == "program" else 0
+            if workers and workers > 1 and functions >= MIN_PARALLEL_FUNCTIONS:
+                analyze_program_parallel(ast, workers)
+            else:
+                analyze_node(ast)
+        except ErrorBudgetExceeded as e:
+            semantic_errors.append(str(e))
+            if tracing.enabled:
+                tracing.unwind(trace_depth)
+
+        # Las locales de las funciones quedan en la tabla para los informes
+        for variables in function_locals:
+            for var, info in variables.items():
+                if var not in symbol_table:
+                    symbol_table[var] = info
     
-    return semantic_errors
\ No newline at end of file
+    return semantic_errors
@@ -0,0 +1,465 @@
+"""
+Servidor de lenguaje (subconjunto de LSP) sobre stdio.
+
+Mantiene en memoria los documentos abiertos junto con el resultado de su
+análisis, de modo que el lexer y el parser se construyen una sola vez por
+proceso. Métodos soportados:
+
+    initialize, initialized, shutdown, exit
+    textDocument/didOpen, textDocument/didChange, textDocument/didClose
+    textDocument/hover, textDocument/definition
+    textDocument/references, textDocument/rename
+
+Los diagnósticos se publican con textDocument/publishDiagnostics después de
+cada didOpen/didChange.
+"""
+
+import contextlib
+import json
+import re
+import sys
+
+import analysis
+import utils
+
+# Severidades LSP
+SEVERITY_ERROR = 1
+
+# Códigos de error JSON-RPC
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class RequestError(Exception):
+    """Un manejador rechaza la petición: se responde con un error JSON-RPC"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+# ============================================================================
+# ANÁLISIS DE DOCUMENTOS
+# ============================================================================
+
+def format_type(type_annotation):
+    """Representa una anotación de tipo del AST con sintaxis de Rust"""
+    if type_annotation is None:
+        return "?"
+    if isinstance(type_annotation, tuple):
+        if type_annotation[0] == "Vec":
+            return f"Vec<{format_type(type_annotation[1])}>"
+        if type_annotation[0] == "Array":
+            return f"[{format_type(type_annotation[1])}; {type_annotation[2]}]"
+        if type_annotation[0] == "Tuple":
+            return "(" + ", ".join(format_type(t) for t in type_annotation[1]) + ")"
+    return str(type_annotation)
+
+
+def collect_definitions(ast):
+    """
+    Recorre el AST y devuelve las definiciones por nombre.
+
+    Returns:
+        dict: nombre -> lista de {'kind', 'line', 'type', 'detail'} en orden de fuente
+    """
+    definitions = {}
+    if not isinstance(ast, tuple):
+        return definitions
+
+    def add(name, kind, line, type_annotation=None, detail=None):
+        definitions.setdefault(name, []).append({
+            'kind': kind,
+            'line': line,
+            'type': type_annotation,
+            'detail': detail,
+        })
+
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, tuple) or not node:
+            continue
+        head = node[0]
+        if head == "program" or head == "block":
+            stack.extend(reversed(node[1]))
+        elif head == "var_decl":
+            add(node[1], "variable", node[5], node[2])
+        elif head == "func_decl":
+            name, params, return_type, body, line = node[1], node[2], node[3], node[4], node[5]
+            signature = ", ".join(f"{p[1]}: {format_type(p[2])}" for p in params)
+            detail = f"fn {name}({signature})"
+            if return_type is not None:
+                detail += f" -> {format_type(return_type)}"
+            add(name, "function", line, return_type, detail)
+            for param in params:
+                add(param[1], "parameter", line, param[2])
+            stack.append(body)
+        elif head == "if":
+            stack.extend(n for n in (node[3], node[2]) if n is not None)
+        elif head == "while":
+            stack.append(node[2])
+        elif head == "for":
+            add(node[1], "variable", node[4], "i32")
+            stack.append(node[3])
+    return definitions
+
+
+class Document:
+    """Documento abierto junto con el resultado de su último análisis"""
+
+    def __init__(self, uri, text, version=0):
+        self.uri = uri
+        self.version = version
+        self.lines = []
+        self.diagnostics = []
+        self.definitions = {}
+        self.symbols = {}
+        self.functions = {}
+        self.xref = None
+        self.update(text, version)
+
+    def update(self, text, version):
+        self.version = version
+        self.lines = text.split("\n")
+
+        result = analysis.analyze_source(text)
+        self.symbols = result.symbol_table
+        self.functions = result.function_table
+        self.definitions = collect_definitions(result.ast)
+        self.xref = result.xref
+        self.diagnostics = (
+            [self._diagnostic(msg, "lexer") for msg in result.lex_errors]
+            + [self._diagnostic(msg, "parser") for msg in result.syntax_errors]
+            + [self._diagnostic(msg, "semantic") for msg in result.semantic_errors]
+        )
+
+    def _line_range(self, line, column=0):
+        """Rango LSP (base 0) de la línea indicada (base 1)"""
+        index = max(line - 1, 0)
+        text = self.lines[index] if index < len(self.lines) else ""
+        if column > 0:
+            start = column - 1
+        else:
+            start = len(text) - len(text.lstrip())
+        return {
+            'start': {'line': index, 'character': start},
+            'end': {'line': index, 'character': max(len(text), start + 1)},
+        }
+
+    def _diagnostic(self, message, source):
+        line, column = utils.error_position(message)
+        return {
+            'range': self._line_range(line, column),
+            'severity': SEVERITY_ERROR,
+            'source': source,
+            'message': message,
+        }
+
+    def word_at(self, line, character):
+        """Devuelve (palabra, inicio, fin) bajo la posición LSP indicada"""
+        if line >= len(self.lines):
+            return None
+        for match in _WORD.finditer(self.lines[line]):
+            if match.start() <= character <= match.end():
+                return match.group(), match.start(), match.end()
+        return None
+
+    def definition_of(self, name, line):
+        """Definición visible más cercana antes de la línea (base 1) indicada"""
+        candidates = self.definitions.get(name)
+        if not candidates:
+            return None
+        best = candidates[0]
+        for candidate in candidates:
+            if candidate['line'] <= line:
+                best = candidate
+        return best
+
+    def span_range(self, span, name):
+        """Rango LSP de un nombre en la posición (línea, columna) base 1 del índice"""
+        line, column = span
+        return {
+            'start': {'line': line - 1, 'character': column - 1},
+            'end': {'line': line - 1, 'character': column - 1 + len(name)},
+        }
+
+    def name_range(self, name, line):
+        """Rango LSP del nombre dentro de la línea (base 1) donde se definió"""
+        index = max(line - 1, 0)
+        text = self.lines[index] if index < len(self.lines) else ""
+        match = re.search(r"\b" + re.escape(name) + r"\b", text)
+        start = match.start() if match else 0
+        return {
+            'start': {'line': index, 'character': start},
+            'end': {'line': index, 'character': start + len(name)},
+        }
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class LanguageServer:
+    """Despachador de mensajes JSON-RPC para el subconjunto de LSP soportado"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.documents = {}
+        self.running = True
+        self.shutdown_requested = False
+
+    # -- Transporte ----------------------------------------------------------
+
+    def read_message(self):
+        """Lee un mensaje con cabecera Content-Length; None al cerrarse stdin"""
+        length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode("utf-8"))
+
+    def send(self, message):
+        message['jsonrpc'] = "2.0"
+        body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+        self.writer.write(body)
+        self.writer.flush()
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    # -- Bucle principal -----------------------------------------------------
+
+    def serve(self):
+        while self.running:
+            try:
+                message = self.read_message()
+            except ValueError as e:
+                # Cabecera o cuerpo JSON mal formados: se descarta el mensaje
+                print(f"❌ Mensaje no válido: {e}", file=sys.stderr)
+                continue
+            if message is None:
+                break
+            self.handle(message)
+        return 0 if self.shutdown_requested else 1
+
+    def handle(self, message):
+        if not isinstance(message, dict):
+            print(f"❌ Mensaje no válido: {message!r}", file=sys.stderr)
+            return
+        method = message.get('method')
+        params = message.get('params') or {}
+        handler = getattr(self, "on_" + method.replace("/", "_"), None) \
+            if isinstance(method, str) else None
+
+        if 'id' not in message:
+            # Notificación: no lleva respuesta; un fallo solo se informa en stderr
+            if handler:
+                try:
+                    handler(params)
+                except Exception as e:
+                    print(f"❌ Error en {method}: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+
+        if handler is None:
+            self.send({
+                'id': message['id'],
+                'error': {'code': METHOD_NOT_FOUND, 'message': f"Método no soportado: {method}"},
+            })
+            return
+        try:
+            result = handler(params)
+        except RequestError as e:
+            self.send({'id': message['id'], 'error': {'code': e.code, 'message': str(e)}})
+            return
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            # Parámetros que faltan o con otra forma (p. ej. hover sin 'position')
+            self.send({'id': message['id'], 'error': {
+                'code': INVALID_PARAMS, 'message': f"Parámetros no válidos: {type(e).__name__}: {e}"}})
+            return
+        except Exception as e:
+            self.send({'id': message['id'], 'error': {
+                'code': INTERNAL_ERROR, 'message': f"{type(e).__name__}: {e}"}})
+            return
+        self.send({'id': message['id'], 'result': result})
+
+    # -- Ciclo de vida -------------------------------------------------------
+
+    def on_initialize(self, params):
+        return {
+            'capabilities': {
+                'textDocumentSync': 1,  # sincronización completa
+                'hoverProvider': True,
+                'definitionProvider': True,
+                'referencesProvider': True,
+                'renameProvider': True,
+            },
+            'serverInfo': {'name': "rust-analyzer-lng"},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def on_exit(self, params):
+        self.running = False
+
+    # -- Sincronización de documentos ---------------------------------------
+
+    def publish(self, document):
+        self.notify("textDocument/publishDiagnostics", {
+            'uri': document.uri,
+            'version': document.version,
+            'diagnostics': document.diagnostics,
+        })
+
+    def on_textDocument_didOpen(self, params):
+        item = params['textDocument']
+        document = Document(item['uri'], item['text'], item.get('version', 0))
+        self.documents[document.uri] = document
+        self.publish(document)
+
+    def on_textDocument_didChange(self, params):
+        ident = params['textDocument']
+        changes = params.get('contentChanges') or []
+        if not changes:
+            return
+        document = self.documents.get(ident['uri'])
+        text = changes[-1]['text']
+        if document is None:
+            document = Document(ident['uri'], text, ident.get('version', 0))
+            self.documents[document.uri] = document
+        else:
+            document.update(text, ident.get('version', document.version))
+        self.publish(document)
+
+    def on_textDocument_didClose(self, params):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.notify("textDocument/publishDiagnostics", {'uri': uri, 'diagnostics': []})
+
+    # -- Consultas -----------------------------------------------------------
+
+    def _lookup(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None, None, None
+        position = params['position']
+        word = document.word_at(position['line'], position['character'])
+        return document, word, position['line'] + 1
+
+    def on_textDocument_hover(self, params):
+        document, word, line = self._lookup(params)
+        if word is None:
+            return None
+        name, start, end = word
+        definition = document.definition_of(name, line)
+
+        if name in document.functions or (definition and definition['kind'] == "function"):
+            if definition and definition['detail']:
+                text = definition['detail']
+            else:
+                info = document.functions[name]
+                params_text = ", ".join(format_type(t) for t in info['params'])
+                text = f"fn {name}({params_text})"
+                if info['return_type'] is not None:
+                    text += f" -> {format_type(info['return_type'])}"
+        elif definition is not None:
+            type_annotation = definition['type']
+            if type_annotation is None and name in document.symbols:
+                type_annotation = document.symbols[name]['type']
+            mutable = document.symbols.get(name, {}).get('mutable', False)
+            prefix = "let mut" if mutable and definition['kind'] == "variable" else (
+                "let" if definition['kind'] == "variable" else "param")
+            text = f"{prefix} {name}: {format_type(type_annotation)}"
+        elif name in document.symbols:
+            text = f"{name}: {format_type(document.symbols[name]['type'])}"
+        else:
+            return None
+
+        return {
+            'contents': {'kind': "plaintext", 'value': text},
+            'range': {
+                'start': {'line': line - 1, 'character': start},
+                'end': {'line': line - 1, 'character': end},
+            },
+        }
+
+    def _xref_symbol(self, params):
+        """Documento, declaración y posición (base 1) del nombre bajo el cursor"""
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None or document.xref is None:
+            return None, None, None
+        position = params['position']
+        word = document.word_at(position['line'], position['character'])
+        if word is None:
+            return document, None, None
+        # Se consulta por el inicio de la palabra: el cursor puede estar justo detrás
+        place = (position['line'] + 1, word[1] + 1)
+        return document, document.xref.symbol_at(*place), place
+
+    def on_textDocument_definition(self, params):
+        document, key, place = self._xref_symbol(params)
+        if key is not None and key in document.xref.definitions:
+            return {'uri': document.uri,
+                    'range': document.span_range(document.xref.definitions[key], key[0])}
+
+        document, word, line = self._lookup(params)
+        if word is None:
+            return None
+        name = word[0]
+        definition = document.definition_of(name, line)
+        if definition is None:
+            return None
+        return {'uri': document.uri, 'range': document.name_range(name, definition['line'])}
+
+    def on_textDocument_references(self, params):
+        document, key, place = self._xref_symbol(params)
+        if key is None:
+            return []
+        include = (params.get('context') or {}).get('includeDeclaration', True)
+        return [{'uri': document.uri, 'range': document.span_range(span, key[0])}
+                for span in document.xref.references(*place, include_definition=include)]
+
+    def on_textDocument_rename(self, params):
+        document, key, place = self._xref_symbol(params)
+        if key is None:
+            return None
+        try:
+            edits = document.xref.rename(*place, params['newName'])
+        except ValueError as e:
+            raise RequestError(INVALID_PARAMS, str(e))
+        return {'changes': {document.uri: [
+            {'range': document.span_range((line, column), key[0]), 'newText': params['newName']}
+            for line, column, _ in edits
+        ]}}
+
+
+def serve(stdin=None, stdout=None):
+    """Atiende un cliente LSP por stdio hasta recibir 'exit'"""
+    reader = stdin or sys.stdin.buffer
+    writer = stdout or sys.stdout.buffer
+    # Cualquier print del análisis va a stderr para no corromper el protocolo
+    with contextlib.redirect_stdout(sys.stderr):
+        return LanguageServer(reader, writer).serve()
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
@@ -0,0 +1,299 @@
+"""
+Instrumentación del pipeline: tiempos por fase y contadores.
+
+Uso programático:
+
+    from stats import stats
+    stats.reset()
+    stats.enabled = True          # activa los contadores costosos
+    with stats.phase("lex"):
+        ...
+    stats.count("tokens", len(tokens))
+    print(stats.report())
+
+Las fases (tiempo de pared y de CPU) se registran siempre; los contadores
+que exigen instrumentar el parser o las tablas del semántico (reducciones,
+búsquedas de símbolos) solo cuando 'enabled' es verdadero.
+
+Memoria (tracemalloc):
+
+    stats.start_memory()
+    with stats.phase("parse"):    # pico, retenido y sitios de asignación
+        ...
+    stats.stop_memory()
+    print(stats.memory_report())
+
+Mientras la memoria está activa, el pico de una fase es el máximo de memoria
+asignada durante ella (sobre la que había al entrar) y lo retenido es lo que
+deja asignado al salir; en ambos casos, el mayor de sus llamadas. Los sitios
+son las líneas con más memoria retenida, según instantáneas tomadas al entrar
+y al salir de las primeras MEMORY_SNAPSHOT_CALLS llamadas de cada fase. Es un
+modo lento, solo para diagnóstico.
+"""
+
+import contextlib
+import time
+import tracemalloc
+
+import tracing
+
+# Sitios de asignación que se guardan por fase
+MEMORY_SITES = 10
+
+# Llamadas de cada fase en las que se toman instantáneas (son caras: recorren
+# todo lo asignado); el pico y lo retenido se miden en todas
+MEMORY_SNAPSHOT_CALLS = 3
+
+
+class PhaseTiming:
+    """Tiempo acumulado de una fase"""
+
+    __slots__ = ("calls", "wall", "cpu")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def to_dict(self):
+        return {'calls': self.calls, 'wall_s': self.wall, 'cpu_s': self.cpu}
+
+
+class PhaseMemory:
+    """Memoria de una fase: pico y retenido (bytes) y sitios de asignación"""
+
+    __slots__ = ("calls", "peak", "retained", "sites")
+
+    def __init__(self):
+        self.calls = 0
+        self.peak = 0
+        self.retained = 0
+        self.sites = {}  # "archivo:línea" -> bytes retenidos
+
+    def top_sites(self, limit=MEMORY_SITES):
+        return sorted(self.sites.items(), key=lambda item: -item[1])[:limit]
+
+    def to_dict(self):
+        return {'calls': self.calls, 'peak_bytes': self.peak,
+                'retained_bytes': self.retained, 'top_sites': self.top_sites()}
+
+
+class Stats:
+    """Tiempos por fase y contadores de una ejecución"""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.counters = {}
+        self.memory = {}
+        self.tracing_memory = False
+        self._started_tracemalloc = False
+        self._open_memory = []  # [memoria al entrar, pico] de las fases abiertas
+
+    def reset(self):
+        self.phases = {}
+        self.counters = {}
+        self.memory = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Mide tiempo de pared y de CPU del bloque y lo acumula en 'name'"""
+        timing = self.phases.get(name)
+        if timing is None:
+            timing = self.phases[name] = PhaseTiming()
+        memory = self._memory_phase(name) if self.tracing_memory else contextlib.nullcontext()
+        traced = tracing.enabled
+        with memory:
+            if traced:
+                tracing.begin(name, "phase")
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                yield timing
+            finally:
+                timing.wall += time.perf_counter() - wall
+                timing.cpu += time.process_time() - cpu
+                timing.calls += 1
+                if traced:
+                    tracing.end()
+
+    # -- Memoria -------------------------------------------------------------
+
+    def start_memory(self, frames=1):
+        """Activa la medición de memoria por fase (arranca tracemalloc si hace falta)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracemalloc = True
+        self.tracing_memory = True
+
+    def stop_memory(self):
+        self.tracing_memory = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _fold_peak(self):
+        # reset_peak() es global: antes de reiniciarlo, el pico actual se
+        # reparte a todas las fases abiertas (que pueden estar anidadas)
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._open_memory:
+            frame[1] = max(frame[1], peak - frame[0])
+
+    @contextlib.contextmanager
+    def _memory_phase(self, name):
+        memory = self.memory.get(name)
+        if memory is None:
+            memory = self.memory[name] = PhaseMemory()
+        before = _snapshot() if memory.calls < MEMORY_SNAPSHOT_CALLS else None
+        self._fold_peak()
+        tracemalloc.reset_peak()
+        frame = [tracemalloc.get_traced_memory()[0], 0]
+        self._open_memory.append(frame)
+        try:
+            yield memory
+        finally:
+            self._fold_peak()
+            self._open_memory.pop()
+            current = tracemalloc.get_traced_memory()[0]
+            retained = current - frame[0]
+            memory.calls += 1
+            memory.peak = max(memory.peak, frame[1])
+            memory.retained = retained if memory.calls == 1 else max(memory.retained, retained)
+            changes = _snapshot().compare_to(before, "lineno") if before is not None else []
+            for diff in changes[:MEMORY_SITES]:
+                if diff.size_diff <= 0:
+                    break
+                where = diff.traceback[0]
+                site = f"{where.filename}:{where.lineno}"
+                memory.sites[site] = memory.sites.get(site, 0) + diff.size_diff
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        result = {
+            'phases': {name: t.to_dict() for name, t in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+        if self.memory:
+            result['memory'] = {name: m.to_dict() for name, m in self.memory.items()}
+            result['memory'].update(self.memory_ratios())
+        return result
+
+    def memory_ratios(self):
+        """Bytes retenidos por token (fase lex) y por nodo del AST (fase parse)"""
+        ratios = {}
+        tokens = self.counters.get("tokens")
+        nodes = self.counters.get("ast_nodes")
+        if tokens and "lex" in self.memory:
+            ratios['bytes_per_token'] = self.memory["lex"].retained / tokens
+        # Solo si los tokens se midieron aparte (con el léxico intercalado, la
+        # fase parse también los retiene)
+        if nodes and "parse" in self.memory and "lex" in self.memory:
+            ratios['bytes_per_node'] = self.memory["parse"].retained / nodes
+        return ratios
+
+    def memory_report(self, sites=5):
+        """Tabla de memoria por fase, proporciones y sitios de asignación"""
+        lines = [
+            f"{'Fase':<12} {'Llamadas':>8} {'Pico KB':>10} {'Retenido KB':>12}",
+            "-" * 45,
+        ]
+        for name, m in self.memory.items():
+            lines.append(f"{name:<12} {m.calls:>8} {m.peak / 1024:>10.1f} {m.retained / 1024:>12.1f}")
+        ratios = self.memory_ratios()
+        if ratios:
+            lines.append("")
+            if 'bytes_per_token' in ratios:
+                lines.append(f"Bytes por token:     {ratios['bytes_per_token']:>10.1f}")
+            if 'bytes_per_node' in ratios:
+                lines.append(f"Bytes por nodo AST:  {ratios['bytes_per_node']:>10.1f}")
+        for name, m in self.memory.items():
+            top = m.top_sites(sites)
+            if top:
+                lines.append("")
+                lines.append(f"Sitios con más memoria retenida ({name}):")
+                for site, size in top:
+                    lines.append(f"  {size / 1024:>10.1f} KB  {site}")
+        return "\n".join(lines)
+
+    def report(self):
+        """Tabla de resumen en texto"""
+        lines = [
+            f"{'Fase':<12} {'Llamadas':>8} {'Pared ms':>10} {'CPU ms':>10}",
+            "-" * 43,
+        ]
+        total_wall = total_cpu = 0.0
+        for name, t in self.phases.items():
+            lines.append(f"{name:<12} {t.calls:>8} {t.wall * 1000:>10.3f} {t.cpu * 1000:>10.3f}")
+            total_wall += t.wall
+            total_cpu += t.cpu
+        lines.append("-" * 43)
+        lines.append(f"{'total':<12} {'':>8} {total_wall * 1000:>10.3f} {total_cpu * 1000:>10.3f}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'Contador':<20} {'Valor':>10}")
+            lines.append("-" * 31)
+            for name, value in self.counters.items():
+                lines.append(f"{name:<20} {value:>10}")
+        return "\n".join(lines)
+
+
+# ============================================================================
+# INSTRUMENTACIÓN DEL PARSER Y DEL SEMÁNTICO
+# ============================================================================
+
+class CountingDict(dict):
+    """Diccionario que cuenta las consultas (in, [], get) que recibe"""
+
+    __slots__ = ("lookups",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = 0
+
+    def __contains__(self, key):
+        self.lookups += 1
+        return dict.__contains__(self, key)
+
+    def __getitem__(self, key):
+        self.lookups += 1
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return dict.get(self, key, default)
+
+
+@contextlib.contextmanager
+def counting_reductions(parser):
+    """
+    Envuelve las acciones de las producciones del parser PLY para contar
+    reducciones. Devuelve una lista de un elemento con el total.
+    """
+    total = [0]
+    originals = []
+    for production in parser.productions:
+        action = production.callable
+        if action is None:
+            continue
+        originals.append((production, action))
+
+        def counted(p, _action=action):
+            total[0] += 1
+            _action(p)
+
+        production.callable = counted
+    try:
+        yield total
+    finally:
+        for production, action in originals:
+            production.callable = action
+
+
+def _snapshot():
+    """Instantánea de tracemalloc sin las asignaciones del propio tracemalloc"""
+    return tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+stats = Stats()
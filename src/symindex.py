@@ -0,0 +1,350 @@
+"""
+Índice persistente de símbolos de un árbol de archivos .rs en SQLite.
+
+Guarda, para cada archivo analizado, sus funciones (con firma), sus
+variables y parámetros (con tipo y función que los contiene) y sus llamadas,
+de modo que consultas sobre todo el repositorio no necesitan re-analizar:
+
+    files      (id, path, hash)
+    functions  (file_id, name, line, col, params, return_type)
+    symbols    (file_id, name, kind, type, scope, line, col)
+    calls      (file_id, callee, caller, line, args)
+
+Las filas salen de analysis.analyze_source: tablas de funciones y tipos de
+cada declaración del semántico, columnas del índice de referencias
+(src/xref.py) y llamadas del AST. La actualización es incremental: solo se
+re-analizan los archivos cuyo hash SHA-1 cambió, las filas se insertan por
+lotes con executemany dentro de una transacción y las consultas van por
+índices sobre nombre, tipo y archivo.
+
+Uso:
+    python src/symindex.py build DIR [--db RUTA] [--jobs N]
+    python src/symindex.py defs NOMBRE [--db RUTA]      archivos que declaran la función
+    python src/symindex.py calls NOMBRE [--db RUTA]     llamadas a la función
+    python src/symindex.py type TIPO [--db RUTA]        variables y parámetros del tipo
+    python src/symindex.py symbol NOMBRE [--db RUTA]    declaraciones de una variable
+    python src/symindex.py stats [--db RUTA]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(os.path.dirname(HERE), "logs", "symbols.db")
+
+# Archivos cuyas filas se insertan en cada transacción
+BATCH_FILES = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER,
+    col INTEGER,
+    params TEXT,
+    return_type TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    type TEXT,
+    scope TEXT,
+    line INTEGER,
+    col INTEGER
+);
+CREATE TABLE IF NOT EXISTS calls (
+    file_id INTEGER NOT NULL,
+    callee TEXT NOT NULL,
+    caller TEXT,
+    line INTEGER,
+    args INTEGER
+);
+"""
+
+# Se crean después de la carga: así una reconstrucción completa no mantiene
+# los índices fila a fila
+INDEXES = """
+CREATE INDEX IF NOT EXISTS functions_name ON functions (name);
+CREATE INDEX IF NOT EXISTS functions_file ON functions (file_id);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_type ON symbols (type);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols (file_id);
+CREATE INDEX IF NOT EXISTS calls_callee ON calls (callee);
+CREATE INDEX IF NOT EXISTS calls_file ON calls (file_id);
+"""
+
+ROW_TABLES = ("functions", "symbols", "calls")
+
+
+def file_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _type_name(value):
+    return str(value) if value is not None else None
+
+
+def extract_rows(text):
+    """
+    Analiza un texto fuente y devuelve sus filas (sin file_id).
+
+    Returns:
+        tuple: (funciones, símbolos, llamadas) como listas de tuplas
+    """
+    import analysis
+
+    result = analysis.analyze_source(text)
+    index = result.xref
+    functions, symbols = [], []
+    for key, (line, column) in sorted(index.definitions.items(), key=lambda item: item[1]):
+        name, _, kind = key
+        symbol_type, scope = index.types.get(key, (None, None))
+        if kind == "function":
+            signature = result.function_table.get(name, {})
+            params = ", ".join(_type_name(p) or "?" for p in signature.get('params', []))
+            functions.append((name, line, column, params, _type_name(symbol_type)))
+        else:
+            symbols.append((name, kind, _type_name(symbol_type), scope, line, column))
+
+    calls = []
+    stack = [(result.ast, None, 0)] if result.ast else []
+    while stack:
+        node, caller, line = stack.pop()
+        if isinstance(node, list):
+            stack.extend((item, caller, line) for item in reversed(node))
+            continue
+        if not (isinstance(node, tuple) and node and isinstance(node[0], str)):
+            continue
+        if node[0] == "func_decl":
+            caller = node[1]
+        elif node[0] == "func_call":
+            line = node[3] or line
+            calls.append((node[1], caller, line, len(node[2])))
+        stack.extend((child, caller, line) for child in reversed(node[1:])
+                     if isinstance(child, (tuple, list)))
+    return functions, symbols, calls
+
+
+def _index_file(path):
+    """Tarea de un proceso: (ruta, hash, filas), o (ruta, None, None) si no se puede leer"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return path, None, None
+    return path, file_hash(data), extract_rows(data.decode("utf-8", errors="replace"))
+
+
+class SymbolIndex:
+    """Base de datos SQLite del índice"""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- Actualización -------------------------------------------------------
+
+    def stale(self, paths):
+        """Rutas cuyo contenido no coincide con el hash guardado"""
+        known = dict(self.conn.execute("SELECT path, hash FROM files"))
+        changed = []
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    digest = file_hash(f.read())
+            except OSError:
+                continue
+            if known.get(path) != digest:
+                changed.append(path)
+        return changed
+
+    def update(self, paths, workers=None, prune=True):
+        """
+        Re-indexa los archivos de 'paths' que cambiaron desde la última vez.
+
+        Con prune, los archivos indexados que ya no están en 'paths' se
+        eliminan del índice.
+
+        Returns:
+            dict: archivos analizados, eliminados y filas insertadas
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        changed = self.stale(paths)
+        removed = []
+        if prune:
+            wanted = set(paths)
+            removed = [path for (path,) in self.conn.execute("SELECT path FROM files")
+                       if path not in wanted]
+
+        with self.conn:
+            self._delete(removed)
+
+        rows = 0
+        if workers and workers > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(_index_file, changed,
+                                   chunksize=max(1, len(changed) // (workers * 4)))
+                rows = self._store(results)
+        else:
+            rows = self._store(map(_index_file, changed))
+
+        self.conn.executescript(INDEXES)
+        self.conn.execute("PRAGMA optimize")
+        return {'analyzed': len(changed), 'removed': len(removed), 'rows': rows}
+
+    def _delete(self, paths):
+        ids = []
+        for path in paths:
+            row = self.conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                ids.append(row)
+        for table in ROW_TABLES:
+            self.conn.executemany(f"DELETE FROM {table} WHERE file_id = ?", ids)
+        self.conn.executemany("DELETE FROM files WHERE id = ?", ids)
+
+    def _store(self, results):
+        """Inserta los resultados por lotes de BATCH_FILES archivos"""
+        total = 0
+        batch = []
+        for result in results:
+            if result[1] is not None:
+                batch.append(result)
+            if len(batch) >= BATCH_FILES:
+                total += self._store_batch(batch)
+                batch = []
+        if batch:
+            total += self._store_batch(batch)
+        return total
+
+    def _store_batch(self, batch):
+        functions, symbols, calls = [], [], []
+        with self.conn:
+            self._delete([path for path, _, _ in batch])
+            for path, digest, (file_functions, file_symbols, file_calls) in batch:
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, hash) VALUES (?, ?)", (path, digest)).lastrowid
+                functions.extend((file_id,) + row for row in file_functions)
+                symbols.extend((file_id,) + row for row in file_symbols)
+                calls.extend((file_id,) + row for row in file_calls)
+            self.conn.executemany("INSERT INTO functions VALUES (?, ?, ?, ?, ?, ?)", functions)
+            self.conn.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)", symbols)
+            self.conn.executemany("INSERT INTO calls VALUES (?, ?, ?, ?, ?)", calls)
+        return len(functions) + len(symbols) + len(calls)
+
+    # -- Consultas -----------------------------------------------------------
+
+    def function_definitions(self, name):
+        """(ruta, línea, columna, parámetros, retorno) de cada declaración de la función"""
+        return self.conn.execute(
+            "SELECT f.path, d.line, d.col, d.params, d.return_type "
+            "FROM functions d JOIN files f ON f.id = d.file_id "
+            "WHERE d.name = ? ORDER BY f.path, d.line", (name,)).fetchall()
+
+    def call_sites(self, name):
+        """(ruta, línea, función que llama, argumentos) de cada llamada"""
+        return self.conn.execute(
+            "SELECT f.path, c.line, c.caller, c.args "
+            "FROM calls c JOIN files f ON f.id = c.file_id "
+            "WHERE c.callee = ? ORDER BY f.path, c.line", (name,)).fetchall()
+
+    def symbols_of_type(self, type_name):
+        """(ruta, línea, columna, nombre, clase, función) de los símbolos de un tipo"""
+        return self.conn.execute(
+            "SELECT f.path, s.line, s.col, s.name, s.kind, s.scope "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE s.type = ? ORDER BY f.path, s.line", (type_name,)).fetchall()
+
+    def symbol_definitions(self, name):
+        """(ruta, línea, columna, clase, tipo, función) de las declaraciones de un nombre"""
+        return self.conn.execute(
+            "SELECT f.path, s.line, s.col, s.kind, s.type, s.scope "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE s.name = ? ORDER BY f.path, s.line", (name,)).fetchall()
+
+    def counts(self):
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("files",) + ROW_TABLES}
+
+
+def main(argv=None):
+    from watch import iter_sources
+
+    ap = argparse.ArgumentParser(description="Índice de símbolos en SQLite")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"Base de datos (por defecto {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Indexa (o actualiza) los .rs de un directorio")
+    build.add_argument("directorio")
+    build.add_argument("--jobs", type=int, default=os.cpu_count(), help="Procesos de análisis")
+    for command, help_text in (("defs", "Archivos que declaran la función"),
+                               ("calls", "Llamadas a la función"),
+                               ("type", "Variables y parámetros de un tipo"),
+                               ("symbol", "Declaraciones de una variable o parámetro")):
+        query = sub.add_parser(command, help=help_text)
+        query.add_argument("nombre")
+    sub.add_parser("stats", help="Filas de cada tabla")
+    args = ap.parse_args(argv)
+
+    with SymbolIndex(args.db) as index:
+        if args.command == "build":
+            if not os.path.isdir(args.directorio):
+                print(f"❌ {args.directorio} no es un directorio", file=sys.stderr)
+                return 1
+            start = time.perf_counter()
+            summary = index.update(sorted(iter_sources(args.directorio)), workers=args.jobs)
+            print(f"✓ {summary['analyzed']} archivos analizados, {summary['removed']} eliminados, "
+                  f"{summary['rows']} filas ({time.perf_counter() - start:.2f} s)")
+            return 0
+        if args.command == "stats":
+            for table, n in index.counts().items():
+                print(f"{table:<10} {n:>10}")
+            return 0
+
+        start = time.perf_counter()
+        if args.command == "defs":
+            rows = [f"{path}:{line}:{col}\tfn {args.nombre}({params})"
+                    + (f" -> {ret}" if ret else "")
+                    for path, line, col, params, ret in index.function_definitions(args.nombre)]
+        elif args.command == "calls":
+            rows = [f"{path}:{line}\t{caller or '(nivel superior)'}\t{count} argumentos"
+                    for path, line, caller, count in index.call_sites(args.nombre)]
+        elif args.command == "type":
+            rows = [f"{path}:{line}:{col}\t{kind}\t{name}\t{scope or '(nivel superior)'}"
+                    for path, line, col, name, kind, scope in index.symbols_of_type(args.nombre)]
+        else:
+            rows = [f"{path}:{line}:{col}\t{kind}\t{symbol_type or '?'}\t{scope or '(nivel superior)'}"
+                    for path, line, col, kind, symbol_type, scope
+                    in index.symbol_definitions(args.nombre)]
+        for row in rows:
+            print(row)
+        print(f"{len(rows)} resultados ({(time.perf_counter() - start) * 1000:.1f} ms)",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
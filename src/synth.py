@@ -0,0 +1,243 @@
+"""
+Generador de programas sintéticos del subconjunto de Rust aceptado por
+src/parser.py, para benchmarks y pruebas de escala.
+
+El tamaño se controla con el número de funciones, sentencias por función,
+profundidad de anidamiento y ancho de los literales. Con 'error_rate' > 0 se
+inyectan errores sintácticos y semánticos en esa proporción de sentencias.
+
+Uso:
+    python src/synth.py --functions 50 --statements 40 --seed 1 > prog.rs
+"""
+
+import argparse
+import random
+import sys
+
+ARITH_OPS = ("+", "-", "*", "%")
+COMPARE_OPS = ("<", ">", "<=", ">=", "==", "!=")
+
+
+class ProgramGenerator:
+    """Genera un programa determinista a partir de una semilla"""
+
+    def __init__(self, seed=0, functions=10, statements=20, depth=3,
+                 literal_width=3, error_rate=0.0, expression_terms=4):
+        self.rng = random.Random(seed)
+        self.functions = max(functions, 1)
+        self.statements = max(statements, 1)
+        self.depth = max(depth, 0)
+        self.literal_width = max(literal_width, 1)
+        self.error_rate = error_rate
+        self.expression_terms = max(expression_terms, 1)
+        self.counter = 0
+        self.signatures = []  # (nombre, aridad) de las funciones ya generadas
+        self.injected_errors = 0
+
+    # -- Expresiones ---------------------------------------------------------
+
+    def fresh(self, prefix="v"):
+        # Nombres únicos en todo el programa: el semántico no separa ámbitos de bloque
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def literal(self):
+        width = self.rng.randint(1, self.literal_width)
+        return str(self.rng.randint(1, 10 ** width - 1))
+
+    def operand(self, scope):
+        if scope and self.rng.random() < 0.6:
+            return self.rng.choice(scope)
+        return self.literal()
+
+    def expression(self, scope):
+        terms = self.rng.randint(1, self.expression_terms)
+        parts = [self.operand(scope)]
+        for _ in range(terms - 1):
+            op = self.rng.choice(ARITH_OPS)
+            # Evitar '%' por cero con literales generados desde 1
+            right = self.literal() if op == "%" else self.operand(scope)
+            parts.append(op)
+            parts.append(right)
+        text = " ".join(parts)
+        if terms > 2 and self.rng.random() < 0.2:
+            text = f"({text})"
+        return text
+
+    def condition(self, scope):
+        cond = f"{self.operand(scope)} {self.rng.choice(COMPARE_OPS)} {self.literal()}"
+        if self.rng.random() < 0.25:
+            joiner = self.rng.choice(("&&", "||"))
+            cond += f" {joiner} {self.operand(scope)} {self.rng.choice(COMPARE_OPS)} {self.literal()}"
+        return cond
+
+    def call(self, scope):
+        name, arity = self.rng.choice(self.signatures)
+        args = ", ".join(self.operand(scope) for _ in range(arity))
+        return f"{name}({args})"
+
+    # -- Sentencias ----------------------------------------------------------
+
+    def error_statement(self, scope, indent):
+        """Sentencia con un error sintáctico o semántico"""
+        self.injected_errors += 1
+        kind = self.rng.randrange(4)
+        if kind == 0:
+            # Falta el punto y coma
+            return [f"{indent}let {self.fresh()} = {self.expression(scope)}"]
+        if kind == 1:
+            # Token inesperado
+            return [f"{indent}let {self.fresh()} = {self.literal()} * ;"]
+        if kind == 2:
+            # Variable no declarada
+            return [f"{indent}let {self.fresh()} = {self.fresh('undef')} + {self.literal()};"]
+        # Tipo incompatible
+        return [f"{indent}let {self.fresh()}: i32 = {self.literal()}.5;"]
+
+    def statement(self, scope, mutables, depth, indent):
+        """Devuelve las líneas de una sentencia y actualiza el ámbito"""
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.error_statement(scope, indent)
+
+        roll = self.rng.random()
+        nested = depth < self.depth
+
+        if nested and roll < 0.12:
+            lines = [f"{indent}if {self.condition(scope)} {{"]
+            lines += self.block(list(scope), list(mutables), depth + 1, indent)
+            if self.rng.random() < 0.5:
+                lines.append(f"{indent}}} else {{")
+                lines += self.block(list(scope), list(mutables), depth + 1, indent)
+            lines.append(f"{indent}}}")
+            return lines
+        if nested and roll < 0.20:
+            var = self.fresh("i")
+            bound = self.rng.randint(1, 10 ** min(self.literal_width, 3))
+            lines = [f"{indent}for {var} in 0..{bound} {{"]
+            lines += self.block(scope + [var], list(mutables), depth + 1, indent)
+            lines.append(f"{indent}}}")
+            return lines
+        if nested and roll < 0.26:
+            counter = self.fresh("w")
+            scope.append(counter)
+            lines = [f"{indent}let mut {counter} = 0;",
+                     f"{indent}while {counter} < {self.literal()} {{",
+                     f"{indent}    {counter} += 1;"]
+            lines += self.block(list(scope), list(mutables), depth + 1, indent)
+            lines.append(f"{indent}}}")
+            return lines
+        if mutables and roll < 0.40:
+            target = self.rng.choice(mutables)
+            op = self.rng.choice(("=", "+=", "-=", "*="))
+            return [f"{indent}{target} {op} {self.expression(scope)};"]
+        if roll < 0.46:
+            return [f"{indent}println!({self.operand(scope)});"]
+        if roll < 0.52:
+            name = self.fresh("arr")
+            items = ", ".join(self.literal() for _ in range(self.rng.randint(1, 6)))
+            maker = "vec!" if self.rng.random() < 0.5 else ""
+            return [f"{indent}let {name} = {maker}[{items}];"]
+        if self.signatures and roll < 0.62:
+            name = self.fresh()
+            line = f"{indent}let {name} = {self.call(scope)};"
+            scope.append(name)
+            return [line]
+
+        name = self.fresh()
+        mutable = self.rng.random() < 0.4
+        annotation = ": i32" if self.rng.random() < 0.3 else ""
+        mut = "mut " if mutable else ""
+        line = f"{indent}let {mut}{name}{annotation} = {self.expression(scope)};"
+        scope.append(name)
+        if mutable:
+            mutables.append(name)
+        return [line]
+
+    def block(self, scope, mutables, depth, indent):
+        inner = indent + "    "
+        count = max(1, self.statements // (2 ** depth))
+        lines = []
+        for _ in range(self.rng.randint(1, count)):
+            lines += self.statement(scope, mutables, depth, inner)
+        return lines
+
+    def function(self, index):
+        name = f"f{index}"
+        arity = self.rng.randint(0, 3)
+        params = [f"p{index}_{k}" for k in range(arity)]
+        header = ", ".join(f"{p}: i32" for p in params)
+        scope = list(params)
+        mutables = []
+        lines = [f"fn {name}({header}) -> i32 {{"]
+        for _ in range(self.statements):
+            lines += self.statement(scope, mutables, 0, "    ")
+        lines.append(f"    return {self.expression(scope)};")
+        lines.append("}")
+        self.signatures.append((name, arity))
+        return lines
+
+    def generate(self):
+        lines = []
+        for index in range(self.functions):
+            lines += self.function(index)
+            lines.append("")
+        scope, mutables = [], []
+        lines.append("fn main() {")
+        for _ in range(self.statements):
+            lines += self.statement(scope, mutables, 0, "    ")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def generate_program(seed=0, **options):
+    """Atajo: genera el texto de un programa sintético"""
+    return ProgramGenerator(seed, **options).generate()
+
+
+DEEP_SHAPES = ("chain", "parens", "blocks", "loops")
+
+
+def generate_deep_program(shape, depth):
+    """
+    Programa patológico con 'depth' niveles de anidamiento:
+
+        chain   let x: i32 = v + v + ... + v;    (binop anidado por la izquierda)
+        parens  let x: i32 = (v + (v + (... )));  (anidado por la derecha)
+        blocks  { { { ... let x = 1; ... } } }
+        loops   while c { while c { ... break; ... } }
+    """
+    if shape == "chain":
+        body = "let x: i32 = " + " + ".join(["v"] * depth) + ";"
+    elif shape == "parens":
+        body = "let x: i32 = " + "(v + " * depth + "v" + ")" * depth + ";"
+    elif shape == "blocks":
+        body = "{ " * depth + "let x = v;" + " }" * depth
+    elif shape == "loops":
+        body = "while c { " * depth + "break;" + " }" * depth
+    else:
+        raise ValueError(f"Forma desconocida: {shape}")
+    return f"fn main() {{\n    let v: i32 = 1;\n    let c = true;\n    {body}\n}}\n"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generador de programas sintéticos")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--functions", type=int, default=10)
+    ap.add_argument("--statements", type=int, default=20)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--literal-width", type=int, default=3)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args(argv)
+    sys.stdout.write(generate_program(
+        args.seed,
+        functions=args.functions,
+        statements=args.statements,
+        depth=args.depth,
+        literal_width=args.literal_width,
+        error_rate=args.error_rate,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Línea de tiempo del análisis en formato Trace Event (chrome://tracing, Perfetto).
+
+Desactivado por defecto: los puntos instrumentados solo comprueban
+'tracing.enabled'. Con start(ruta) cada stats.phase() (read, lex, parse,
+fold, semantic, cada escritura de log) y cada cuerpo de función del
+semántico se registra como un intervalo con pid, tid y el archivo en curso
+(current_file).
+
+Los procesos de los pools (análisis en paralelo, modo proyecto) reciben
+worker_settings() en su inicializador y llaman a init_worker(): guardan sus
+eventos en un archivo propio (trace-PID.json) al terminar. finish() los
+mezcla con los del proceso principal en un único JSON. Los tiempos son de
+time.perf_counter_ns, un reloj monótono común a todos los procesos.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+enabled = False
+current_file = None
+
+_events = []
+_open = 0
+_output = None
+_worker_dir = None
+
+
+def _now():
+    return time.perf_counter_ns() // 1000
+
+
+def begin(name, category, **args):
+    """Abre un intervalo (evento 'B'); cerrar con end()"""
+    global _open
+    _open += 1
+    if current_file is not None:
+        args['file'] = current_file
+    _events.append({'name': name, 'cat': category, 'ph': 'B', 'ts': _now(),
+                    'pid': os.getpid(), 'tid': threading.get_native_id(), 'args': args})
+
+
+def end():
+    """Cierra el último intervalo abierto en este hilo (evento 'E')"""
+    global _open
+    _open -= 1
+    _events.append({'ph': 'E', 'ts': _now(),
+                    'pid': os.getpid(), 'tid': threading.get_native_id()})
+
+
+def depth():
+    """Intervalos abiertos; para unwind() tras una excepción"""
+    return _open
+
+
+def unwind(level):
+    """Cierra los intervalos que una excepción dejó abiertos por encima de 'level'"""
+    while _open > level:
+        end()
+
+
+def start(path):
+    """Empieza a registrar; finish() escribirá la traza en 'path'"""
+    global enabled, _open, _output, _worker_dir
+    _events.clear()
+    _open = 0
+    _output = path
+    _worker_dir = tempfile.mkdtemp(prefix="trace-")
+    enabled = True
+    _name_process("principal")
+
+
+def worker_settings():
+    """Argumento para init_worker en los inicializadores de los pools"""
+    return (_worker_dir, current_file) if enabled else None
+
+
+def init_worker(settings):
+    """En un proceso del pool: registra si el principal registra"""
+    global enabled, current_file, _open, _worker_dir
+    if settings is None:
+        return
+    import multiprocessing.util
+
+    _events.clear()
+    _open = 0
+    _worker_dir, current_file = settings
+    enabled = True
+    _name_process("trabajador")
+    # Los procesos de multiprocessing no ejecutan atexit; Finalize sí
+    multiprocessing.util.Finalize(None, _flush_worker, exitpriority=10)
+
+
+def _name_process(name):
+    _events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                    'args': {'name': f"{name} {os.getpid()}"}})
+
+
+def _flush_worker():
+    path = os.path.join(_worker_dir, f"trace-{os.getpid()}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_events, f)
+    _events.clear()
+
+
+def finish():
+    """
+    Escribe la traza con los eventos de todos los procesos y deja de registrar.
+
+    Returns:
+        str | None: ruta del archivo escrito (None si no se estaba registrando)
+    """
+    global enabled, current_file
+    if not enabled or _worker_dir is None or _output is None:
+        return None
+    enabled = False
+    current_file = None
+
+    events = list(_events)
+    _events.clear()
+    for name in sorted(os.listdir(_worker_dir)):
+        path = os.path.join(_worker_dir, name)
+        with open(path, encoding="utf-8") as f:
+            events.extend(json.load(f))
+        os.remove(path)
+    os.rmdir(_worker_dir)
+
+    with open(_output, "w", encoding="utf-8") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return _output
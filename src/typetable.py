@@ -0,0 +1,124 @@
+"""
+Tabla canónica de tipos del análisis semántico.
+
+Cada tipo existe una sola vez (hash-consing): from_annotation() convierte las
+anotaciones del AST ("i32", ("Vec", t), ("Array", t, n), ("Tuple", [..]))
+en objetos Type compartidos, de modo que la igualdad de tipos es una
+comparación de identidad y los tipos pueden usarse como claves.
+
+La promoción numérica de las operaciones aritméticas se resuelve con una
+tabla precalculada (arithmetic_result).
+"""
+
+
+class Type:
+    """Tipo canónico; no crear directamente, usar las funciones del módulo"""
+
+    __slots__ = ("kind", "args", "name")
+
+    def __init__(self, kind, args, name):
+        self.kind = kind
+        self.args = args
+        self.name = name
+
+    def annotation(self):
+        """Anotación equivalente con la forma del AST"""
+        if self.kind == "named":
+            return self.args[0]
+        if self.kind == "Vec":
+            return ("Vec", self.args[0].annotation())
+        if self.kind == "Array":
+            return ("Array", self.args[0].annotation(), self.args[1])
+        return ("Tuple", [t.annotation() for t in self.args])
+
+    def __str__(self):
+        return self.name
+
+    __repr__ = __str__
+
+    def __reduce__(self):
+        # Al deserializar (p. ej. en otro proceso) se recupera la instancia canónica
+        return (from_annotation, (self.annotation(),))
+
+
+_table = {}
+
+
+def _make(kind, args, name):
+    key = (kind, args)
+    found = _table.get(key)
+    if found is None:
+        # setdefault es atómico: dos hilos obtienen siempre la misma instancia
+        found = _table.setdefault(key, Type(kind, args, name))
+    return found
+
+
+def named(text):
+    """Tipo con nombre (i32, f64, bool, String, ...)"""
+    return _make("named", (text,), text)
+
+
+def vec(element):
+    return _make("Vec", (element,), f"Vec<{element}>")
+
+
+def array(element, size):
+    return _make("Array", (element, size), f"[{element}; {size}]")
+
+
+def tuple_of(elements):
+    elements = tuple(elements)
+    return _make("Tuple", elements, "(" + ", ".join(str(t) for t in elements) + ")")
+
+
+def from_annotation(annotation):
+    """Tipo canónico de una anotación del AST (None si no hay anotación)"""
+    if annotation is None or isinstance(annotation, Type):
+        return annotation
+    if isinstance(annotation, str):
+        return named(annotation)
+    head = annotation[0]
+    if head == "Vec":
+        return vec(from_annotation(annotation[1]))
+    if head == "Array":
+        return array(from_annotation(annotation[1]), annotation[2])
+    if head == "Tuple":
+        return tuple_of(from_annotation(t) for t in annotation[1])
+    raise ValueError(f"Anotación de tipo desconocida: {annotation!r}")
+
+
+I32 = named("i32")
+F64 = named("f64")
+BOOL = named("bool")
+CHAR = named("char")
+STRING = named("String")
+
+# Tipo de un literal según el tipo Python de su valor
+LITERAL_TYPES = {bool: BOOL, int: I32, float: F64}
+
+
+# ============================================================================
+# PROMOCIÓN NUMÉRICA
+# ============================================================================
+
+def _promote(left, right):
+    # f64 domina a i32; en otro caso se conserva el tipo de la izquierda
+    if left is F64 or right is F64:
+        return F64
+    if left is I32 or right is I32:
+        return I32
+    return left
+
+
+_BASE_TYPES = (None, I32, F64, BOOL, CHAR, STRING)
+_PROMOTION = {(l, r): _promote(l, r) for l in _BASE_TYPES for r in _BASE_TYPES}
+
+
+def arithmetic_result(left, right):
+    """Tipo resultante de 'left op right' para + - * / %"""
+    try:
+        return _PROMOTION[(left, right)]
+    except KeyError:
+        # Tipos compuestos: se calcula una vez y queda en la tabla
+        result = _PROMOTION[(left, right)] = _promote(left, right)
+        return result
@@ -4,9 +4,41 @@ Contiene funciones para logging y manejo de archivos.
 """
 
 import os
+import re
 import datetime
 
 
+# Formatos de posición usados por los mensajes de cada fase:
+#   parser:    "Error de sintaxis en línea 3, columna 7: ..."
+#   semántico: "Línea 12: ..."
+#   lexer:     "Illegal character '$' at line 4, column 7"
+_POSITION_PATTERNS = (
+    re.compile(r"l[ií]nea (\d+), columna (\d+)", re.IGNORECASE),
+    re.compile(r"l[ií]nea (\d+)", re.IGNORECASE),
+    re.compile(r"at line (\d+), columns? (\d+)"),
+    re.compile(r"at line (\d+)"),
+)
+
+
+def error_position(message):
+    """
+    Extrae la posición (línea, columna) de un mensaje de error.
+
+    Args:
+        message (str): Mensaje generado por el lexer, el parser o el semántico
+
+    Returns:
+        tuple: (línea, columna) con base 1; 0 si el dato no está en el mensaje
+    """
+    for pattern in _POSITION_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            groups = match.groups()
+            column = int(groups[1]) if len(groups) > 1 else 0
+            return int(groups[0]), column
+    return 0, 0
+
+
 def save_syntax_log(github_user, errors, output_dir):
     """
     Guarda los errores sintácticos en un archivo de log con el formato especificado.
@@ -95,7 +127,7 @@ def save_lexer_log(github_user, tokens, errors_text, source_file, output_dir):
         if errors_text.strip():
             f.write(errors_text)
         else:
-            f.write("No errors reported by lexer (t_error did not print anything).\n")
+            f.write("No errors reported by lexer.\n")
 
     return full_path
 
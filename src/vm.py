@@ -0,0 +1,297 @@
+"""
+Máquina virtual de pila para el bytecode de src/compiler.py.
+
+Ejecuta programas ya analizados (p. ej. como oráculo de pruebas). El bucle de
+despacho es iterativo: las llamadas apilan marcos en una lista, no en la pila
+de Python. Los enteros no desbordan (no se emula i32) y la división entera
+trunca hacia cero como en Rust.
+
+Uso:
+    python src/vm.py run programa.rs [--no-check] [--dis]
+"""
+
+import argparse
+import sys
+
+import analysis
+from compiler import (
+    CompileError, compile_program, divide, remainder,
+    LOAD_CONST, LOAD_LOCAL, STORE_LOCAL, LOAD_GLOBAL, STORE_GLOBAL,
+    ADD, SUB, MUL, DIV, MOD,
+    EQ, NE, LT, GT, LE, GE, NOT,
+    JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+    CALL, RETURN, POP,
+    BUILD_LIST, BUILD_TUPLE, INDEX, STORE_INDEX, TUPLE_GET,
+    PRINT, PRINTLN,
+    FOR_STEP, FOR_ITER, HALT,
+)
+
+MAX_DEPTH = 10000
+
+
+class VMError(Exception):
+    """Error en tiempo de ejecución (división por cero, índice fuera de rango...)"""
+
+    def __init__(self, message, line=0):
+        self.line = line
+        super().__init__(f"Error de ejecución en línea {line}: {message}")
+
+
+# ============================================================================
+# OPERACIONES COMPARTIDAS CON EL INTÉRPRETE DE ÁRBOL (src/interp.py)
+# ============================================================================
+
+def format_value(value):
+    """Representación de un valor como la imprimiría Rust"""
+    if value is None:
+        return "()"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value.is_integer() and abs(value) < 1e16:
+            return str(int(value))
+        return repr(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(format_value(v) for v in value) + "]"
+    if isinstance(value, tuple):
+        return "(" + ", ".join(format_value(v) for v in value) + ")"
+    return str(value)
+
+
+def render_print(values):
+    """Texto de print!/println!: plantilla con '{}' o valores separados por espacio"""
+    if values and isinstance(values[0], str) and "{}" in values[0] and len(values) > 1:
+        pieces = values[0].split("{}")
+        out = [pieces[0]]
+        rest = values[1:]
+        for i, piece in enumerate(pieces[1:]):
+            out.append(format_value(rest[i]) if i < len(rest) else "{}")
+            out.append(piece)
+        return "".join(out)
+    return " ".join(format_value(v) for v in values)
+
+
+# ============================================================================
+# MÁQUINA VIRTUAL
+# ============================================================================
+
+class VM:
+    """Intérprete del bytecode de un Program"""
+
+    def __init__(self, program, output=None, max_depth=MAX_DEPTH):
+        self.program = program
+        self.output = output or sys.stdout.write
+        self.max_depth = max_depth
+
+    def run(self):
+        """Ejecuta el programa hasta HALT o el return del nivel superior"""
+        functions = self.program.functions
+        write = self.output
+
+        code = self.program.main
+        ops, args, consts = code.ops, code.args, code.consts
+        loc = globals_ = [None] * code.nlocals
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = []
+        pc = 0
+
+        try:
+            while True:
+                op = ops[pc]
+                arg = args[pc]
+                pc += 1
+
+                if op == LOAD_LOCAL:
+                    push(loc[arg])
+                elif op == STORE_LOCAL:
+                    loc[arg] = pop()
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+                elif op == ADD:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] + b
+                elif op == FOR_STEP:
+                    # Incrementa el contador; si sigue en rango salta al cuerpo
+                    counter = loc[arg] + 1
+                    loc[arg] = counter
+                    pc = args[pc] if counter < loc[arg + 1] else pc + 1
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == JUMP_IF_TRUE:
+                    if pop():
+                        pc = arg
+                elif op == LT:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] < b
+                elif op == SUB:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] - b
+                elif op == MUL:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] * b
+                elif op == JUMP:
+                    pc = arg
+                elif op == EQ:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] == b
+                elif op == GT:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] > b
+                elif op == LE:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] <= b
+                elif op == GE:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] >= b
+                elif op == NE:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = stack[-1] != b
+                elif op == NOT:
+                    stack[-1] = not stack[-1]
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = arg
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = arg
+                    else:
+                        pop()
+                elif op == INDEX:
+                    index = pop()
+                    if index < 0:
+                        raise IndexError(index)
+                    stack[-1] = stack[-1][index]
+                elif op == LOAD_GLOBAL:
+                    push(globals_[arg])
+                elif op == STORE_GLOBAL:
+                    globals_[arg] = pop()
+                elif op == CALL:
+                    callee = functions[arg]
+                    if len(frames) >= self.max_depth:
+                        raise RecursionError("desbordamiento de pila")
+                    frames.append((code, pc, loc))
+                    code = callee
+                    ops, args, consts = code.ops, code.args, code.consts
+                    loc = [None] * code.nlocals
+                    if code.nparams:
+                        loc[:code.nparams] = stack[-code.nparams:]
+                        del stack[-code.nparams:]
+                    pc = 0
+                elif op == RETURN:
+                    if not frames:
+                        break
+                    code, pc, loc = frames.pop()
+                    ops, args, consts = code.ops, code.args, code.consts
+                elif op == POP:
+                    pop()
+                elif op == DIV:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = divide(stack[-1], b)
+                elif op == MOD:
+                    b = consts[arg - 1] if arg else pop()
+                    stack[-1] = remainder(stack[-1], b)
+                elif op == FOR_ITER:
+                    sequence = loc[arg]
+                    index = loc[arg + 1]
+                    if index < len(sequence):
+                        loc[arg + 2] = sequence[index]
+                        loc[arg + 1] = index + 1
+                        pc = args[pc]
+                    else:
+                        pc += 1
+                elif op == BUILD_LIST:
+                    items = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    push(items)
+                elif op == BUILD_TUPLE:
+                    items = tuple(stack[len(stack) - arg:])
+                    del stack[len(stack) - arg:]
+                    push(items)
+                elif op == STORE_INDEX:
+                    value = pop()
+                    index = pop()
+                    if index < 0:
+                        raise IndexError(index)
+                    pop()[index] = value
+                elif op == TUPLE_GET:
+                    stack[-1] = stack[-1][arg]
+                elif op == PRINT or op == PRINTLN:
+                    values = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    write(render_print(values) + ("\n" if op == PRINTLN else ""))
+                elif op == HALT:
+                    break
+                else:
+                    raise RuntimeError(f"código de operación desconocido {op}")
+        except (ZeroDivisionError, IndexError, TypeError, RecursionError) as e:
+            line = code.lines[pc - 1] if pc > 0 else 0
+            message = "índice fuera de rango" if isinstance(e, IndexError) else str(e)
+            raise VMError(message, line) from None
+
+
+# ============================================================================
+# PUNTO DE ENTRADA
+# ============================================================================
+
+def check_source(text, check=True):
+    """
+    Analiza el texto y devuelve el AST listo para compilar.
+
+    Lanza CompileError si hay errores léxicos o sintácticos, o semánticos
+    cuando 'check' es verdadero.
+    """
+    result = analysis.analyze_source(text)
+    errors = result.lex_errors + result.syntax_errors
+    if check:
+        errors = errors + result.semantic_errors
+    if errors or result.ast is None:
+        raise CompileError("el programa tiene errores:\n  " + "\n  ".join(errors or ["sin AST"]))
+    return result.ast
+
+
+def run_source(text, output=None, check=True):
+    """Analiza, compila y ejecuta un programa; devuelve el Program compilado"""
+    program = compile_program(check_source(text, check))
+    VM(program, output).run()
+    return program
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Máquina virtual de bytecode")
+    sub = ap.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Ejecuta un programa")
+    run.add_argument("archivo")
+    run.add_argument("--no-check", action="store_true",
+                     help="Ejecutar aunque el análisis semántico informe errores")
+    run.add_argument("--dis", action="store_true", help="Mostrar el bytecode antes de ejecutar")
+    args = ap.parse_args(argv)
+
+    with open(args.archivo, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    try:
+        program = compile_program(check_source(text, not args.no_check))
+        if args.dis:
+            print(program.disassemble())
+            print()
+        VM(program).run()
+    except (CompileError, VMError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    except RecursionError:
+        # Las expresiones se compilan sin recursión, pero no los bloques anidados
+        print("❌ el programa está demasiado anidado para compilarlo", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
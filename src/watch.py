@@ -0,0 +1,237 @@
+"""
+Modo vigilancia: re-analiza solo los archivos .rs que cambian en un árbol.
+
+Usa inotify (vía ctypes) cuando el sistema lo ofrece y, si no, sondea los
+mtimes. Los eventos se agrupan durante una ventana corta y los guardados que
+no modifican el contenido (mismo hash) se descartan sin analizar.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import time
+from datetime import datetime
+
+import analysis
+
+SOURCE_SUFFIX = ".rs"
+
+
+def iter_sources(root):
+    """Recorre el árbol y devuelve las rutas de los archivos .rs"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith("."):
+                    stack.append(entry.path)
+            elif entry.name.endswith(SOURCE_SUFFIX):
+                yield entry.path
+
+
+# ============================================================================
+# FUENTES DE EVENTOS
+# ============================================================================
+
+class PollingSource:
+    """Detecta cambios comparando (mtime, tamaño) de cada archivo"""
+
+    def __init__(self, root, interval=0.5):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in iter_sources(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Bloquea hasta detectar cambios o agotar 'timeout'; devuelve las rutas"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+            changed.update(p for p in self.snapshot if p not in current)
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifySource:
+    """Eventos de inotify sobre cada directorio del árbol (solo Linux)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root):
+        name = ctypes.util.find_library("c")
+        if not name:
+            raise OSError("libc no disponible")
+        self.libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify no disponible")
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.watches = {}
+        self._add_tree(root)
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def _add_tree(self, root):
+        self._add_watch(root)
+        for current, dirs, _ in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for d in dirs:
+                self._add_watch(os.path.join(current, d))
+
+    def wait(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # Directorio nuevo: vigilarlo y tratar sus .rs como cambiados
+                    self._add_tree(path)
+                    changed.update(iter_sources(path))
+            elif name.endswith(SOURCE_SUFFIX):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_source(root, interval=0.5, polling=False):
+    """Fuente de eventos para 'root': inotify si está disponible, si no sondeo"""
+    if not polling:
+        try:
+            return InotifySource(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingSource(root, interval)
+
+
+# ============================================================================
+# VIGILANTE
+# ============================================================================
+
+def print_result(path, result, elapsed):
+    """Informe por defecto de un archivo re-analizado"""
+    stamp = datetime.now().strftime("%H:%M:%S")
+    errors = result.lex_errors + result.syntax_errors + result.semantic_errors
+    if not errors:
+        print(f"[{stamp}] ✓ {path}: sin errores ({elapsed * 1000:.1f} ms)")
+        return
+    print(f"[{stamp}] ✗ {path}: {len(errors)} errores ({elapsed * 1000:.1f} ms)")
+    for err in errors:
+        print(f"  - {err}")
+
+
+class Watcher:
+    """Mantiene el hash de cada archivo y re-analiza solo los modificados"""
+
+    def __init__(self, root, debounce=0.1, interval=0.5, polling=False, report=print_result,
+                 max_errors=None):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.max_errors = max_errors
+        self.report = report
+        self.hashes = {}
+        self.source = open_source(self.root, interval, polling)
+
+    def process(self, paths):
+        """Analiza las rutas cuyo contenido cambió; devuelve cuántas se analizaron"""
+        analyzed = 0
+        for path in sorted(paths):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                # Archivo eliminado o movido
+                if self.hashes.pop(path, None) is not None:
+                    print(f"  (eliminado) {os.path.relpath(path, self.root)}")
+                continue
+
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if self.hashes.get(path) == digest:
+                continue
+            self.hashes[path] = digest
+
+            start = time.perf_counter()
+            result = analysis.analyze_source(data.decode("utf-8", "replace"), self.max_errors)
+            self.report(os.path.relpath(path, self.root), result, time.perf_counter() - start)
+            analyzed += 1
+        return analyzed
+
+    def wait_batch(self):
+        """Espera un cambio y agrupa los que lleguen durante la ventana 'debounce'"""
+        paths = self.source.wait(None)
+        while True:
+            more = self.source.wait(self.debounce)
+            if not more:
+                return paths
+            paths |= more
+
+    def run(self):
+        print(f"👁  Vigilando {self.root} ({type(self.source).__name__}); Ctrl+C para salir")
+        self.process(set(iter_sources(self.root)))
+        try:
+            while True:
+                self.process(self.wait_batch())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.source.close()
@@ -0,0 +1,200 @@
+"""
+Índice de referencias cruzadas: definición y usos de cada declaración.
+
+El análisis semántico deja en semantic.xref_records una entrada por aparición
+de un nombre, ya resuelta contra el scope en que aparece. El AST solo tiene
+líneas, así que build_index() sitúa cada aparición en la columna del token ID
+correspondiente: la k-ésima aparición de un nombre en una línea es el
+k-ésimo token con ese nombre en esa línea.
+
+Las posiciones son (línea, columna) en base 1, como en los mensajes de error.
+Todas las consultas por posición son una búsqueda binaria.
+
+Uso:
+    python src/xref.py refs programa.rs LINEA:COLUMNA
+    python src/xref.py def programa.rs LINEA:COLUMNA
+    python src/xref.py rename programa.rs LINEA:COLUMNA NUEVO [--write]
+    python src/xref.py list programa.rs
+"""
+
+import argparse
+import sys
+from bisect import bisect_right
+
+from lexer import reserved
+
+
+class XrefIndex:
+    """Definiciones y usos de las declaraciones de un programa"""
+
+    def __init__(self, definitions, uses, types=None):
+        # declaración -> (línea, columna) y declaración -> [(línea, columna), ...]
+        self.definitions = definitions
+        self.uses = {key: sorted(spans) for key, spans in uses.items()}
+        # declaración -> (tipo, función que la contiene), de semantic.declaration_types
+        self.types = types or {}
+
+        occurrences = [(span, key) for key, span in definitions.items()]
+        occurrences += [(span, key) for key, spans in self.uses.items() for span in spans]
+        occurrences.sort()
+        self._starts = [span for span, _ in occurrences]
+        self._keys = [key for _, key in occurrences]
+
+    def symbol_at(self, line, column):
+        """Declaración cuyo nombre ocupa la posición indicada (None si ninguna)"""
+        i = bisect_right(self._starts, (line, column)) - 1
+        if i < 0:
+            return None
+        start_line, start_column = self._starts[i]
+        key = self._keys[i]
+        if start_line == line and column < start_column + len(key[0]):
+            return key
+        return None
+
+    def definition(self, line, column):
+        """Posición de la definición del nombre en (line, column)"""
+        key = self.symbol_at(line, column)
+        return self.definitions.get(key) if key else None
+
+    def references(self, line, column, include_definition=True):
+        """Posiciones ordenadas de todos los usos del nombre en (line, column)"""
+        key = self.symbol_at(line, column)
+        if key is None:
+            return []
+        spans = list(self.uses.get(key, []))
+        if include_definition and key in self.definitions:
+            spans.append(self.definitions[key])
+            spans.sort()
+        return spans
+
+    def rename(self, line, column, new_name):
+        """
+        Ediciones para renombrar la declaración en (line, column).
+
+        Returns:
+            list: (línea, columna, longitud) de cada aparición a sustituir
+
+        Raises:
+            ValueError: si new_name no es un identificador válido
+        """
+        if not new_name.isidentifier() or new_name in reserved:
+            raise ValueError(f"'{new_name}' no es un identificador válido")
+        key = self.symbol_at(line, column)
+        if key is None:
+            return []
+        return [(l, c, len(key[0])) for l, c in self.references(line, column)]
+
+    def declarations(self, name=None):
+        """Declaraciones en orden de fuente (solo las de 'name' si se indica)"""
+        keys = sorted(self.definitions, key=self.definitions.get)
+        return [key for key in keys if name is None or key[0] == name]
+
+
+def build_index(records, tokens, text, types=None):
+    """
+    Construye el índice a partir de semantic.xref_records y de los tokens.
+
+    Args:
+        records: (nombre, línea, declaración, es_definición) en orden de fuente
+        tokens: tokens de la fase léxica (se usan los ID)
+        text: código fuente, para calcular las columnas
+        types: semantic.declaration_types (opcional)
+    """
+    columns = {}
+    for tok in tokens:
+        if tok.type == "ID":
+            column = tok.lexpos - text.rfind("\n", 0, tok.lexpos)
+            columns.setdefault((tok.lineno, tok.value), []).append(column)
+
+    definitions = {}
+    uses = {}
+    seen = {}
+    for name, line, key, is_definition in records:
+        place = (line, name)
+        k = seen.get(place, 0)
+        found = columns.get(place)
+        if found is None or k >= len(found):
+            continue
+        seen[place] = k + 1
+        if key is None:
+            continue
+        if is_definition:
+            definitions[key] = (line, found[k])
+        else:
+            uses.setdefault(key, []).append((line, found[k]))
+    return XrefIndex(definitions, uses, types)
+
+
+def apply_edits(text, edits, new_name):
+    """Aplica las ediciones de XrefIndex.rename al texto"""
+    lines = text.split("\n")
+    # De derecha a izquierda para que las columnas sigan siendo válidas
+    for line, column, length in sorted(edits, reverse=True):
+        current = lines[line - 1]
+        lines[line - 1] = current[:column - 1] + new_name + current[column - 1 + length:]
+    return "\n".join(lines)
+
+
+def _position(text):
+    line, _, column = text.partition(":")
+    return int(line), int(column or 1)
+
+
+def main(argv=None):
+    import analysis
+
+    ap = argparse.ArgumentParser(description="Consultas de referencias cruzadas")
+    sub = ap.add_subparsers(dest="command", required=True)
+    for command, help_text in (("refs", "Usos del nombre en la posición"),
+                               ("def", "Definición del nombre en la posición")):
+        query = sub.add_parser(command, help=help_text)
+        query.add_argument("archivo")
+        query.add_argument("posicion", type=_position, help="LINEA:COLUMNA (base 1)")
+    rename = sub.add_parser("rename", help="Renombra la declaración en la posición")
+    rename.add_argument("archivo")
+    rename.add_argument("posicion", type=_position, help="LINEA:COLUMNA (base 1)")
+    rename.add_argument("nuevo")
+    rename.add_argument("--write", action="store_true",
+                        help="Sobrescribe el archivo en lugar de mostrar el resultado")
+    listing = sub.add_parser("list", help="Todas las declaraciones con su número de usos")
+    listing.add_argument("archivo")
+    args = ap.parse_args(argv)
+
+    with open(args.archivo, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    index = analysis.analyze_source(text).xref
+
+    if args.command == "list":
+        for key in index.declarations():
+            line, column = index.definitions[key]
+            print(f"{line}:{column}\t{key[2]}\t{key[0]}\t{len(index.uses.get(key, []))} usos")
+        return 0
+
+    line, column = args.posicion
+    if index.symbol_at(line, column) is None:
+        print(f"❌ No hay ningún nombre declarado en {line}:{column}", file=sys.stderr)
+        return 1
+    if args.command == "refs":
+        for l, c in index.references(line, column):
+            print(f"{args.archivo}:{l}:{c}")
+    elif args.command == "def":
+        l, c = index.definition(line, column)
+        print(f"{args.archivo}:{l}:{c}")
+    else:
+        try:
+            edits = index.rename(line, column, args.nuevo)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        result = apply_edits(text, edits, args.nuevo)
+        if args.write:
+            with open(args.archivo, "w", encoding="utf-8") as f:
+                f.write(result)
+            print(f"✓ {len(edits)} apariciones renombradas")
+        else:
+            sys.stdout.write(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
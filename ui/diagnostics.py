@@ -0,0 +1,291 @@
+"""
+Panel de diagnósticos de la interfaz: una tabla virtual sobre ttk.Treeview.
+
+Los resultados de un análisis llegan de una vez (set_diagnostics) y se
+guardan como datos en DiagnosticList, que aplica el filtro por fase y el
+orden elegido. El Treeview solo tiene tantas filas como caben
+en pantalla; al desplazarse se reescriben sus valores con la ventana
+correspondiente de la lista, así que mostrar diez mil diagnósticos cuesta lo
+mismo que mostrar veinte. La barra de desplazamiento se maneja a mano con
+esa ventana.
+
+Un clic en una fila llama a 'on_select' con su Diagnostic (la interfaz lleva
+el editor a la línea); un clic en una cabecera ordena por esa columna.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+import utils
+
+# Orden del pipeline, usado también para ordenar por fase
+PHASES = ("léxico", "sintáctico", "semántico")
+ALL = "todas"
+
+COLUMNS = (
+    ("phase", "Fase", 90),
+    ("line", "Línea", 60),
+    ("message", "Mensaje", 600),
+)
+
+
+class Diagnostic:
+    """Un diagnóstico de una fase del análisis"""
+
+    __slots__ = ("phase", "line", "column", "message")
+
+    def __init__(self, phase, line, column, message):
+        self.phase = phase
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __repr__(self):
+        return f"Diagnostic({self.phase!r}, {self.line}, {self.message!r})"
+
+
+def from_messages(phase, messages):
+    """
+    Diagnósticos a partir de los mensajes de texto de una fase; la posición
+    sale del propio mensaje (utils.error_position)
+    """
+    diagnostics = []
+    for message in messages:
+        message = str(message)
+        line, column = utils.error_position(message)
+        diagnostics.append(Diagnostic(phase, line, column, message))
+    return diagnostics
+
+
+def from_lex_errors(errors):
+    """Diagnósticos de los LexError del lexer (que ya traen línea y columna)"""
+    return [Diagnostic("léxico", error.line, error.column, str(error))
+            for error in errors]
+
+
+_SORT_KEYS = {
+    'phase': lambda d: (PHASES.index(d.phase) if d.phase in PHASES else len(PHASES), d.line),
+    'line': lambda d: (d.line, d.column),
+    'message': lambda d: d.message,
+}
+
+
+class DiagnosticList:
+    """Diagnósticos con filtro y orden; 'view' es lo que se muestra"""
+
+    def __init__(self):
+        self.items = []
+        self.view = []
+        self.phase = ALL
+        self.sort_column = None
+        self.reverse = False
+
+    def set_items(self, diagnostics):
+        # El orden de llegada (el de las fases) es el orden por defecto
+        self.items = list(diagnostics)
+        self.refresh()
+
+    def set_filter(self, phase=ALL):
+        self.phase = phase
+        self.refresh()
+
+    def sort_by(self, column):
+        """Ordena por 'column'; repetir la misma columna invierte el orden"""
+        if column == self.sort_column:
+            self.reverse = not self.reverse
+        else:
+            self.sort_column = column
+            self.reverse = False
+        self.refresh()
+
+    def refresh(self):
+        view = [d for d in self.items if self.phase == ALL or d.phase == self.phase]
+        if self.sort_column is not None:
+            # sort es estable: a igual clave se conserva el orden de llegada
+            view.sort(key=_SORT_KEYS[self.sort_column], reverse=self.reverse)
+        self.view = view
+
+
+class DiagnosticsPanel(tk.Frame):
+    """Tabla virtual de diagnósticos con filtros (ver el docstring del módulo)"""
+
+    def __init__(self, parent, on_select=None, **options):
+        options.setdefault("bg", "#1e1e1e")
+        super().__init__(parent, **options)
+        self.on_select = on_select
+        self.data = DiagnosticList()
+        self.first = 0          # índice en data.view de la primera fila visible
+        self.rows = 0           # filas del Treeview
+        self.selected = None    # índice en data.view del diagnóstico elegido
+
+        # Filtro
+        bar = tk.Frame(self, bg="#2d2d30")
+        bar.pack(fill=tk.X)
+        tk.Label(bar, text="Fase:", bg="#2d2d30", fg="white").pack(side=tk.LEFT, padx=(8, 2))
+        self.phase_filter = ttk.Combobox(bar, values=(ALL,) + PHASES, state="readonly", width=11)
+        self.phase_filter.set(ALL)
+        self.phase_filter.pack(side=tk.LEFT, pady=3)
+        self.count_label = tk.Label(bar, text="", bg="#2d2d30", fg="#858585")
+        self.count_label.pack(side=tk.RIGHT, padx=8)
+        self.phase_filter.bind("<<ComboboxSelected>>", self._filter_changed)
+
+        # Tabla y barra de desplazamiento virtual
+        style = ttk.Style(self)
+        style.configure("Diagnostics.Treeview", background="#0c0c0c",
+                        fieldbackground="#0c0c0c", foreground="#cccccc")
+        body = tk.Frame(self, bg="#1e1e1e")
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(body, columns=[c[0] for c in COLUMNS], show="headings",
+                                 selectmode="browse", style="Diagnostics.Treeview")
+        for column, title, width in COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, stretch=(column == "message"),
+                             anchor=tk.E if column == "line" else tk.W)
+        self.tree.tag_configure("error", foreground="#f48771")
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.move_selection(-max(1, self.rows - 1)))
+        self.tree.bind("<Next>", lambda e: self.move_selection(max(1, self.rows - 1)))
+
+    # -- Datos -----------------------------------------------------------------
+
+    def set_diagnostics(self, diagnostics):
+        """Reemplaza el contenido por 'diagnostics' (una sola actualización)"""
+        self.data.set_items(diagnostics)
+        self.first = 0
+        self.selected = None
+        self._render()
+
+    def clear(self):
+        self.set_diagnostics([])
+
+    def sort_by(self, column):
+        self.data.sort_by(column)
+        for name, title, _ in COLUMNS:
+            arrow = ""
+            if name == column:
+                arrow = " ▼" if self.data.reverse else " ▲"
+            self.tree.heading(name, text=title + arrow)
+        self.selected = None
+        self._render()
+
+    def _filter_changed(self, event=None):
+        self.data.set_filter(self.phase_filter.get())
+        self.first = 0
+        self.selected = None
+        self._render()
+
+    # -- Ventana visible -------------------------------------------------------
+
+    def _on_resize(self, event=None):
+        rows = self._fitting_rows()
+        if rows != self.rows:
+            self._set_rows(rows)
+            self._render()
+
+    def _fitting_rows(self):
+        """Filas completas que caben en el Treeview con su altura actual"""
+        if not self.rows:
+            self._set_rows(1)
+        box = self.tree.bbox("0")
+        if not box:
+            # Aún sin dibujar: se vuelve a medir en cuanto lo esté
+            if self.tree.winfo_ismapped():
+                self.after(50, self._on_resize)
+            return self.rows
+        top, height = box[1], max(1, box[3])
+        return max(1, (self.tree.winfo_height() - top) // height)
+
+    def _set_rows(self, rows):
+        """Crea o borra filas del Treeview hasta tener 'rows' (iid = posición)"""
+        for row in range(self.rows, rows):
+            self.tree.insert("", tk.END, iid=str(row), values=("", "", ""))
+        for row in range(rows, self.rows):
+            self.tree.delete(str(row))
+        self.rows = rows
+
+    def _clamp(self, first):
+        return max(0, min(first, len(self.data.view) - self.rows))
+
+    def scroll(self, amount, unit="units"):
+        step = max(1, self.rows - 1) if unit == "pages" else 1
+        first = self._clamp(self.first + int(amount) * step)
+        if first != self.first:
+            self.first = first
+            self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            first = self._clamp(int(float(amount) * len(self.data.view)))
+            if first != self.first:
+                self.first = first
+                self._render()
+        else:
+            self.scroll(amount, unit)
+
+    def _render(self):
+        """Vuelca en las filas del Treeview la ventana visible de data.view"""
+        view = self.data.view
+        self.first = self._clamp(self.first)
+        selection = ()
+        for row in range(self.rows):
+            index = self.first + row
+            if index < len(view):
+                d = view[index]
+                values = (d.phase, d.line or "", d.message)
+                tags = ("error",)
+                if index == self.selected:
+                    selection = (str(row),)
+            else:
+                values, tags = ("", "", ""), ()
+            self.tree.item(str(row), values=values, tags=tags)
+        # La selección sigue al diagnóstico, no a la fila
+        self.tree.selection_set(selection)
+
+        total = len(view)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f"{total} de {len(self.data.items)}" if total != len(self.data.items) else str(total)
+        self.count_label.config(text=f"{shown} diagnósticos")
+
+    # -- Selección -------------------------------------------------------------
+
+    def _on_tree_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        index = self.first + int(selection[0])
+        # _render vuelve a seleccionar la fila del elegido: no es un clic nuevo
+        if index < len(self.data.view) and index != self.selected:
+            self._select(index)
+
+    def move_selection(self, delta):
+        """Mueve la selección 'delta' filas, desplazando la ventana si hace falta"""
+        if not self.data.view:
+            return "break"
+        current = self.first if self.selected is None else self.selected + delta
+        index = max(0, min(current, len(self.data.view) - 1))
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.rows:
+            self.first = index - self.rows + 1
+        self._select(index)
+        self._render()
+        return "break"
+
+    def _select(self, index):
+        self.selected = index
+        if self.on_select is not None:
+            self.on_select(self.data.view[index])
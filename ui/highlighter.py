@@ -0,0 +1,259 @@
+"""
+Resaltado de sintaxis incremental para el editor de la interfaz.
+
+Solo se analizan las líneas visibles más un margen (MARGIN_LINES), cada una
+por separado con el lexer de PLY (lexer.build_lexer). Para poder empezar en
+cualquier línea se guarda el estado al comienzo de cada una (en 'states'):
+código, dentro de un comentario /* */ (t_COMMENT_MULTI) o dentro de una
+cadena de varias líneas. Cada línea etiquetada se recuerda con su texto y su
+estado inicial, y al refrescar solo se vuelven a etiquetar las que cambiaron.
+
+Las ediciones se interceptan en el comando Tcl del widget (insert, delete,
+replace), como hace el redirector de IDLE: se descartan los estados desde la
+línea editada y el refresco se programa con after_idle. Así una pulsación
+cuesta lo mismo en un archivo de diez líneas que en uno de cien mil; solo
+saltar lejos de lo ya visto recorre las líneas intermedias, y únicamente
+para calcular sus estados.
+
+A diferencia del lexer, un /* o unas comillas sin cerrar se resaltan hasta
+el final del texto, como en cualquier editor, en lugar de como operadores o
+caracteres ilegales.
+"""
+
+import re
+import tkinter as tk
+
+import lexer as lexmod
+from budget import ErrorBudget
+
+# Estado del lexer al comienzo de una línea
+CODE, COMMENT, STRING = 0, 1, 2
+
+# Líneas que se analizan por encima y por debajo de las visibles
+MARGIN_LINES = 30
+
+# Lo que cambia de estado dentro de una línea. Los literales de carácter se
+# reconocen para que '"' no abra una cadena
+_DELIMITER = re.compile(r"""//|/\*|"|'(?:\\.|[^'\\])'""")
+_COMMENT_END = re.compile(r"\*/")
+_STRING_END = re.compile(r'(?:\\.|[^"\\])*"')
+
+TYPE_NAMES = frozenset((
+    "i8", "i16", "i32", "i64", "u8", "u16", "u32", "u64", "usize", "isize",
+    "f32", "f64", "bool", "char", "str", "String", "Vec",
+))
+
+# Etiqueta de cada tipo de token (los ID se deciden aparte)
+TOKEN_TAGS = {"INTEGER": "number", "FLOAT": "number", "TRUE": "number", "FALSE": "number",
+              "STRING": "string", "CHAR": "string", "PRINT": "macro", "PRINTLN": "macro"}
+TOKEN_TAGS.update((kind, "keyword") for kind in lexmod.reserved.values()
+                  if kind not in TOKEN_TAGS)
+
+STYLES = {
+    "keyword": {"foreground": "#569cd6"},
+    "type": {"foreground": "#4ec9b0"},
+    "function": {"foreground": "#dcdcaa"},
+    "macro": {"foreground": "#c586c0"},
+    "number": {"foreground": "#b5cea8"},
+    "string": {"foreground": "#ce9178"},
+    "comment": {"foreground": "#6a9955"},
+    "lex_error": {"foreground": "#f44747", "underline": True},
+}
+
+
+class LineScanner:
+    """Analiza una línea a partir del estado con el que empieza"""
+
+    def __init__(self):
+        # Presupuesto propio: los caracteres ilegales no son errores del análisis
+        self.lexer = lexmod.build_lexer(error_budget=ErrorBudget())
+
+    def scan(self, text, state, tokens=True):
+        """
+        Returns:
+            tuple: ([(etiqueta, columna inicial, columna final)], estado al final)
+                   (sin etiquetas de tokens si tokens es falso)
+        """
+        spans = []
+        end = len(text)
+        pos = 0
+        if state == COMMENT:
+            match = _COMMENT_END.search(text)
+            if match is None:
+                return [("comment", 0, end)], COMMENT
+            pos = match.end()
+            spans.append(("comment", 0, pos))
+        elif state == STRING:
+            match = _STRING_END.match(text)
+            if match is None:
+                return [("string", 0, end)], STRING
+            pos = match.end()
+            spans.append(("string", 0, pos))
+
+        code = pos
+        while True:
+            match = _DELIMITER.search(text, pos)
+            if match is None:
+                break
+            delimiter = match.group()
+            if delimiter[0] == "'":
+                pos = match.end()
+                continue
+            start = match.start()
+            if tokens:
+                self._tokens(text, code, start, spans)
+            if delimiter == "//":
+                spans.append(("comment", start, end))
+                return spans, CODE
+            if delimiter == "/*":
+                close = _COMMENT_END.search(text, start + 2)
+                if close is None:
+                    spans.append(("comment", start, end))
+                    return spans, COMMENT
+                pos = close.end()
+                spans.append(("comment", start, pos))
+            else:
+                close = _STRING_END.match(text, start + 1)
+                if close is None:
+                    spans.append(("string", start, end))
+                    return spans, STRING
+                pos = close.end()
+                spans.append(("string", start, pos))
+            code = pos
+        if tokens:
+            self._tokens(text, code, end, spans)
+        return spans, CODE
+
+    def _tokens(self, text, start, end, spans):
+        """Etiqueta los tokens de un tramo sin comentarios ni cadenas abiertas"""
+        segment = text[start:end]
+        if not segment or segment.isspace():
+            return
+        lx = self.lexer
+        lx.errors = []
+        lx.input(segment)
+        found = []
+        while True:
+            tok = lx.token()
+            if tok is None:
+                break
+            found.append((tok.type, tok.value, tok.lexpos, lx.lexpos))
+
+        for i, (kind, value, first, last) in enumerate(found):
+            if kind == "ID":
+                if value in TYPE_NAMES:
+                    tag = "type"
+                elif i + 1 < len(found) and found[i + 1][0] == "LPAREN":
+                    tag = "function"
+                else:
+                    continue
+            else:
+                tag = TOKEN_TAGS.get(kind)
+                if tag is None:
+                    continue
+            spans.append((tag, start + first, start + last))
+        for error in lx.errors:
+            spans.append(("lex_error", start + error.lexpos,
+                          start + error.lexpos + len(error.text)))
+
+
+class Highlighter:
+    """Resaltado incremental de un tk.Text (ver el docstring del módulo)"""
+
+    def __init__(self, text, margin=MARGIN_LINES):
+        self.text = text
+        self.margin = margin
+        self.scanner = LineScanner()
+        self.states = [CODE]   # estado al comienzo de cada línea (índice 0 = línea 1)
+        self.tagged = {}       # línea -> (texto, estado inicial, estado final)
+        self._pending = None
+
+        for tag, options in STYLES.items():
+            text.tag_configure(tag, **options)
+
+        # Las ediciones y desplazamientos pasan por _dispatch
+        self._original = text._w + "_original"
+        text.tk.call("rename", text._w, self._original)
+        text.tk.createcommand(text._w, self._dispatch)
+        text.bind("<Configure>", self.schedule, add="+")
+        self.schedule()
+
+    def _dispatch(self, operation, *args):
+        call = self.text.tk.call
+        try:
+            if operation in ("insert", "delete", "replace"):
+                line = int(call(self._original, "index", args[0]).split(".")[0])
+                before = call(self._original, "index", "end")
+                result = call((self._original, operation) + args)
+                after = call(self._original, "index", "end")
+                self.edited(line, int(after.split(".")[0]) - int(before.split(".")[0]))
+                return result
+            result = call((self._original, operation) + args)
+            if operation in ("yview", "see") and args:
+                self.schedule()
+            return result
+        except tk.TclError:
+            # Como el redirector de IDLE: las vinculaciones de Tk protegen con
+            # 'catch' órdenes que pueden fallar (p. ej. sel.first sin selección)
+            return ""
+
+    def edited(self, line, delta):
+        """Registra una edición a partir de 'line' que añadió 'delta' líneas"""
+        # El estado al comienzo de 'line' sigue siendo válido
+        del self.states[line:]
+        if delta:
+            moved = {}
+            for number, entry in self.tagged.items():
+                if number <= line:
+                    moved[number] = entry
+                elif number + delta > line:
+                    moved[number + delta] = entry
+            self.tagged = moved
+        self.schedule()
+
+    def schedule(self, event=None):
+        """Programa un refresco (varios eventos seguidos se agrupan en uno)"""
+        if self._pending is None:
+            self._pending = self.text.after_idle(self.refresh)
+
+    def refresh(self):
+        """Etiqueta las líneas visibles y el margen que hayan cambiado"""
+        self._pending = None
+        text = self.text
+        first = int(text.index("@0,0").split(".")[0])
+        last = int(text.index(f"@0,{text.winfo_height()}").split(".")[0])
+        total = int(text.index("end-1c").split(".")[0])
+        low = max(1, first - self.margin)
+        high = min(total, last + self.margin)
+
+        self._advance_states(low)
+        tagged = {}
+        lines = text.get(f"{low}.0", f"{high}.end").split("\n")
+        for number, line in enumerate(lines, low):
+            state = self.states[number - 1]
+            entry = self.tagged.get(number)
+            if entry is None or entry[0] != line or entry[1] != state:
+                spans, end = self.scanner.scan(line, state)
+                self._retag(number, spans)
+                entry = (line, state, end)
+            tagged[number] = entry
+            if number == len(self.states):
+                self.states.append(entry[2])
+        self.tagged = tagged
+
+    def _advance_states(self, line):
+        """Calcula los estados hasta el comienzo de 'line' (solo estados, sin tokens)"""
+        known = len(self.states)
+        if known >= line:
+            return
+        state = self.states[-1]
+        for text in self.text.get(f"{known}.0", f"{line - 1}.end").split("\n"):
+            state = self.scanner.scan(text, state, tokens=False)[1]
+            self.states.append(state)
+
+    def _retag(self, number, spans):
+        start, end = f"{number}.0", f"{number}.end"
+        for tag in STYLES:
+            self.text.tag_remove(tag, start, end)
+        for tag, first, last in spans:
+            self.text.tag_add(tag, f"{number}.{first}", f"{number}.{last}")
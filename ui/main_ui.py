@@ -4,8 +4,6 @@ import os
 import sys
 from datetime import datetime
 import getpass
-import contextlib
-from io import StringIO
 
 # Agregar el directorio src al path
 HERE = os.path.dirname(os.path.abspath(__file__))
@@ -13,11 +11,16 @@ PARENT = os.path.dirname(HERE)
 SRC = os.path.join(PARENT, "src")
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
 
 import lexer as lexmod
 import parser as parsemod
 import semantic as semmod
+import fold
 import utils
+from highlighter import Highlighter
+from diagnostics import DiagnosticsPanel, from_lex_errors, from_messages
 
 
 class RustCompilerUI:
@@ -29,6 +32,7 @@ class RustCompilerUI:
         
         # Variables
         self.current_file = None
+        self._line_count = None
         self.logs_dir = os.path.join(PARENT, "logs")
         
         # Crear carpeta de logs si no existe
@@ -106,6 +110,8 @@ class RustCompilerUI:
         self.code_editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.code_editor.bind("<KeyRelease>", self.update_line_numbers)
         self.code_editor.bind("<MouseWheel>", self.on_scroll)
+        self.highlighter = Highlighter(self.code_editor)
+        self.code_editor.tag_configure("diagnostic_line", background="#3a1d1d")
         
         # Panel derecho - Salida del análisis
         right_frame = tk.Frame(content_frame, bg="#1e1e1e", width=500)
@@ -118,8 +124,13 @@ class RustCompilerUI:
                                anchor="w", padx=10, pady=5)
         output_label.pack(fill=tk.X)
         
+        # Salida arriba, diagnósticos debajo (el divisor se puede mover)
+        output_panes = tk.PanedWindow(right_frame, orient=tk.VERTICAL, bg="#1e1e1e",
+                                      sashwidth=5, borderwidth=0)
+        output_panes.pack(fill=tk.BOTH, expand=True)
+        
         self.output_area = scrolledtext.ScrolledText(
-            right_frame,
+            output_panes,
             wrap=tk.WORD,
             bg="#0c0c0c",
             fg="#cccccc",
@@ -129,7 +140,10 @@ class RustCompilerUI:
             padx=10,
             pady=10
         )
-        self.output_area.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        output_panes.add(self.output_area, height=260)
+        
+        self.diagnostics = DiagnosticsPanel(output_panes, on_select=self.jump_to_diagnostic)
+        output_panes.add(self.diagnostics)
         
         # Configurar tags para colores
         self.output_area.tag_config("error", foreground="#f48771")
@@ -142,11 +156,14 @@ class RustCompilerUI:
         self.update_line_numbers()
         
     def update_line_numbers(self, event=None):
-        """Actualiza los números de línea"""
+        """Actualiza los números de línea (solo si cambió el número de líneas)"""
+        line_count = int(self.code_editor.index("end-1c").split(".")[0])
+        if line_count == self._line_count:
+            return
+        self._line_count = line_count
         self.line_numbers.config(state="normal")
         self.line_numbers.delete("1.0", "end")
         
-        line_count = self.code_editor.get("1.0", "end-1c").count("\n") + 1
         line_numbers_string = "\n".join(str(i) for i in range(1, line_count + 1))
         self.line_numbers.insert("1.0", line_numbers_string)
         self.line_numbers.config(state="disabled")
@@ -195,8 +212,20 @@ class RustCompilerUI:
             messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{str(e)}")
             
     def clear_output(self):
-        """Limpia el área de salida"""
+        """Limpia el área de salida y los diagnósticos"""
         self.output_area.delete('1.0', tk.END)
+        self.diagnostics.clear()
+        
+    def jump_to_diagnostic(self, diagnostic):
+        """Lleva el cursor del editor a la línea (y columna) de un diagnóstico"""
+        if not diagnostic.line:
+            return
+        position = f"{diagnostic.line}.{max(diagnostic.column - 1, 0)}"
+        self.code_editor.mark_set(tk.INSERT, position)
+        self.code_editor.tag_remove("diagnostic_line", "1.0", tk.END)
+        self.code_editor.tag_add("diagnostic_line", f"{diagnostic.line}.0", f"{diagnostic.line}.0+1l")
+        self.code_editor.see(position)
+        self.code_editor.focus_set()
         
     def log_message(self, message, tag="info"):
         """Agrega un mensaje al área de salida"""
@@ -217,19 +246,16 @@ class RustCompilerUI:
         self.log_message("=" * 60, "info")
         
         try:
-            lexmod.lexer.lineno = 1
-            err_capture = StringIO()
-            tokens = []
-            
-            with contextlib.redirect_stdout(err_capture):
-                lexmod.lexer.input(code)
-                for tok in lexmod.lexer:
-                    tokens.append(tok)
+            lexer = lexmod.build_lexer()
+            lexer.input(code)
+            tokens = list(lexer)
+            errors = "".join(f"{err}\n" for err in lexer.errors)
+            self.diagnostics.set_diagnostics(from_lex_errors(lexer.errors))
             
             user = getpass.getuser() or "anon"
             filename = os.path.basename(self.current_file) if self.current_file else "codigo.rs"
             
-            logpath = utils.save_lexer_log(user, tokens, err_capture.getvalue(), filename, self.logs_dir)
+            logpath = utils.save_lexer_log(user, tokens, errors, filename, self.logs_dir)
             
             self.log_message(f"\n✓ Tokens reconocidos: {len(tokens)}", "success")
             self.log_message(f"✓ Log guardado en: {os.path.basename(logpath)}", "success")
@@ -242,10 +268,8 @@ class RustCompilerUI:
                 if len(tokens) > 10:
                     self.log_message(f"  ... y {len(tokens) - 10} tokens más")
                     
-            errors = err_capture.getvalue()
-            if errors.strip():
-                self.log_message("\n⚠ Errores léxicos:", "error")
-                self.log_message(errors, "error")
+            if errors:
+                self.log_message(f"\n⚠ {len(lexer.errors)} errores léxicos (ver diagnósticos)", "error")
             else:
                 self.log_message("\n✓ Sin errores léxicos", "success")
                 
@@ -266,7 +290,12 @@ class RustCompilerUI:
         self.log_message("=" * 60, "info")
         
         try:
-            ast, errors = parsemod.parse_code(code)
+            lexer = lexmod.build_lexer()
+            ast, errors = parsemod.parse_code(code, lexer=lexer)
+            self.diagnostics.set_diagnostics(from_lex_errors(lexer.errors)
+                                             + from_messages("sintáctico", errors))
+            if lexer.errors:
+                self.log_message(f"✗ {len(lexer.errors)} errores léxicos (ver diagnósticos)", "error")
             
             user = getpass.getuser() or "anon"
             logpath = utils.save_syntax_log(user, errors, self.logs_dir)
@@ -275,9 +304,7 @@ class RustCompilerUI:
                 self.log_message("\n✓ Código analizado correctamente", "success")
                 self.log_message(f"✓ Log guardado en: {os.path.basename(logpath)}", "success")
             else:
-                self.log_message(f"\n✗ Se encontraron {len(errors)} errores sintácticos:", "error")
-                for i, err in enumerate(errors, 1):
-                    self.log_message(f"  {i}. {err}", "error")
+                self.log_message(f"\n✗ Se encontraron {len(errors)} errores sintácticos (ver diagnósticos)", "error")
                 self.log_message(f"\n✓ Log guardado en: {os.path.basename(logpath)}", "success")
                 
         except Exception as e:
@@ -299,20 +326,28 @@ class RustCompilerUI:
         try:
             # Primero sintáctico
             self.log_message("\n[1/3] Analizando sintaxis...", "info")
-            ast, syntax_errors = parsemod.parse_code(code)
+            lexer = lexmod.build_lexer()
+            ast, syntax_errors = parsemod.parse_code(code, lexer=lexer)
+            diagnostics = from_lex_errors(lexer.errors) + from_messages("sintáctico", syntax_errors)
+            if lexer.errors:
+                self.log_message(f"✗ {len(lexer.errors)} errores léxicos encontrados", "error")
             
             if syntax_errors:
                 self.log_message(f"✗ {len(syntax_errors)} errores sintácticos encontrados", "error")
-                for err in syntax_errors[:5]:
-                    self.log_message(f"  - {err}", "error")
-                self.log_message("\n⚠ Análisis semántico omitido debido a errores sintácticos", "warning")
-                return
-                
-            self.log_message("✓ Sintaxis correcta", "success")
+                if not ast:
+                    self.diagnostics.set_diagnostics(diagnostics)
+                    self.log_message("\n⚠ Análisis semántico omitido: el parser no produjo AST", "warning")
+                    return
+                self.log_message("⚠ Se analizan las sentencias que el parser pudo recuperar", "warning")
+            else:
+                self.log_message("✓ Sintaxis correcta", "success")
             
-            # Luego semántico
+            # Luego semántico, con las expresiones constantes ya plegadas
             self.log_message("\n[2/3] Analizando semántica...", "info")
+            ast = fold.fold_constants(ast)
             errors = semmod.analyze(ast)
+            diagnostics.extend(from_messages("semántico", errors))
+            self.diagnostics.set_diagnostics(diagnostics)
             
             user = getpass.getuser() or "anon"
             logpath = utils.save_semantic_log(user, errors, semmod.symbol_table, 
@@ -334,9 +369,7 @@ class RustCompilerUI:
                     for func, info in semmod.function_table.items():
                         self.log_message(f"  {func}: {info}")
             else:
-                self.log_message(f"\n✗ Se encontraron {len(errors)} errores semánticos:", "error")
-                for i, err in enumerate(errors, 1):
-                    self.log_message(f"  {i}. {err}", "error")
+                self.log_message(f"\n✗ Se encontraron {len(errors)} errores semánticos (ver diagnósticos)", "error")
                     
             self.log_message(f"\n✓ Log guardado en: {os.path.basename(logpath)}", "success")
             